@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import os
 from datetime import timedelta
 import pendulum
 
@@ -8,16 +9,33 @@ from airflow.operators.python import PythonOperator
 from airflow.operators.bash import BashOperator
 from airflow.utils.task_group import TaskGroup
 
+from src.common.sharding import DEFAULT_SHARDS
 from src.ingestion.write_bronze import run as write_bronze_run
 from src.transforms.bronze_to_silver_daily import run as bronze_to_silver_run
+from src.transforms.bronze_to_silver_daily import run_shard as bronze_to_silver_shard_run
+from src.transforms.bronze_to_silver_daily import publish_shards as publish_silver_run
+from src.transforms.bronze_to_silver_hourly import run as bronze_to_silver_hourly_run
+from src.transforms.bronze_to_silver_hourly import run_shard as bronze_to_silver_hourly_shard_run
+from src.transforms.bronze_to_silver_hourly import publish_shards as publish_silver_hourly_run
 from src.quality.silver_checks_daily import run as quality_gate_run
 from src.ingestion.loaders.postgres_loader_daily import run as load_postgres_daily_run
 from src.ingestion.loaders.postgres_loader_locations import run as load_postgres_locations_run
+from src.ingestion.loaders.postgres_loader_hourly import run as load_postgres_hourly_run
+from src.transforms.bronze_to_postgres_daily import run as fused_daily_run
+from src.transforms.silver_compact import run as silver_compact_run
 
 
 DBT_PROFILES_DIR = "/opt/airflow/dbt"
 DBT_PROJECT_DIR = "/opt/airflow/dbt/weather_dbt"
 
+# 1: run silver + quality + load as one in-memory task (no silver re-downloads)
+FUSED_DAILY = os.getenv("WEATHER_FUSED_DAILY", "0") == "1"
+
+# >1: bronze ingestion and the silver transforms run as one mapped task per
+# location shard (spread over the executor's slots / workers), and a publish
+# task commits the dt manifest over every shard's files (WEATHER_SHARDS)
+SHARDS = DEFAULT_SHARDS
+
 default_args = {
     "owner": "data",
     "retries": 3,
@@ -39,48 +57,128 @@ with DAG(
 
     
     dt_arg = {"dt": "{{ ds }}"}
+    shard_args = [{**dt_arg, "shard": i, "shards": SHARDS} for i in range(SHARDS)]
 
     with TaskGroup(group_id="tg_bronze", tooltip="Extract WeatherAPI -> MinIO bronze") as tg_bronze:
-        write_bronze = PythonOperator(
-            task_id="write_bronze",
-            python_callable=write_bronze_run,
-            op_kwargs=dt_arg,
-            execution_timeout=timedelta(minutes=15),
-        )
-
-    with TaskGroup(group_id="tg_silver", tooltip="Bronze -> Silver parquet") as tg_silver:
-        bronze_to_silver = PythonOperator(
-            task_id="bronze_to_silver",
-            python_callable=bronze_to_silver_run,
+        if SHARDS > 1:
+            write_bronze = PythonOperator.partial(
+                task_id="write_bronze",
+                python_callable=write_bronze_run,
+                execution_timeout=timedelta(minutes=15),
+            ).expand(op_kwargs=shard_args)
+        else:
+            write_bronze = PythonOperator(
+                task_id="write_bronze",
+                python_callable=write_bronze_run,
+                op_kwargs=dt_arg,
+                execution_timeout=timedelta(minutes=15),
+            )
+
+    if FUSED_DAILY:
+        with TaskGroup(group_id="tg_fused", tooltip="Bronze -> Silver -> Quality -> Postgres in memory") as tg_fused:
+            bronze_to_postgres = PythonOperator(
+                task_id="bronze_to_postgres",
+                python_callable=fused_daily_run,
+                op_kwargs=dt_arg,
+                execution_timeout=timedelta(minutes=40),
+            )
+    else:
+        with TaskGroup(group_id="tg_silver", tooltip="Bronze -> Silver parquet") as tg_silver:
+            if SHARDS > 1:
+                # each shard stages its files and returns their manifest entries (XCom)
+                bronze_to_silver = PythonOperator.partial(
+                    task_id="bronze_to_silver",
+                    python_callable=bronze_to_silver_shard_run,
+                    execution_timeout=timedelta(minutes=20),
+                ).expand(op_kwargs=shard_args)
+
+                publish_silver = PythonOperator(
+                    task_id="publish_silver",
+                    python_callable=publish_silver_run,
+                    op_kwargs={**dt_arg, "staged": bronze_to_silver.output},
+                    do_xcom_push=False,
+                    execution_timeout=timedelta(minutes=5),
+                )
+
+                bronze_to_silver >> publish_silver
+            else:
+                bronze_to_silver = PythonOperator(
+                    task_id="bronze_to_silver",
+                    python_callable=bronze_to_silver_run,
+                    op_kwargs=dt_arg,
+                    execution_timeout=timedelta(minutes=20),
+                )
+
+        with TaskGroup(group_id="tg_quality", tooltip="Quality gate on Silver") as tg_quality:
+            quality_gate = PythonOperator(
+                task_id="quality_gate",
+                python_callable=quality_gate_run,
+                op_kwargs=dt_arg,
+                execution_timeout=timedelta(minutes=10),
+            )
+
+        with TaskGroup(group_id="tg_load", tooltip="Load Silver -> Postgres staging") as tg_load:
+            load_locations_staging = PythonOperator(
+                task_id="load_locations_staging",
+                python_callable=load_postgres_locations_run,
+                op_kwargs=dt_arg,
+                execution_timeout=timedelta(minutes=10),
+            )
+
+            load_weather_daily_staging = PythonOperator(
+                task_id="load_weather_daily_staging",
+                python_callable=load_postgres_daily_run,
+                op_kwargs=dt_arg,
+                execution_timeout=timedelta(minutes=15),
+            )
+
+            load_locations_staging >> load_weather_daily_staging
+
+    with TaskGroup(group_id="tg_hourly", tooltip="Bronze -> Silver hourly -> Postgres staging") as tg_hourly:
+        # after the daily gate: same bronze, and one writer of the dt manifest at a time
+        if SHARDS > 1:
+            bronze_to_silver_hourly = PythonOperator.partial(
+                task_id="bronze_to_silver_hourly",
+                python_callable=bronze_to_silver_hourly_shard_run,
+                execution_timeout=timedelta(minutes=20),
+            ).expand(op_kwargs=shard_args)
+
+            publish_silver_hourly = PythonOperator(
+                task_id="publish_silver_hourly",
+                python_callable=publish_silver_hourly_run,
+                op_kwargs={**dt_arg, "staged": bronze_to_silver_hourly.output},
+                do_xcom_push=False,
+                execution_timeout=timedelta(minutes=5),
+            )
+        else:
+            bronze_to_silver_hourly = PythonOperator(
+                task_id="bronze_to_silver_hourly",
+                python_callable=bronze_to_silver_hourly_run,
+                op_kwargs=dt_arg,
+                execution_timeout=timedelta(minutes=20),
+            )
+
+        load_weather_hourly_staging = PythonOperator(
+            task_id="load_weather_hourly_staging",
+            python_callable=load_postgres_hourly_run,
             op_kwargs=dt_arg,
             execution_timeout=timedelta(minutes=20),
         )
 
-    with TaskGroup(group_id="tg_quality", tooltip="Quality gate on Silver") as tg_quality:
-        quality_gate = PythonOperator(
-            task_id="quality_gate",
-            python_callable=quality_gate_run,
-            op_kwargs=dt_arg,
-            execution_timeout=timedelta(minutes=10),
-        )
+        if SHARDS > 1:
+            bronze_to_silver_hourly >> publish_silver_hourly >> load_weather_hourly_staging
+        else:
+            bronze_to_silver_hourly >> load_weather_hourly_staging
 
-    with TaskGroup(group_id="tg_load", tooltip="Load Silver -> Postgres staging") as tg_load:
-        load_locations_staging = PythonOperator(
-            task_id="load_locations_staging",
-            python_callable=load_postgres_locations_run,
+    with TaskGroup(group_id="tg_compact", tooltip="Compact complete months of Silver daily/hourly") as tg_compact:
+        # no-op (one LIST + GET per month) unless a month is new or one of its dts was rerun
+        compact_silver = PythonOperator(
+            task_id="compact_silver_months",
+            python_callable=silver_compact_run,
             op_kwargs=dt_arg,
-            execution_timeout=timedelta(minutes=10),
+            execution_timeout=timedelta(minutes=30),
         )
 
-        load_weather_daily_staging = PythonOperator(
-            task_id="load_weather_daily_staging",
-            python_callable=load_postgres_daily_run,
-            op_kwargs=dt_arg,
-            execution_timeout=timedelta(minutes=15),
-        )
-
-        load_locations_staging >> load_weather_daily_staging
-
     with TaskGroup(group_id="tg_dbt", tooltip="dbt deps/run/test/freshness") as tg_dbt:
         dbt_deps = BashOperator(
             task_id="dbt_deps",
@@ -120,4 +218,11 @@ with DAG(
 
         dbt_deps >> dbt_run_core >> dbt_run_bi >> dbt_test >> dbt_source_freshness
 
-    tg_bronze >> tg_silver >> tg_quality >> tg_load >> tg_dbt
\ No newline at end of file
+    if FUSED_DAILY:
+        tg_bronze >> tg_fused >> tg_dbt
+        tg_fused >> tg_hourly
+    else:
+        tg_bronze >> tg_silver >> tg_quality >> tg_load >> tg_dbt
+        tg_quality >> tg_hourly
+    # compaction reads the dt manifests the hourly publish rewrites: only once it is done
+    tg_hourly >> [tg_compact, tg_dbt]
\ No newline at end of file
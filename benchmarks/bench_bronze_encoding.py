@@ -0,0 +1,55 @@
+"""
+Bronze object size and decode time per encoding for one synthetic day.
+
+Compares the legacy pretty-printed raw.json with the compact json/gzip/zstd
+encodings written by write_bronze (zstd is skipped if `zstandard` is missing).
+
+    python -m benchmarks.bench_bronze_encoding --locations 1000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+
+from benchmarks.synthetic import make_bronze_record, make_locations
+from src.common.bronze_format import ENCODINGS, decode_bronze, encode_bronze
+
+
+def bench(n_locations: int, dt: str = "2025-01-01") -> dict:
+    records = [make_bronze_record(loc, dt) for loc in make_locations(n_locations)]
+
+    candidates: dict[str, list[bytes]] = {
+        "legacy_pretty_json": [
+            json.dumps(r, ensure_ascii=False, indent=2).encode("utf-8") for r in records
+        ]
+    }
+    for enc in ENCODINGS:
+        try:
+            candidates[enc] = [encode_bronze(r, enc)[0] for r in records]
+        except ImportError:
+            continue
+
+    out: dict = {"locations": n_locations, "dt": dt, "encodings": {}}
+    baseline = sum(len(b) for b in candidates["legacy_pretty_json"])
+    for name, bodies in candidates.items():
+        total = sum(len(b) for b in bodies)
+        t0 = time.perf_counter()
+        for b in bodies:
+            decode_bronze(b)
+        decode_s = time.perf_counter() - t0
+        out["encodings"][name] = {
+            "total_bytes": total,
+            "avg_object_bytes": total // len(bodies),
+            "ratio_vs_legacy": round(total / baseline, 3),
+            "decode_ms_per_object": round(decode_s / len(bodies) * 1000, 3),
+        }
+    return out
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bronze encoding size/decode benchmark")
+    parser.add_argument("--locations", type=int, default=1000)
+    args = parser.parse_args()
+
+    print(json.dumps(bench(args.locations), indent=2))
@@ -0,0 +1,117 @@
+"""
+Bronze read throughput for one dt: serial GETs vs the bounded-concurrency reader.
+
+Runs against a local moto S3 server process over HTTP (so every GET pays a real
+request round trip) with thousands of synthetic location objects. moto itself is
+CPU-bound and answers from localhost, so `--latency_ms` injects a per-GET delay on
+the client (botocore before-send hook) to stand in for S3/MinIO first-byte latency.
+Use --latency_ms 0 to measure the raw local server.
+
+    python -m benchmarks.bench_bronze_reader --locations 3000 --concurrency 1,8,32 --latency_ms 20
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BUCKET = "bench-bucket"
+DT = "2025-01-01"
+
+
+def _payload(location_id: str) -> dict:
+    return {
+        "metadata": {"dt": DT, "location_id": location_id, "ingested_at": "2025-01-02T00:00:00+00:00"},
+        "payload": {
+            "location": {"name": location_id, "lat": 1.0, "lon": 2.0, "tz_id": "UTC"},
+            "forecast": {"forecastday": [{"date": DT, "day": {"avgtemp_c": 1.0}, "hour": [{"temp_c": 1.0}] * 24}]},
+        },
+    }
+
+
+def start_local_s3(port: int = 5123):
+    """moto S3 server in a separate process, so server CPU does not share our GIL."""
+    import socket
+    import subprocess
+    import sys
+
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "moto.server", "-H", "127.0.0.1", "-p", str(port)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 30
+    while True:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            break
+        except OSError:
+            if time.time() > deadline:
+                proc.kill()
+                raise RuntimeError("moto server did not start")
+            time.sleep(0.2)
+
+    os.environ.update(
+        S3_ENDPOINT_URL=f"http://127.0.0.1:{port}",
+        S3_BUCKET=BUCKET,
+        S3_REGION="us-east-1",
+        S3_ACCESS_KEY="bench",
+        S3_SECRET_KEY="bench",
+    )
+    from src.common.s3_client import reset_s3_client
+
+    reset_s3_client()
+    return proc
+
+
+def bench(n_locations: int, concurrencies: list[int], latency_ms: float) -> dict:
+    server = start_local_s3()
+    try:
+        from src.common.s3_client import get_s3_client
+        from src.transforms.bronze_reader import iter_bronze_records
+
+        s3 = get_s3_client()
+        s3.create_bucket(Bucket=BUCKET)
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            list(
+                pool.map(
+                    lambda i: s3.put_object(
+                        Bucket=BUCKET,
+                        Key=f"bronze/weather_history/dt={DT}/location_id=loc_{i:06d}/raw.json",
+                        Body=json.dumps(_payload(f"loc_{i:06d}")),
+                    ),
+                    range(n_locations),
+                )
+            )
+
+        if latency_ms:
+            s3.meta.events.register(
+                "before-send.s3.GetObject", lambda **kwargs: time.sleep(latency_ms / 1000)
+            )
+
+        out: dict = {"locations": n_locations, "latency_ms": latency_ms, "runs": []}
+        for c in concurrencies:
+            t0 = time.perf_counter()
+            n = sum(1 for _ in iter_bronze_records(BUCKET, DT, max_concurrency=c))
+            elapsed = time.perf_counter() - t0
+            assert n == n_locations, f"read {n} records, expected {n_locations}"
+            out["runs"].append(
+                {"concurrency": c, "wall_s": round(elapsed, 3), "objects_per_s": round(n / elapsed, 1)}
+            )
+        return out
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bronze reader benchmark")
+    parser.add_argument("--locations", type=int, default=3000)
+    parser.add_argument("--concurrency", type=str, default="1,8,32")
+    parser.add_argument("--latency_ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    concurrencies = [int(c) for c in args.concurrency.split(",")]
+    print(json.dumps(bench(args.locations, concurrencies, args.latency_ms), indent=2))
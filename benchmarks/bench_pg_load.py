@@ -0,0 +1,119 @@
+"""
+Rows/second into staging.stg_weather_daily: execute_values over _to_py_rows vs
+COPY FROM STDIN from an Arrow table (pg_copy), plus the cost of a merge rerun
+of an unchanged day vs a changed one.
+
+Loads synthetic silver rows into a TEMP copy of the staging table on the Postgres
+given by WEATHER_DWH_PG_DSN (nothing persistent is touched).
+
+    WEATHER_DWH_PG_DSN=postgresql://... python -m benchmarks.bench_pg_load --rows 200000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import time
+from datetime import date, datetime, timedelta, timezone
+
+import psycopg2
+import pyarrow as pa
+import pyarrow.compute as pc
+from psycopg2.extras import execute_values
+
+from src.ingestion.loaders.pg_copy import conform, copy_arrow, merge_arrow
+from src.ingestion.loaders.postgres_loader_daily import ARROW_TYPES, COLS, HASH_COLS, KEY_COLS, _to_py_rows
+from src.transforms.silver_normalize import DAILY_SCHEMA, with_pandas_metadata
+
+TEMP_TABLE = "bench_stg_weather_daily"
+
+
+def make_daily_table(n_rows: int, seed: int = 7) -> pa.Table:
+    rnd = random.Random(seed)
+    n_loc = max(1, n_rows // 365)
+    d0 = date(2024, 1, 1)
+    ingested = datetime(2025, 1, 2, 1, 2, 3, tzinfo=timezone.utc)
+    cols = {f.name: [] for f in DAILY_SCHEMA}
+    for i in range(n_rows):
+        day = d0 + timedelta(days=i // n_loc)
+        cols["dt"].append(day)
+        cols["location_id"].append(f"loc_{i % n_loc:06d}")
+        cols["ingested_at"].append(ingested)
+        cols["date"].append(day)
+        t = rnd.uniform(-20, 30)
+        cols["temp_min_c"].append(round(t - 5, 1))
+        cols["temp_max_c"].append(round(t + 5, 1))
+        cols["temp_avg_c"].append(round(t, 1))
+        cols["precip_mm"].append(round(rnd.uniform(0, 10), 2) if rnd.random() > 0.1 else None)
+        cols["snow_cm"].append(0.0)
+        cols["humidity_avg"].append(float(rnd.randint(20, 100)))
+        cols["wind_max_kph"].append(round(rnd.uniform(0, 60), 1))
+        cols["condition_code"].append(rnd.choice([1000, 1003, 1183, None]))
+        cols["condition_text"].append(rnd.choice(["Sunny", "Partly cloudy", "Light rain", None]))
+    return with_pandas_metadata(pa.Table.from_pydict(cols, schema=DAILY_SCHEMA))
+
+
+def _fresh_temp_table(cur) -> None:
+    cur.execute(f"DROP TABLE IF EXISTS {TEMP_TABLE}")
+    cur.execute(f"CREATE TEMP TABLE {TEMP_TABLE} (LIKE staging.stg_weather_daily INCLUDING ALL)")
+
+
+def bench(n_rows: int) -> dict:
+    dsn = os.getenv("WEATHER_DWH_PG_DSN")
+    if not dsn:
+        raise ValueError("WEATHER_DWH_PG_DSN is not set")
+
+    table = make_daily_table(n_rows)
+    out: dict = {"rows": n_rows}
+
+    with psycopg2.connect(dsn) as conn:
+        with conn.cursor() as cur:
+            # legacy: pandas -> per-cell Python tuples -> execute_values
+            _fresh_temp_table(cur)
+            t0 = time.perf_counter()
+            df = table.to_pandas()[COLS]
+            rows = _to_py_rows(df)
+            cols = ", ".join(COLS)
+            execute_values(cur, f"INSERT INTO {TEMP_TABLE} ({cols}) VALUES %s", rows, page_size=1000)
+            conn.commit()
+            insert_s = time.perf_counter() - t0
+
+            # copy: Arrow -> CSV (C++) -> COPY FROM STDIN
+            _fresh_temp_table(cur)
+            t0 = time.perf_counter()
+            copy_arrow(cur, TEMP_TABLE, conform(table, COLS, ARROW_TYPES))
+            conn.commit()
+            copy_s = time.perf_counter() - t0
+            out["delete_copy_s"] = round(copy_s, 3)
+
+            cur.execute(f"SELECT count(*) FROM {TEMP_TABLE}")
+            assert cur.fetchone()[0] == n_rows
+
+            # merge: rerun with identical content, then with every temperature changed
+            conformed = conform(table, COLS, ARROW_TYPES)
+            t0 = time.perf_counter()
+            out["merge_unchanged"] = merge_arrow(cur, TEMP_TABLE, conformed, KEY_COLS, HASH_COLS)
+            conn.commit()
+            out["merge_unchanged_s"] = round(time.perf_counter() - t0, 3)
+
+            shifted = conformed.set_column(
+                COLS.index("temp_avg_c"), "temp_avg_c", pc.add(conformed.column("temp_avg_c"), 1.0)
+            )
+            t0 = time.perf_counter()
+            out["merge_changed"] = merge_arrow(cur, TEMP_TABLE, shifted, KEY_COLS, HASH_COLS)
+            conn.commit()
+            out["merge_changed_s"] = round(time.perf_counter() - t0, 3)
+
+    out["execute_values_rows_per_s"] = round(n_rows / insert_s)
+    out["copy_rows_per_s"] = round(n_rows / copy_s)
+    out["speedup"] = round(insert_s / copy_s, 2)
+    return out
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Postgres bulk load benchmark")
+    parser.add_argument("--rows", type=int, default=200_000)
+    args = parser.parse_args()
+
+    print(json.dumps(bench(args.rows), indent=2))
@@ -0,0 +1,452 @@
+"""
+End-to-end synthetic load on the daily pipeline stages:
+
+    write_bronze -> bronze_to_silver_daily -> silver_checks_daily
+                 -> load_postgres_daily, load_postgres_locations
+
+for each `--locations` scale x `--days` dts, against local stand-ins:
+
+- WeatherAPI: a stub HTTP server process serving synthetic history payloads
+  (benchmarks/synthetic.py, gzip like the real API) for the generated locations.
+  Payloads are rendered when the stub starts, so the stub costs no CPU while a
+  stage is being measured. `--api_latency_ms` adds a per-request delay.
+- S3: a moto server process over HTTP, or an existing MinIO/S3 endpoint
+  (`--s3_endpoint`, with S3_ACCESS_KEY / S3_SECRET_KEY set).
+- Postgres: `--pg_dsn` (or BENCH_PG_DSN). The staging DDL is applied and
+  staging.stg_weather_daily / stg_locations are TRUNCATED before each scale, so
+  point it at a scratch database. Without a DSN the loader stages are skipped.
+
+Every stage runs in a fresh process, as an Airflow task would, so peak RSS is
+per stage and no client, pool or cache is shared between stages. Per stage the
+JSON output has wall time, peak RSS, S3 requests per operation and bytes in/out
+(from the stage's own botocore client), WeatherAPI requests and bytes (from the
+stub) and the Postgres WAL bytes written. Save it with --output and pass it back
+as --baseline on another commit to get the ratios per stage.
+
+The stand-ins run on the same machine, so wall times include their CPU.
+
+    python -m benchmarks.bench_pipeline --locations 10,1000,10000 --days 2 \\
+        --pg_dsn "host=/tmp/pg dbname=bench" --output bench.json
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import multiprocessing as mp
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from collections import Counter
+from contextlib import redirect_stdout
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable
+from urllib.parse import parse_qs, urlsplit
+
+import yaml
+
+from benchmarks.synthetic import make_history_payload, make_locations
+
+STAGES = (
+    "write_bronze",
+    "bronze_to_silver_daily",
+    "silver_checks_daily",
+    "load_postgres_daily",
+    "load_postgres_locations",
+)
+PG_STAGES = ("load_postgres_daily", "load_postgres_locations")
+START = date(2024, 1, 1)
+STAGING_DDL = Path(__file__).resolve().parents[1] / "infra" / "postgres" / "staging_ddl.sql"
+
+
+# ---------------------------------------------------------------- WeatherAPI stub
+
+def _stub_server(n_locations: int, dts: list[str], latency_ms: float, ready) -> None:
+    payloads: dict[tuple[str, str], bytes] = {}
+    for loc in make_locations(n_locations):
+        q = f"{float(loc['lat'])},{float(loc['lon'])}"
+        for dt in dts:
+            payloads[(q, dt)] = gzip.compress(json.dumps(make_history_payload(loc, dt)).encode("utf-8"), 6)
+
+    stats = {"requests": 0, "bytes": 0, "not_found": 0}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        wbufsize = 64 * 1024
+        disable_nagle_algorithm = True
+
+        def _send(self, status: int, body: bytes, gzipped: bool = False) -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            if gzipped:
+                self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self) -> None:  # noqa: N802
+            url = urlsplit(self.path)
+            if url.path == "/_stats":
+                with lock:
+                    body = json.dumps(stats).encode("utf-8")
+                self._send(200, body)
+                return
+
+            params = {k: v[0] for k, v in parse_qs(url.query).items()}
+            body = payloads.get((params.get("q", ""), params.get("dt", "")))
+            if latency_ms:
+                time.sleep(latency_ms / 1000)
+            with lock:
+                stats["requests"] += 1
+                if body is None:
+                    stats["not_found"] += 1
+                else:
+                    stats["bytes"] += len(body)
+            if body is None:
+                self._send(400, b'{"error":{"code":1006,"message":"No matching location found."}}')
+            else:
+                self._send(200, body, gzipped=True)
+
+        def log_message(self, *args) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    ready.put(server.server_address[1])
+    server.serve_forever()
+
+
+def start_stub_api(n_locations: int, dts: list[str], latency_ms: float) -> tuple[Any, str]:
+    ctx = mp.get_context("spawn")
+    ready = ctx.Queue()
+    proc = ctx.Process(target=_stub_server, args=(n_locations, dts, latency_ms, ready), daemon=True)
+    proc.start()
+    port = ready.get(timeout=600)
+    return proc, f"http://127.0.0.1:{port}"
+
+
+def stub_stats(base_url: str) -> dict[str, int]:
+    with urllib.request.urlopen(f"{base_url}/_stats", timeout=10) as r:
+        return json.loads(r.read())
+
+
+# ---------------------------------------------------------------- stages
+
+def _stage_fn(stage: str, dt: str, opts: dict[str, Any]) -> Callable[[], Any]:
+    if stage == "write_bronze":
+        from src.ingestion.write_bronze import run
+
+        return lambda: run(
+            dt, locations_path=opts["locations_path"], max_concurrency=opts["max_concurrency"], layout=opts["layout"]
+        )
+    if stage == "bronze_to_silver_daily":
+        from src.transforms.bronze_to_silver_daily import run
+
+        return lambda: run(dt, max_concurrency=opts["max_concurrency"])
+    if stage == "silver_checks_daily":
+        from src.quality.silver_checks_daily import run
+
+        return lambda: run(dt)
+    if stage == "load_postgres_daily":
+        from src.ingestion.loaders.postgres_loader_daily import run
+
+        return lambda: run(dt)
+    if stage == "load_postgres_locations":
+        from src.ingestion.loaders.postgres_loader_locations import run
+
+        return lambda: run(dt)
+    raise ValueError(f"Unknown stage '{stage}'. Allowed: {list(STAGES)}")
+
+
+def _stage_worker(stage: str, dt: str, opts: dict[str, Any], log_path: str, conn) -> None:
+    """Child process: run one stage for one dt, counting this process's S3 traffic."""
+    out: dict[str, Any] = {}
+    try:
+        from src.common.s3_client import get_s3_client
+
+        s3_calls: Counter = Counter()
+        s3_bytes = {"out": 0, "in": 0}
+
+        def before_send(request, **kw) -> None:
+            body = request.body
+            if isinstance(body, (bytes, bytearray)):
+                s3_bytes["out"] += len(body)
+            elif hasattr(body, "seek") and hasattr(body, "tell"):
+                pos = body.tell()
+                body.seek(0, 2)
+                s3_bytes["out"] += body.tell() - pos
+                body.seek(pos)
+
+        def after_call(http_response, model, **kw) -> None:
+            s3_calls[model.name] += 1
+            s3_bytes["in"] += int(http_response.headers.get("content-length") or 0)
+
+        events = get_s3_client().meta.events
+        events.register("before-send.s3.*", before_send)
+        events.register("after-call.s3.*", after_call)
+
+        fn = _stage_fn(stage, dt, opts)
+        with open(log_path, "a", encoding="utf-8") as log, redirect_stdout(log):
+            print(f"===== {stage} dt={dt}")
+            t0 = time.perf_counter()
+            fn()
+            out["wall_s"] = time.perf_counter() - t0
+        out.update(s3_requests=dict(s3_calls), s3_bytes_out=s3_bytes["out"], s3_bytes_in=s3_bytes["in"])
+    except BaseException as e:  # reported to the parent, which stops this scale
+        out["error"] = f"{type(e).__name__}: {e}"
+    # ru_maxrss is KiB on Linux
+    out["peak_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    conn.send(out)
+    conn.close()
+
+
+def run_stage(stage: str, dt: str, opts: dict[str, Any], log_path: str) -> dict[str, Any]:
+    ctx = mp.get_context("spawn")
+    parent, child = ctx.Pipe(duplex=False)
+    proc = ctx.Process(target=_stage_worker, args=(stage, dt, opts, log_path, child))
+    proc.start()
+    child.close()
+    try:
+        out = parent.recv()
+    except EOFError:
+        proc.join()
+        out = {"error": f"stage process died (exit code {proc.exitcode})"}
+    proc.join()
+    return out
+
+
+# ---------------------------------------------------------------- stand-ins
+
+def start_moto_server(port: int) -> subprocess.Popen:
+    from benchmarks.bench_bronze_reader import start_local_s3
+
+    return start_local_s3(port)
+
+
+def _pg_wal_lsn(dsn: str) -> str:
+    import psycopg2
+
+    with psycopg2.connect(dsn) as conn, conn.cursor() as cur:
+        cur.execute("SELECT pg_current_wal_lsn()::text")
+        lsn = cur.fetchone()[0]
+    conn.close()
+    return lsn
+
+
+def _pg_wal_bytes(dsn: str, since: str) -> int:
+    import psycopg2
+
+    with psycopg2.connect(dsn) as conn, conn.cursor() as cur:
+        cur.execute("SELECT pg_wal_lsn_diff(pg_current_wal_lsn(), %s::pg_lsn)::bigint", (since,))
+        n = cur.fetchone()[0]
+    conn.close()
+    return int(n)
+
+
+def reset_pg(dsn: str) -> None:
+    import psycopg2
+
+    with psycopg2.connect(dsn) as conn, conn.cursor() as cur:
+        cur.execute(STAGING_DDL.read_text(encoding="utf-8"))
+        cur.execute("TRUNCATE staging.stg_weather_daily, staging.stg_locations")
+    conn.close()
+
+
+# ---------------------------------------------------------------- driver
+
+def _summarize(per_dt: list[dict[str, Any]]) -> dict[str, Any]:
+    s3_requests: Counter = Counter()
+    for r in per_dt:
+        s3_requests.update(r.get("s3_requests", {}))
+    out: dict[str, Any] = {
+        "wall_s": round(sum(r["wall_s"] for r in per_dt), 3),
+        "wall_s_max_dt": round(max(r["wall_s"] for r in per_dt), 3),
+        "peak_rss_mb": round(max(r["peak_rss_mb"] for r in per_dt), 1),
+        "s3_requests": dict(sorted(s3_requests.items())),
+        "s3_requests_total": sum(s3_requests.values()),
+        "s3_bytes_out": sum(r["s3_bytes_out"] for r in per_dt),
+        "s3_bytes_in": sum(r["s3_bytes_in"] for r in per_dt),
+        "api_requests": sum(r["api_requests"] for r in per_dt),
+        "api_bytes": sum(r["api_bytes"] for r in per_dt),
+    }
+    if any("pg_wal_bytes" in r for r in per_dt):
+        out["pg_wal_bytes"] = sum(r.get("pg_wal_bytes", 0) for r in per_dt)
+    return out
+
+
+def bench_scale(n_locations: int, dts: list[str], stages: list[str], opts: dict[str, Any], work_dir: Path) -> dict:
+    pg_dsn = opts["pg_dsn"]
+    bucket = f"bench-pipeline-{n_locations}-{os.getpid()}"
+
+    locations_path = work_dir / f"locations_{n_locations}.yml"
+    locations_path.write_text(yaml.safe_dump({"locations": make_locations(n_locations)}), encoding="utf-8")
+    log_path = str(work_dir / f"stages_{n_locations}.log")
+
+    t0 = time.perf_counter()
+    stub, api_url = start_stub_api(n_locations, dts, opts["api_latency_ms"])
+    stub_setup_s = time.perf_counter() - t0
+
+    os.environ.update(S3_BUCKET=bucket, WEATHERAPI_BASE_URL=api_url)
+    from src.common.s3_client import get_s3_client, reset_s3_client
+
+    reset_s3_client()
+    get_s3_client().create_bucket(Bucket=bucket)
+    if pg_dsn:
+        reset_pg(pg_dsn)
+
+    stage_opts = {**opts, "locations_path": str(locations_path)}
+    per_stage: dict[str, list[dict[str, Any]]] = {s: [] for s in stages}
+    error: str | None = None
+    try:
+        for dt in dts:
+            for stage in stages:
+                api_before = stub_stats(api_url)
+                lsn = _pg_wal_lsn(pg_dsn) if pg_dsn and stage in PG_STAGES else None
+                r = run_stage(stage, dt, stage_opts, log_path)
+                if "error" in r:
+                    error = f"{stage} dt={dt}: {r['error']} (see {log_path})"
+                    break
+                api_after = stub_stats(api_url)
+                r["api_requests"] = api_after["requests"] - api_before["requests"]
+                r["api_bytes"] = api_after["bytes"] - api_before["bytes"]
+                if lsn is not None:
+                    r["pg_wal_bytes"] = _pg_wal_bytes(pg_dsn, lsn)
+                per_stage[stage].append(r)
+            if error:
+                break
+    finally:
+        stub.terminate()
+        stub.join()
+
+    out: dict[str, Any] = {
+        "locations": n_locations,
+        "days": len(dts),
+        "stub_setup_s": round(stub_setup_s, 3),
+        "stages": {s: _summarize(rs) for s, rs in per_stage.items() if rs},
+    }
+    out["wall_s"] = round(sum(s["wall_s"] for s in out["stages"].values()), 3)
+    if error:
+        out["error"] = error
+    return out
+
+
+def compare(results: dict, baseline: dict) -> dict:
+    """current / baseline for the headline metrics of every (locations, days, stage) present in both."""
+    keys = ("wall_s", "peak_rss_mb", "s3_requests_total", "s3_bytes_out", "s3_bytes_in", "api_requests", "pg_wal_bytes")
+    base = {(r["locations"], r["days"], s): m for r in baseline.get("runs", []) for s, m in r["stages"].items()}
+    out: dict[str, dict[str, dict[str, float]]] = {}
+    for r in results["runs"]:
+        for s, m in r["stages"].items():
+            b = base.get((r["locations"], r["days"], s))
+            if b is None:
+                continue
+            out.setdefault(str(r["locations"]), {})[s] = {
+                k: round(m[k] / b[k], 3) for k in keys if b.get(k) and k in m
+            }
+    return {"baseline_commit": baseline.get("git_commit"), "ratios": out}
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True, timeout=10
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Synthetic-load benchmark of the daily pipeline stages")
+    parser.add_argument("--locations", type=str, default="10,1000,10000", help="Comma-separated scales")
+    parser.add_argument("--days", type=int, default=1, help="Consecutive dts per scale")
+    parser.add_argument("--stages", type=str, default=",".join(STAGES))
+    parser.add_argument("--layout", type=str, default=None, help="Bronze layout (default: BRONZE_LAYOUT)")
+    parser.add_argument("--max_concurrency", type=int, default=None)
+    parser.add_argument("--api_latency_ms", type=float, default=0.0, help="Stub WeatherAPI delay per request")
+    parser.add_argument("--s3_endpoint", type=str, default=None, help="Existing MinIO/S3 endpoint instead of moto")
+    parser.add_argument("--s3_port", type=int, default=5124, help="Port of the moto server")
+    parser.add_argument("--pg_dsn", type=str, default=os.getenv("BENCH_PG_DSN"), help="Scratch Postgres (truncated)")
+    parser.add_argument("--work_dir", type=str, default=None, help="Generated locations and stage logs (default: a temp dir)")
+    parser.add_argument("--output", type=str, default=None, help="Also write the JSON here")
+    parser.add_argument("--baseline", type=str, default=None, help="JSON of an earlier run to compare against")
+    args = parser.parse_args()
+
+    scales = [int(x) for x in args.locations.split(",") if x]
+    stages = [s for s in args.stages.split(",") if s]
+    for s in stages:
+        if s not in STAGES:
+            raise ValueError(f"Unknown stage '{s}'. Allowed: {list(STAGES)}")
+    if args.days < 1:
+        raise ValueError(f"days must be >= 1, got {args.days}")
+    if not args.pg_dsn:
+        stages = [s for s in stages if s not in PG_STAGES]
+        print("[BENCH] no --pg_dsn / BENCH_PG_DSN: loader stages skipped", file=sys.stderr)
+    dts = [(START + timedelta(days=i)).isoformat() for i in range(args.days)]
+
+    # stage processes inherit this environment
+    os.environ.update(
+        WEATHERAPI_KEY="bench",
+        WEATHERAPI_MAX_RPS="0",
+        WEATHERAPI_MAX_REQUESTS_PER_DAY="0",
+        WEATHERAPI_CACHE_PATH="",
+        WEATHER_BRONZE_SKIP_EXISTING="",
+        AWS_DEFAULT_REGION="us-east-1",
+    )
+    if args.pg_dsn:
+        os.environ["WEATHER_DWH_PG_DSN"] = args.pg_dsn
+
+    moto = None
+    if args.s3_endpoint:
+        os.environ.update(S3_ENDPOINT_URL=args.s3_endpoint, S3_REGION=os.getenv("S3_REGION") or "us-east-1")
+    else:
+        moto = start_moto_server(args.s3_port)
+
+    opts = {
+        "layout": args.layout,
+        "max_concurrency": args.max_concurrency,
+        "api_latency_ms": args.api_latency_ms,
+        "pg_dsn": args.pg_dsn,
+    }
+    work_dir = Path(args.work_dir or tempfile.mkdtemp(prefix="bench_pipeline_"))
+    work_dir.mkdir(parents=True, exist_ok=True)
+    try:
+        runs = [bench_scale(n, dts, stages, opts, work_dir) for n in scales]
+    finally:
+        if moto is not None:
+            moto.terminate()
+            moto.wait()
+
+    results: dict[str, Any] = {
+        "git_commit": _git_commit(),
+        "config": {
+            "days": args.days,
+            "stages": stages,
+            "layout": args.layout or os.getenv("BRONZE_LAYOUT") or "default",
+            "max_concurrency": args.max_concurrency,
+            "api_latency_ms": args.api_latency_ms,
+            "s3": args.s3_endpoint or "moto",
+            "postgres": bool(args.pg_dsn),
+            "cpus": os.cpu_count(),
+            "work_dir": str(work_dir),
+        },
+        "runs": runs,
+    }
+    if args.baseline:
+        results["vs_baseline"] = compare(results, json.loads(Path(args.baseline).read_text(encoding="utf-8")))
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Silver quality gate: previous pandas check-by-check path vs the Arrow rule engine
+(src/quality/rules.py), on passing tables of growing size. Timings include
+decoding the parquet bytes (pandas vs Arrow), not S3 I/O.
+
+    python -m benchmarks.bench_quality_gate --rows 100000,1000000,5000000
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.quality.silver_checks_daily import QualityConfig, check_tables
+from src.transforms.silver_normalize import DAILY_SCHEMA, LOCATIONS_SCHEMA
+
+DT = "2025-01-01"
+
+
+def make_tables(n: int, seed: int = 7) -> tuple[pa.Table, pa.Table]:
+    rng = np.random.default_rng(seed)
+    ids = pa.array([f"loc_{i:07d}" for i in range(n)])
+    day = pa.array(np.full(n, np.datetime64(DT, "D")))
+    ts = pa.array(np.full(n, np.datetime64("2025-01-02T01:02:03", "us"))).cast(pa.timestamp("us", tz="UTC"))
+    temp = rng.uniform(-20, 30, n)
+    daily = pa.table(
+        {
+            "dt": day,
+            "location_id": ids,
+            "ingested_at": ts,
+            "date": day,
+            "temp_min_c": temp - 5,
+            "temp_max_c": temp + 5,
+            "temp_avg_c": temp,
+            "precip_mm": rng.uniform(0, 10, n),
+            "snow_cm": np.zeros(n),
+            "humidity_avg": rng.uniform(20, 100, n),
+            "wind_max_kph": rng.uniform(0, 60, n),
+            "condition_code": rng.integers(1000, 1300, n),
+            "condition_text": pa.array(["Sunny"] * n),
+        },
+        schema=DAILY_SCHEMA,
+    )
+    locations = pa.table(
+        {
+            "dt": day,
+            "location_id": ids,
+            "name": ids,
+            "region": ids,
+            "country": pa.array(["XX"] * n),
+            "lat": rng.uniform(-60, 70, n),
+            "lon": rng.uniform(-180, 180, n),
+            "tz_id": pa.array(["UTC"] * n),
+            "local_time": pa.array(np.full(n, np.datetime64("2025-01-01T12:00", "us"))),
+            "ingested_at": ts,
+        },
+        schema=LOCATIONS_SCHEMA,
+    )
+    return daily, locations
+
+
+def legacy_checks(dt: str, df_daily: pd.DataFrame, df_loc: pd.DataFrame, cfg: QualityConfig) -> None:
+    """The pre-rule-engine silver_checks_daily.run checks (minus S3 I/O), first failure raises."""
+    for c in ["location_id", "date", "ingested_at"]:
+        assert not int(df_daily[c].isna().sum())
+    for c in ["location_id", "name", "country", "lat", "lon", "tz_id", "ingested_at"]:
+        assert not int(df_loc[c].isna().sum())
+    dt_ts = pd.to_datetime(dt, format="%Y-%m-%d").date()
+    dates = pd.to_datetime(df_daily["date"], errors="coerce").dt.date
+    assert not int(dates.isna().sum())
+    assert not int((dates != dt_ts).sum())
+    assert not int(df_daily.duplicated(subset=["location_id", "date"], keep=False).sum())
+    for c, lo, hi in [
+        ("temp_min_c", cfg.temp_min_c, cfg.temp_max_c),
+        ("temp_max_c", cfg.temp_min_c, cfg.temp_max_c),
+        ("temp_avg_c", cfg.temp_min_c, cfg.temp_max_c),
+        ("humidity_avg", cfg.humidity_min, cfg.humidity_max),
+    ]:
+        s = pd.to_numeric(df_daily[c], errors="coerce")
+        mask = s.notna()
+        assert not int((s[mask] < lo).sum()) and not int((s[mask] > hi).sum())
+    daily_locations = set(df_daily["location_id"].astype(str).tolist())
+    loc_locations = set(df_loc["location_id"].astype(str).tolist())
+    assert len(daily_locations & loc_locations) / len(loc_locations) >= cfg.min_completeness_ratio
+
+
+def bench(n: int) -> dict:
+    cfg = QualityConfig()
+    blobs = []
+    for table in make_tables(n):
+        buf = io.BytesIO()
+        pq.write_table(table, buf)
+        blobs.append(buf.getvalue())
+
+    t0 = time.perf_counter()
+    df_daily, df_loc = (pd.read_parquet(io.BytesIO(b)) for b in blobs)
+    legacy_checks(DT, df_daily, df_loc, cfg)
+    legacy_s = time.perf_counter() - t0
+    del df_daily, df_loc
+
+    t0 = time.perf_counter()
+    daily, locations = (pq.read_table(io.BytesIO(b)) for b in blobs)
+    results = check_tables(DT, daily, locations, cfg)
+    engine_s = time.perf_counter() - t0
+
+    return {
+        "rows": n,
+        "rules": len(results),
+        "legacy_s": round(legacy_s, 3),
+        "rule_engine_s": round(engine_s, 3),
+        "speedup": round(legacy_s / engine_s, 2),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Quality gate benchmark")
+    parser.add_argument("--rows", type=str, default="100000,1000000")
+    args = parser.parse_args()
+
+    print(json.dumps([bench(int(n)) for n in args.rows.split(",")], indent=2))
@@ -0,0 +1,60 @@
+"""
+Per-object overhead of building an S3 client per call vs the cached process-wide client.
+
+Uses moto's in-process S3 mock, so object I/O is cheap and the difference is
+client construction (endpoint resolution, credentials, event hooks).
+
+    python -m benchmarks.bench_s3_client --objects 200
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import time
+
+from moto import mock_aws
+
+BUCKET = "bench-bucket"
+
+
+def bench(n_objects: int) -> dict[str, float]:
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    os.environ.setdefault("S3_REGION", "us-east-1")
+    os.environ.setdefault("S3_ACCESS_KEY", "bench")
+    os.environ.setdefault("S3_SECRET_KEY", "bench")
+    os.environ.pop("S3_ENDPOINT_URL", None)
+
+    from src.common.s3_client import get_s3_client, new_s3_client, reset_s3_client
+
+    with mock_aws():
+        reset_s3_client()
+        s3 = get_s3_client()
+        s3.create_bucket(Bucket=BUCKET)
+        for i in range(n_objects):
+            s3.put_object(Bucket=BUCKET, Key=f"obj/{i}.json", Body=b"{}")
+
+        t0 = time.perf_counter()
+        for i in range(n_objects):
+            new_s3_client().get_object(Bucket=BUCKET, Key=f"obj/{i}.json")["Body"].read()
+        per_call = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        for i in range(n_objects):
+            get_s3_client().get_object(Bucket=BUCKET, Key=f"obj/{i}.json")["Body"].read()
+        cached = time.perf_counter() - t0
+
+    return {
+        "objects": n_objects,
+        "client_per_call_ms_per_object": round(per_call / n_objects * 1000, 3),
+        "cached_client_ms_per_object": round(cached / n_objects * 1000, 3),
+        "saved_ms_per_object": round((per_call - cached) / n_objects * 1000, 3),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="S3 client construction benchmark")
+    parser.add_argument("--objects", type=int, default=200)
+    args = parser.parse_args()
+
+    print(json.dumps(bench(args.objects), indent=2))
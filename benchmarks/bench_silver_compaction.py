@@ -0,0 +1,74 @@
+"""
+Long-range silver scans before and after monthly compaction.
+
+Writes `--days` daily partitions through write_silver_partition (moto's
+in-process S3 mock), runs a full-history scan and a one-location scan with
+read_silver_range, compacts every complete month, and repeats the scans.
+S3 calls are counted per operation with a botocore hook.
+
+    python -m benchmarks.bench_silver_compaction --locations 2000 --days 365
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import time
+from collections import Counter
+from datetime import date, timedelta
+
+from moto import mock_aws
+
+from benchmarks.bench_silver_layout import make_daily
+
+BUCKET = "bench-bucket"
+START = date(2024, 1, 1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--locations", type=int, default=2000)
+    parser.add_argument("--days", type=int, default=365)
+    args = parser.parse_args()
+
+    os.environ.update(S3_ACCESS_KEY="x", S3_SECRET_KEY="y", S3_REGION="us-east-1", AWS_DEFAULT_REGION="us-east-1")
+    os.environ.pop("S3_ENDPOINT_URL", None)
+
+    with mock_aws():
+        from src.common.s3_client import get_s3_client, reset_s3_client
+        from src.transforms.silver_store import read_silver_range, write_silver_compaction, write_silver_partition
+
+        reset_s3_client()
+        s3 = get_s3_client()
+        s3.create_bucket(Bucket=BUCKET)
+        calls: Counter = Counter()
+        s3.meta.events.register("before-call.s3.*", lambda model, **kw: calls.update([model.name]))
+
+        dts = [(START + timedelta(days=i)).isoformat() for i in range(args.days)]
+        for i, dt in enumerate(dts):
+            write_silver_partition(BUCKET, dt, {"weather_daily": make_daily(args.locations, dt, seed=i)})
+
+        def scan(**kw) -> dict:
+            calls.clear()
+            stats: dict[str, int] = {}
+            t0 = time.perf_counter()
+            rows = read_silver_range(BUCKET, "weather_daily", dts[0], dts[-1], stats=stats, **kw).num_rows
+            return {"rows": rows, "s": round(time.perf_counter() - t0, 3), "s3_calls": dict(calls), **stats}
+
+        one = {"locations": ["loc_000123"], "columns": ["date", "temp_avg_c"]}
+        results = {"daily": {"full": scan(), "one_location": scan(**one)}}
+
+        months = sorted({dt[:7] for dt in dts})[:-1] or sorted({dt[:7] for dt in dts})
+        t0 = time.perf_counter()
+        for month in months:
+            write_silver_compaction(BUCKET, "weather_daily", month)
+        compact_s = time.perf_counter() - t0
+
+        results["compacted"] = {"full": scan(), "one_location": scan(**one)}
+        results["compaction"] = {"months": len(months), "s": round(compact_s, 3)}
+
+    print(json.dumps({"locations": args.locations, "days": args.days, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Bronze -> silver hourly: a per-hour Python loop into a DataFrame vs the
+chunked Arrow conversion (silver_normalize.HourlyColumnsBuilder), and the
+parquet bytes of the resulting table under a few layouts: float64/int64 vs the
+float32/int16 schema, unsorted vs sorted by (location_id, time_epoch), and
+location_id plain vs dictionary-encoded.
+
+Payloads are distinct per record (the sizes depend on the measures), so the
+record count is kept moderate.
+
+    python -m benchmarks.bench_silver_hourly --records 5000
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import time
+from typing import Any
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from benchmarks.bench_silver_normalize import DT, make_records
+from src.common.silver_format import PLAIN_COLUMNS, write_options
+from src.transforms.silver_normalize import HOURLY_SCHEMA, HourlyColumnsBuilder
+
+_WIDE = {pa.float32(): pa.float64(), pa.int16(): pa.int64()}
+
+
+def loop_normalize(dt: str, records: list[dict[str, Any]]) -> pd.DataFrame:
+    """One dict per hour, then pandas coercion: the straightforward implementation."""
+    rows: list[dict[str, Any]] = []
+    for record in records:
+        metadata = record.get("metadata", {}) or {}
+        forecastday = ((record.get("payload", {}) or {}).get("forecast", {}) or {}).get("forecastday", []) or []
+        if not forecastday:
+            continue
+        fd0 = forecastday[0] or {}
+        for h in fd0.get("hour", []) or []:
+            cond = h.get("condition", {}) or {}
+            row = {
+                "dt": dt,
+                "location_id": metadata.get("location_id"),
+                "ingested_at": metadata.get("ingested_at"),
+                "date": fd0.get("date"),
+                "hour": (h.get("time") or "")[11:13],
+                "condition_code": cond.get("code"),
+                "condition_text": cond.get("text"),
+            }
+            for f in HOURLY_SCHEMA:
+                if f.name not in row:
+                    row[f.name] = h.get(f.name)
+            rows.append(row)
+
+    df = pd.DataFrame(rows)
+    df["dt"] = pd.to_datetime(df["dt"]).dt.date
+    df["date"] = pd.to_datetime(df["date"]).dt.date
+    df["ingested_at"] = pd.to_datetime(df["ingested_at"], errors="coerce", utc=True)
+    for f in HOURLY_SCHEMA:
+        if pa.types.is_floating(f.type) or pa.types.is_integer(f.type):
+            df[f.name] = pd.to_numeric(df[f.name], errors="coerce")
+    df = df.drop_duplicates(subset=["location_id", "time_epoch"], keep="last")
+    return df.sort_values(["location_id", "time_epoch"])
+
+
+def arrow_normalize(dt: str, records: list[dict[str, Any]]) -> pa.Table:
+    builder = HourlyColumnsBuilder(dt)
+    for r in records:
+        builder.add(r)
+    return builder.hourly_table()
+
+
+def parquet_bytes(table: pa.Table, plain: tuple[str, ...] | None = None) -> int:
+    opts = write_options("weather_hourly", table.schema)
+    if plain is not None:
+        opts["use_dictionary"] = [c for c in table.schema.names if c not in plain]
+    buf = io.BytesIO()
+    pq.write_table(table, buf, **opts)
+    return buf.tell()
+
+
+def _time(fn) -> tuple[float, Any]:
+    t0 = time.perf_counter()
+    out = fn()
+    return time.perf_counter() - t0, out
+
+
+def bench(n_records: int) -> dict:
+    records = make_records(n_records, distinct_payloads=n_records)
+    loop_s, _ = _time(lambda: loop_normalize(DT, records))
+    arrow_s, table = _time(lambda: arrow_normalize(DT, records))
+
+    wide = table.cast(pa.schema([f.with_type(_WIDE.get(f.type, f.type)) for f in table.schema]))
+    unsorted = table.take(pa.array(np.random.default_rng(0).permutation(table.num_rows)))
+    default_plain = PLAIN_COLUMNS["weather_hourly"]
+    return {
+        "records": n_records,
+        "rows": table.num_rows,
+        "python_loop_s": round(loop_s, 3),
+        "arrow_chunked_s": round(arrow_s, 3),
+        "speedup": round(loop_s / arrow_s, 2),
+        "arrow_table_bytes": table.nbytes,
+        "arrow_table_bytes_64bit": wide.nbytes,
+        "parquet_bytes": {
+            "float32_int16_sorted": parquet_bytes(table),
+            "float64_int64_sorted": parquet_bytes(wide),
+            "float32_int16_unsorted": parquet_bytes(unsorted),
+            "location_id_dictionary": parquet_bytes(table, tuple(c for c in default_plain if c != "location_id")),
+            "location_id_plain": parquet_bytes(table, tuple(set(default_plain) | {"location_id"})),
+        },
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Silver hourly normalization / layout benchmark")
+    parser.add_argument("--records", type=int, default=5_000)
+    args = parser.parse_args()
+
+    print(json.dumps(bench(args.records), indent=2))
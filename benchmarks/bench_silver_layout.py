@@ -0,0 +1,136 @@
+"""
+Silver file layout: previous writer (DataFrame.to_parquet defaults: unsorted,
+snappy, one row group, dictionary on every column) vs the silver_format layout
+(sorted by location_id/date, zstd, sized row groups, no dictionary on unique
+columns), and what read_silver_range fetches for a full scan, a narrow
+analytic pull (`--pick` locations spread over the id range, 3 columns) and a
+single location.
+
+Uses moto's in-process S3 mock; "bytes_fetched" / "requests" are what the
+ranged GETs would cost against real S3.
+
+    python -m benchmarks.bench_silver_layout --locations 50000 --days 7
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import os
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pyarrow as pa
+from moto import mock_aws
+
+from benchmarks.synthetic import CONDITIONS
+from src.common.silver_format import legacy_silver_key
+from src.transforms.silver_normalize import DAILY_SCHEMA
+
+BUCKET = "bench-bucket"
+START = date(2025, 1, 1)
+
+
+def make_daily(n: int, dt: str, seed: int) -> pa.Table:
+    rng = np.random.default_rng(seed)
+    day = pa.array(np.full(n, np.datetime64(dt, "D")))
+    ts = pa.array(np.full(n, np.datetime64(f"{dt}T23:05:00", "us"))).cast(pa.timestamp("us", tz="UTC"))
+    temp = np.round(rng.uniform(-20, 30, n), 1)
+    cond = rng.integers(0, len(CONDITIONS), n)
+    order = rng.permutation(n)  # bronze listing order is not location order
+    return pa.table(
+        {
+            "dt": day,
+            "location_id": pa.array([f"loc_{i:06d}" for i in order]),
+            "ingested_at": ts,
+            "date": day,
+            "temp_min_c": temp - 5,
+            "temp_max_c": temp + 5,
+            "temp_avg_c": temp,
+            "precip_mm": np.round(rng.exponential(2, n), 1),
+            "snow_cm": np.zeros(n),
+            "humidity_avg": rng.integers(20, 100, n).astype("float64"),
+            "wind_max_kph": np.round(rng.uniform(0, 60, n), 1),
+            "condition_code": pa.array([CONDITIONS[c][0] for c in cond], pa.int64()),
+            "condition_text": pa.array([CONDITIONS[c][1] for c in cond]),
+        },
+        schema=DAILY_SCHEMA,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--locations", type=int, default=50000)
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--pick", type=int, default=10, help="Locations in the narrow pull")
+    args = parser.parse_args()
+
+    os.environ.update(S3_ACCESS_KEY="x", S3_SECRET_KEY="y", S3_REGION="us-east-1", AWS_DEFAULT_REGION="us-east-1")
+    os.environ.pop("S3_ENDPOINT_URL", None)
+
+    with mock_aws():
+        from src.common.s3_client import get_s3_client, reset_s3_client
+        from src.transforms.silver_store import read_silver_range, write_silver_partition
+
+        reset_s3_client()
+        s3 = get_s3_client()
+        dts = [(START + timedelta(days=i)).isoformat() for i in range(args.days)]
+        tables = {dt: make_daily(args.locations, dt, seed=i) for i, dt in enumerate(dts)}
+
+        results: dict[str, dict] = {}
+        for layout in ("legacy", "silver_format"):
+            bucket = f"{BUCKET}-{layout.replace('_', '-')}"
+            s3.create_bucket(Bucket=bucket)
+            t0 = time.perf_counter()
+            size = 0
+            for dt, table in tables.items():
+                if layout == "legacy":
+                    buf = io.BytesIO()
+                    table.to_pandas().to_parquet(buf, index=False)
+                    s3.put_object(Bucket=bucket, Key=legacy_silver_key("weather_daily", dt), Body=buf.getvalue())
+                    size += buf.tell()
+                else:
+                    m = write_silver_partition(bucket, dt, {"weather_daily": table})
+                    size += sum(f["bytes"] for f in m["datasets"]["weather_daily"]["files"])
+            write_s = time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            full: dict[str, int] = {}
+            n_full = read_silver_range(bucket, "weather_daily", dts[0], dts[-1], stats=full).num_rows
+            full_s = time.perf_counter() - t0
+
+            picks = [f"loc_{i:06d}" for i in range(0, args.locations, max(1, args.locations // args.pick))][: args.pick]
+            t0 = time.perf_counter()
+            narrow: dict[str, int] = {}
+            n_narrow = read_silver_range(
+                bucket,
+                "weather_daily",
+                dts[0],
+                dts[-1],
+                locations=picks,
+                columns=["location_id", "date", "temp_avg_c"],
+                stats=narrow,
+            ).num_rows
+            narrow_s = time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            single: dict[str, int] = {}
+            n_single = read_silver_range(
+                bucket, "weather_daily", dts[0], dts[-1], locations=[picks[-1]], columns=["temp_avg_c"], stats=single
+            ).num_rows
+            single_s = time.perf_counter() - t0
+
+            results[layout] = {
+                "bytes": size,
+                "write_s": round(write_s, 3),
+                "full_read": {"rows": n_full, "s": round(full_s, 3), **full},
+                "narrow_read": {"rows": n_narrow, "s": round(narrow_s, 3), **narrow},
+                "single_location": {"rows": n_single, "s": round(single_s, 3), **single},
+            }
+
+    print(json.dumps({"locations": args.locations, "days": args.days, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
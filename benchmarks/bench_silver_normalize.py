@@ -0,0 +1,149 @@
+"""
+Bronze -> silver normalization: previous row-dict + pandas re-cast path vs the
+Arrow column builder (src/transforms/silver_normalize.py), including parquet encode.
+
+Records share a pool of synthetic payloads (normalization only touches `location`
+and `forecastday[0].day`), so 100k records fit comfortably in memory.
+
+    python -m benchmarks.bench_silver_normalize --records 100000
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import time
+from typing import Any
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from benchmarks.synthetic import make_history_payload, make_locations
+from src.transforms.silver_normalize import SilverColumnsBuilder
+
+DT = "2025-01-01"
+
+
+def make_records(n: int, distinct_payloads: int = 1000) -> list[dict[str, Any]]:
+    locs = make_locations(min(n, distinct_payloads))
+    payloads = [make_history_payload(loc, DT) for loc in locs]
+    return [
+        {
+            "metadata": {"dt": DT, "location_id": f"loc_{i:07d}", "ingested_at": "2025-01-02T01:02:03.456789+00:00"},
+            "payload": payloads[i % len(payloads)],
+        }
+        for i in range(n)
+    ]
+
+
+def legacy_normalize(dt: str, records: list[dict[str, Any]]) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """The pre-Arrow implementation of bronze_to_silver_daily.run (minus S3 I/O)."""
+    daily_rows: list[dict[str, Any]] = []
+    location_rows: list[dict[str, Any]] = []
+    for record in records:
+        metadata = record.get("metadata", {}) or {}
+        payload = record.get("payload", {}) or {}
+        location_id = metadata.get("location_id")
+        ingested_at = metadata.get("ingested_at")
+        loc = payload.get("location", {}) or {}
+        location_rows.append(
+            {
+                "dt": dt,
+                "location_id": location_id,
+                "name": loc.get("name"),
+                "region": loc.get("region"),
+                "country": loc.get("country"),
+                "lat": loc.get("lat"),
+                "lon": loc.get("lon"),
+                "tz_id": loc.get("tz_id"),
+                "local_time": loc.get("local_time"),
+                "ingested_at": ingested_at,
+            }
+        )
+        forecastday = (payload.get("forecast", {}) or {}).get("forecastday", []) or []
+        if not forecastday:
+            continue
+        fd0 = forecastday[0] or {}
+        day = fd0.get("day", {}) or {}
+        cond = day.get("condition", {}) or {}
+        daily_rows.append(
+            {
+                "dt": dt,
+                "location_id": location_id,
+                "ingested_at": ingested_at,
+                "date": fd0.get("date"),
+                "temp_min_c": day.get("mintemp_c"),
+                "temp_max_c": day.get("maxtemp_c"),
+                "temp_avg_c": day.get("avgtemp_c"),
+                "precip_mm": day.get("totalprecip_mm"),
+                "snow_cm": day.get("totalsnow_cm"),
+                "humidity_avg": day.get("avghumidity"),
+                "wind_max_kph": day.get("maxwind_kph"),
+                "condition_code": cond.get("code"),
+                "condition_text": cond.get("text"),
+            }
+        )
+
+    df_daily = pd.DataFrame(daily_rows)
+    df_locations = pd.DataFrame(location_rows)
+    df_daily["dt"] = pd.to_datetime(df_daily["dt"]).dt.date
+    df_daily["date"] = pd.to_datetime(df_daily["date"]).dt.date
+    df_daily["ingested_at"] = pd.to_datetime(df_daily["ingested_at"], errors="coerce", utc=True)
+    for col in ["temp_min_c", "temp_max_c", "temp_avg_c", "precip_mm", "snow_cm", "wind_max_kph", "humidity_avg"]:
+        df_daily[col] = pd.to_numeric(df_daily[col], errors="coerce")
+    df_daily["condition_code"] = pd.to_numeric(df_daily["condition_code"], errors="coerce").astype("Int64")
+    df_locations["dt"] = pd.to_datetime(df_locations["dt"]).dt.date
+    df_locations["ingested_at"] = pd.to_datetime(df_locations["ingested_at"], errors="coerce", utc=True)
+    df_locations["lat"] = pd.to_numeric(df_locations["lat"], errors="coerce")
+    df_locations["lon"] = pd.to_numeric(df_locations["lon"], errors="coerce")
+    df_locations["local_time"] = pd.to_datetime(df_locations["local_time"], errors="coerce")
+    df_daily = df_daily.drop_duplicates(subset=["location_id", "date"], keep="last")
+    df_locations = df_locations.drop_duplicates(subset=["location_id"], keep="last")
+    return df_daily, df_locations
+
+
+def _time(fn) -> tuple[float, Any]:
+    t0 = time.perf_counter()
+    out = fn()
+    return time.perf_counter() - t0, out
+
+
+def bench(n_records: int) -> dict:
+    records = make_records(n_records)
+
+    def legacy() -> int:
+        df_daily, df_loc = legacy_normalize(DT, records)
+        size = 0
+        for df in (df_daily, df_loc):
+            buf = io.BytesIO()
+            df.to_parquet(buf, index=False)
+            size += buf.tell()
+        return size
+
+    def arrow() -> int:
+        builder = SilverColumnsBuilder(DT)
+        for r in records:
+            builder.add(r)
+        size = 0
+        for tbl in (builder.daily_table(), builder.locations_table()):
+            buf = io.BytesIO()
+            pq.write_table(tbl, buf)
+            size += buf.tell()
+        return size
+
+    legacy_s, _ = _time(legacy)
+    arrow_s, _ = _time(arrow)
+    return {
+        "records": n_records,
+        "legacy_pandas_s": round(legacy_s, 3),
+        "arrow_builder_s": round(arrow_s, 3),
+        "speedup": round(legacy_s / arrow_s, 2),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Silver normalization benchmark")
+    parser.add_argument("--records", type=int, default=100_000)
+    args = parser.parse_args()
+
+    print(json.dumps(bench(args.records), indent=2))
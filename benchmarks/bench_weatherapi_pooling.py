@@ -0,0 +1,94 @@
+"""
+Per-request latency of WeatherAPI history calls with and without connection pooling.
+
+Runs against a local stub HTTP/1.1 server (keep-alive capable), so numbers reflect
+client-side connection setup cost rather than the provider. TLS handshakes are not
+included here; against the real HTTPS endpoint the gap is larger.
+
+    python -m benchmarks.bench_weatherapi_pooling --requests 500
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from src.ingestion.rate_limiter import RateLimiter
+from src.ingestion.weatherapi_client import WeatherApiClient
+
+STUB_PAYLOAD = json.dumps(
+    {
+        "location": {"name": "Stub", "lat": 0.0, "lon": 0.0, "tz_id": "UTC"},
+        "forecast": {"forecastday": [{"date": "2025-01-01", "day": {"avgtemp_c": 1.0}, "hour": []}]},
+    }
+).encode("utf-8")
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # send headers+body in one segment; otherwise Nagle/delayed-ACK adds ~40ms on reused connections
+    wbufsize = 64 * 1024
+    disable_nagle_algorithm = True
+
+    def do_GET(self) -> None:  # noqa: N802
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(STUB_PAYLOAD)))
+        self.end_headers()
+        self.wfile.write(STUB_PAYLOAD)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+def start_stub_server() -> tuple[ThreadingHTTPServer, str]:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+def _summary(latencies_s: list[float]) -> dict[str, float]:
+    ms = sorted(x * 1000 for x in latencies_s)
+    return {
+        "mean_ms": round(statistics.fmean(ms), 3),
+        "p50_ms": round(ms[len(ms) // 2], 3),
+        "p95_ms": round(ms[int(len(ms) * 0.95) - 1], 3),
+    }
+
+
+def bench(n_requests: int) -> dict[str, dict[str, float]]:
+    server, base_url = start_stub_server()
+    params = {"key": "bench", "q": "0,0", "dt": "2025-01-01", "aqi": "no", "alerts": "no"}
+    try:
+        # baseline: bare requests.get -> new connection per call
+        unpooled = []
+        for _ in range(n_requests):
+            t0 = time.perf_counter()
+            requests.get(f"{base_url}/history.json", params=params, timeout=30).json()
+            unpooled.append(time.perf_counter() - t0)
+
+        pooled = []
+        with WeatherApiClient(
+            base_url=base_url, api_key="bench", rate_limiter=RateLimiter(max_rps=0)
+        ) as client:
+            for _ in range(n_requests):
+                t0 = time.perf_counter()
+                client.fetch_history(0.0, 0.0, "2025-01-01")
+                pooled.append(time.perf_counter() - t0)
+    finally:
+        server.shutdown()
+
+    return {"unpooled": _summary(unpooled), "pooled": _summary(pooled)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="WeatherAPI client pooling benchmark")
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+
+    print(json.dumps(bench(args.requests), indent=2))
@@ -0,0 +1,169 @@
+"""
+Deterministic synthetic WeatherAPI history payloads and bronze records.
+
+Shapes follow the real history.json response (location + forecastday[0] with
+`day`, `astro` and 24 `hour` entries), so sizes and parse costs are realistic.
+"""
+from __future__ import annotations
+
+import random
+import zlib
+from datetime import date, datetime, timedelta, timezone
+from typing import Any
+
+CONDITIONS = [
+    (1000, "Sunny"),
+    (1003, "Partly cloudy"),
+    (1006, "Cloudy"),
+    (1009, "Overcast"),
+    (1063, "Patchy rain possible"),
+    (1183, "Light rain"),
+    (1213, "Light snow"),
+    (1276, "Moderate or heavy rain with thunder"),
+]
+WIND_DIRS = ["N", "NNE", "NE", "ENE", "E", "ESE", "SE", "SSE", "S", "SSW", "SW", "WSW", "W", "WNW", "NW", "NNW"]
+
+
+def location_id(i: int) -> str:
+    return f"loc_{i:06d}"
+
+
+def make_locations(n: int, seed: int = 7) -> list[dict[str, Any]]:
+    rnd = random.Random(seed)
+    return [
+        {
+            "location_id": location_id(i),
+            "name": f"City {i}",
+            "country": "XX",
+            "region": f"Region {i % 50}",
+            "lat": round(rnd.uniform(-60, 70), 4),
+            "lon": round(rnd.uniform(-180, 180), 4),
+            "tz": "UTC",
+        }
+        for i in range(n)
+    ]
+
+
+def _condition(rnd: random.Random) -> dict[str, Any]:
+    code, text = rnd.choice(CONDITIONS)
+    return {"text": text, "icon": f"//cdn.weatherapi.com/weather/64x64/day/{code % 1000}.png", "code": code}
+
+
+def make_history_payload(loc: dict[str, Any], dt: str, seed: int | None = None) -> dict[str, Any]:
+    rnd = random.Random(seed if seed is not None else zlib.crc32(f"{loc['location_id']}|{dt}".encode()))
+    d = date.fromisoformat(dt)
+    day_start = datetime(d.year, d.month, d.day, tzinfo=timezone.utc)
+    base_t = rnd.uniform(-15, 30)
+
+    hours = []
+    for h in range(24):
+        t = round(base_t + 6 * rnd.uniform(-1, 1), 1)
+        wind_kph = round(rnd.uniform(0, 40), 1)
+        ts = day_start + timedelta(hours=h)
+        hours.append(
+            {
+                "time_epoch": int(ts.timestamp()),
+                "time": ts.strftime("%Y-%m-%d %H:%M"),
+                "temp_c": t,
+                "temp_f": round(t * 9 / 5 + 32, 1),
+                "is_day": int(6 <= h < 20),
+                "condition": _condition(rnd),
+                "wind_mph": round(wind_kph / 1.609, 1),
+                "wind_kph": wind_kph,
+                "wind_degree": rnd.randint(0, 359),
+                "wind_dir": rnd.choice(WIND_DIRS),
+                "pressure_mb": float(rnd.randint(990, 1035)),
+                "pressure_in": round(rnd.uniform(29.2, 30.6), 2),
+                "precip_mm": round(max(0.0, rnd.gauss(0.1, 0.5)), 2),
+                "precip_in": 0.0,
+                "snow_cm": 0.0,
+                "humidity": rnd.randint(20, 100),
+                "cloud": rnd.randint(0, 100),
+                "feelslike_c": round(t - rnd.uniform(0, 4), 1),
+                "feelslike_f": round((t - 2) * 9 / 5 + 32, 1),
+                "windchill_c": round(t - rnd.uniform(0, 4), 1),
+                "windchill_f": round((t - 2) * 9 / 5 + 32, 1),
+                "heatindex_c": round(t + rnd.uniform(0, 2), 1),
+                "heatindex_f": round((t + 1) * 9 / 5 + 32, 1),
+                "dewpoint_c": round(t - rnd.uniform(1, 10), 1),
+                "dewpoint_f": round((t - 5) * 9 / 5 + 32, 1),
+                "will_it_rain": rnd.randint(0, 1),
+                "chance_of_rain": rnd.randint(0, 100),
+                "will_it_snow": 0,
+                "chance_of_snow": 0,
+                "vis_km": 10.0,
+                "vis_miles": 6.0,
+                "gust_mph": round(wind_kph / 1.2, 1),
+                "gust_kph": round(wind_kph * 1.3, 1),
+                "uv": float(rnd.randint(0, 9)),
+            }
+        )
+
+    temps = [x["temp_c"] for x in hours]
+    return {
+        "location": {
+            "name": loc.get("name", loc["location_id"]),
+            "region": loc.get("region", ""),
+            "country": loc.get("country", ""),
+            "lat": loc["lat"],
+            "lon": loc["lon"],
+            "tz_id": loc.get("tz", "UTC"),
+            "localtime_epoch": int(day_start.timestamp()) + 86400,
+            "localtime": (day_start + timedelta(days=1)).strftime("%Y-%m-%d %H:%M"),
+        },
+        "forecast": {
+            "forecastday": [
+                {
+                    "date": dt,
+                    "date_epoch": int(day_start.timestamp()),
+                    "day": {
+                        "maxtemp_c": max(temps),
+                        "maxtemp_f": round(max(temps) * 9 / 5 + 32, 1),
+                        "mintemp_c": min(temps),
+                        "mintemp_f": round(min(temps) * 9 / 5 + 32, 1),
+                        "avgtemp_c": round(sum(temps) / 24, 1),
+                        "avgtemp_f": round(sum(temps) / 24 * 9 / 5 + 32, 1),
+                        "maxwind_mph": round(max(x["wind_mph"] for x in hours), 1),
+                        "maxwind_kph": round(max(x["wind_kph"] for x in hours), 1),
+                        "totalprecip_mm": round(sum(x["precip_mm"] for x in hours), 2),
+                        "totalprecip_in": 0.0,
+                        "totalsnow_cm": 0.0,
+                        "avgvis_km": 10.0,
+                        "avgvis_miles": 6.0,
+                        "avghumidity": round(sum(x["humidity"] for x in hours) / 24),
+                        "daily_will_it_rain": 1,
+                        "daily_chance_of_rain": 80,
+                        "daily_will_it_snow": 0,
+                        "daily_chance_of_snow": 0,
+                        "condition": _condition(rnd),
+                        "uv": 3.0,
+                    },
+                    "astro": {
+                        "sunrise": "07:51 AM",
+                        "sunset": "04:32 PM",
+                        "moonrise": "09:12 AM",
+                        "moonset": "05:40 PM",
+                        "moon_phase": "Waxing Crescent",
+                        "moon_illumination": 12,
+                    },
+                    "hour": hours,
+                }
+            ]
+        },
+    }
+
+
+def make_bronze_record(loc: dict[str, Any], dt: str, ingested_at: str | None = None) -> dict[str, Any]:
+    """Bronze record exactly as write_bronze stores it: metadata + raw payload."""
+    return {
+        "metadata": {
+            "dt": dt,
+            "location_id": loc["location_id"],
+            "location_name": loc.get("name", loc["location_id"]),
+            "ingested_at": ingested_at or datetime.now(timezone.utc).isoformat(),
+            "source": "weatherapi",
+            "api_version": "v1",
+            "request": {"q": f"{loc['lat']},{loc['lon']}", "endpoint": "history.json"},
+        },
+        "payload": make_history_payload(loc, dt),
+    }
@@ -0,0 +1,97 @@
+{#
+  Incremental window shared by fact_weather_daily and the marts built on it.
+
+  A run reprocesses:
+    - rows loaded since the model's previous run (loaded_at above the model's own
+      max(loaded_at)): late-arriving dts and reruns, however old
+    - the trailing `incremental_lookback_days` (default 30) of data, always; this
+      also catches rows committed while the previous run was reading
+
+  Everything is driven by indexed columns (loaded_at, date/dt), so the cost of a
+  nightly run depends on the window, not on the length of the history.
+#}
+
+{% macro incremental_lookback_days() -%}
+  {{ var('incremental_lookback_days', 30) }}
+{%- endmacro %}
+
+
+{#
+  (watermark, window_start) as literals, resolved when the model is compiled: with
+  literal bounds the planner uses the loaded_at / date indexes (a subquery bound is
+  estimated generically and turns into a full scan).
+#}
+{% macro incremental_bounds(relation, date_column='date') -%}
+  {%- if not execute -%}
+    {{ return(('-infinity', '-infinity')) }}
+  {%- endif -%}
+  {%- set query -%}
+    select
+      (select coalesce(max(loaded_at), '-infinity'::timestamptz) from {{ this }})::text,
+      coalesce(((select max({{ date_column }}) from {{ relation }}) - {{ incremental_lookback_days() }})::text, '-infinity')
+  {%- endset -%}
+  {%- set row = run_query(query).rows[0] -%}
+  {{ return((row[0], row[1])) }}
+{%- endmacro %}
+
+
+{% macro incremental_window_filter(relation, alias=none, date_column='date') -%}
+  {%- set p = alias ~ '.' if alias else '' -%}
+  {%- set watermark, window_start = incremental_bounds(relation, date_column) -%}
+  (
+    {{ p }}loaded_at > '{{ watermark }}'::timestamptz
+    or {{ p }}{{ date_column }} >= '{{ window_start }}'::date
+  )
+{%- endmacro %}
+
+
+{# (location_id, from_date): earliest date per location whose rows are in the window #}
+{% macro incremental_changed_from(relation) -%}
+  select
+    location_id,
+    min(date) as from_date
+  from {{ relation }}
+  where {{ incremental_window_filter(relation) }}
+  group by location_id
+{%- endmacro %}
+
+
+{#
+  post_hook: delete+insert only replaces keys present in the new batch, so keys
+  that disappeared upstream (a dt rerun that dropped a location) are removed here,
+  within the lookback window (a no-op after a full build). Older deletions need
+  --full-refresh. grain='month' is for models keyed on (location_id, month).
+#}
+{% macro delete_missing_keys(reference, reference_date_column='date', grain='day') %}
+  {#- literal bound (as in incremental_bounds) on both sides keeps the delete on the date indexes -#}
+  {%- set since = "'-infinity'::date" -%}
+  {%- if execute -%}
+    {%- set query -%}
+      select coalesce((max({{ reference_date_column }}) - {{ incremental_lookback_days() }})::text, 'infinity')
+      from {{ reference }}
+    {%- endset -%}
+    {%- set since = "'" ~ run_query(query).rows[0][0] ~ "'::date" -%}
+  {%- endif -%}
+  {%- if grain == 'month' %}
+  delete from {{ this }} t
+  where t.month >= date_trunc('month', {{ since }})
+    and not exists (
+      select 1
+      from {{ reference }} r
+      where r.location_id = t.location_id
+        and r.{{ reference_date_column }} >= date_trunc('month', {{ since }})
+        and r.date >= t.month
+        and r.date < t.month + interval '1 month'
+    )
+  {%- else %}
+  delete from {{ this }} t
+  where t.date >= {{ since }}
+    and not exists (
+      select 1
+      from {{ reference }} r
+      where r.location_id = t.location_id
+        and r.{{ reference_date_column }} >= {{ since }}
+        and r.date = t.date
+    )
+  {%- endif %}
+{% endmacro %}
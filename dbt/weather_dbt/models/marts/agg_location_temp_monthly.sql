@@ -0,0 +1,57 @@
+{#
+  Per (location, month) count / sum / sum of squares of temp_avg_c, the running
+  aggregate behind mart_anomalies. Only months with rows in the incremental
+  window are recomputed; a changed or deleted day is corrected by recomputing
+  its month from the fact, so no old values have to be subtracted.
+#}
+{{
+  config(
+    materialized='incremental',
+    unique_key=['location_id', 'month'],
+    incremental_strategy='delete+insert',
+    indexes=[
+      {'columns': ['location_id', 'month'], 'unique': True},
+      {'columns': ['loaded_at']},
+    ],
+    post_hook=["{{ delete_missing_keys(ref('fact_weather_daily'), grain='month') }}"]
+  )
+}}
+
+{% if is_incremental() %}
+with touched as (
+  select distinct
+    location_id,
+    date_trunc('month', date)::date as month
+  from {{ ref('fact_weather_daily') }}
+  where {{ incremental_window_filter(ref('fact_weather_daily')) }}
+),
+
+source as (
+  select f.*
+  from touched t
+  cross join lateral (
+    select location_id, date, temp_avg_c, loaded_at
+    from {{ ref('fact_weather_daily') }}
+    where location_id = t.location_id
+      and date >= t.month
+      and date < t.month + interval '1 month'
+  ) f
+)
+{% else %}
+with source as (
+  select location_id, date, temp_avg_c, loaded_at
+  from {{ ref('fact_weather_daily') }}
+)
+{% endif %}
+
+select
+  location_id,
+  date_trunc('month', date)::date as month,
+
+  count(temp_avg_c) as temp_n,
+  sum(temp_avg_c) as temp_sum,
+  sum(temp_avg_c * temp_avg_c) as temp_sum_sq,
+
+  max(loaded_at) as loaded_at
+from source
+group by 1, 2
@@ -1,3 +1,21 @@
+{{
+  config(
+    materialized='incremental',
+    unique_key=['location_id', 'date'],
+    incremental_strategy='delete+insert',
+    on_schema_change='append_new_columns',
+    indexes=[
+      {'columns': ['location_id', 'date'], 'unique': True},
+      {'columns': ['date']},
+      {'columns': ['loaded_at']},
+    ],
+    post_hook=[
+      "{{ delete_missing_keys(ref('stg_weather_daily'), 'dt') }}",
+      "analyze {{ this }}",
+    ]
+  )
+}}
+
 select
   w.location_id,
   w.date,
@@ -12,5 +30,11 @@ select
   w.condition_code,
   w.condition_text,
 
-  w.ingested_at
-from {{ ref('stg_weather_daily') }}  
\ No newline at end of file
+  w.ingested_at,
+  w.loaded_at
+from {{ ref('stg_weather_daily') }} w
+{% if is_incremental() %}
+-- staging is indexed on dt and loaded_at (date == dt by contract); the analyze
+-- hook keeps the marts' window filters on this table on its indexes
+where {{ incremental_window_filter(ref('stg_weather_daily'), 'w', 'dt') }}
+{% endif %}
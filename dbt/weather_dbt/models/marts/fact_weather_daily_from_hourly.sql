@@ -0,0 +1,110 @@
+{#
+  Daily aggregates computed from the hourly grain, independent of the
+  provider's `day` summary (fact_weather_daily). hours_observed tells complete
+  days (24) from partial ones. Incrementally, every (location, date) with an
+  hour in the window is recomputed from all of its hours.
+#}
+{{
+  config(
+    materialized='incremental',
+    unique_key=['location_id', 'date'],
+    incremental_strategy='delete+insert',
+    on_schema_change='append_new_columns',
+    indexes=[
+      {'columns': ['location_id', 'date'], 'unique': True},
+      {'columns': ['date']},
+      {'columns': ['loaded_at']},
+    ],
+    post_hook=["{{ delete_missing_keys(ref('stg_weather_hourly'), 'dt') }}"]
+  )
+}}
+
+{% if is_incremental() %}
+{%- set watermark, window_start = incremental_bounds(ref('stg_weather_hourly'), 'dt') %}
+-- the window of incremental_window_filter, split so that each part stays on an
+-- index: every hour of the trailing window by dt (date == dt by contract), plus
+-- all hours of the older location-days touched by a late load
+with late as (
+  select distinct
+    location_id,
+    date
+  from {{ ref('stg_weather_hourly') }}
+  where loaded_at > '{{ watermark }}'::timestamptz
+    and dt < '{{ window_start }}'::date
+),
+
+hourly as (
+  select *
+  from {{ ref('stg_weather_hourly') }}
+  where dt >= '{{ window_start }}'::date
+
+  union all
+
+  select h.*
+  from late t
+  -- the hours of a local date lie within [date - 1 day, date + 2 days) in UTC,
+  -- so each key is a range scan of the (location_id, time_epoch) primary key
+  cross join lateral (
+    select *
+    from {{ ref('stg_weather_hourly') }}
+    where location_id = t.location_id
+      and time_epoch >= ((t.date - 1) - date '1970-01-01')::bigint * 86400
+      and time_epoch < ((t.date + 2) - date '1970-01-01')::bigint * 86400
+      and date = t.date
+  ) h
+),
+{% else %}
+with hourly as (
+  select *
+  from {{ ref('stg_weather_hourly') }}
+),
+{% endif %}
+
+-- one pass over the hours: partial aggregates per (day, condition), rolled up
+-- per day below, where the most frequent condition is picked from the parts
+by_condition as (
+  select
+    location_id,
+    date,
+    condition_code,
+    condition_text,
+    count(*) as hours,
+    min(dt) as dt,
+    -- real -> numeric first: sums and averages of the stored (1-2 decimal) values
+    min(temp_c) as temp_min_c,
+    max(temp_c) as temp_max_c,
+    sum(temp_c::numeric) as temp_sum,
+    count(temp_c) as temp_n,
+    sum(precip_mm::numeric) as precip_mm,
+    sum(snow_cm::numeric) as snow_cm,
+    sum(humidity) as humidity_sum,
+    count(humidity) as humidity_n,
+    max(wind_kph) as wind_max_kph,
+    max(gust_kph) as gust_max_kph,
+    max(loaded_at) as loaded_at
+  from hourly
+  group by location_id, date, condition_code, condition_text
+)
+
+select
+  location_id,
+  date,
+  min(dt) as dt,
+  sum(hours)::bigint as hours_observed,
+
+  min(temp_min_c)::numeric as temp_min_c,
+  max(temp_max_c)::numeric as temp_max_c,
+  sum(temp_sum) / nullif(sum(temp_n), 0) as temp_avg_c,
+  sum(precip_mm) as precip_mm,
+  sum(snow_cm) as snow_cm,
+  sum(humidity_sum)::numeric / nullif(sum(humidity_n), 0) as humidity_avg,
+  max(wind_max_kph)::numeric as wind_max_kph,
+  max(gust_max_kph)::numeric as gust_max_kph,
+
+  -- most frequent hourly condition of the day (ties: lowest code)
+  (array_agg(condition_code order by hours desc, condition_code, condition_text))[1] as condition_code,
+  (array_agg(condition_text order by hours desc, condition_code, condition_text))[1] as condition_text,
+
+  max(loaded_at) as loaded_at
+from by_condition
+group by location_id, date
@@ -1,18 +1,71 @@
-with base as (
+{#
+  z-score of temp_avg_c against the location's full-history mean / sample
+  stddev, taken from the running aggregate (agg_location_temp_monthly) instead
+  of a window over every row. Incrementally, only rows in the incremental window
+  are (re)scored with the current statistics; older rows keep the score they
+  got when last processed. --full-refresh rescores all of history.
+#}
+{{
+  config(
+    materialized='incremental',
+    unique_key=['location_id', 'date'],
+    incremental_strategy='delete+insert',
+    on_schema_change='append_new_columns',
+    indexes=[
+      {'columns': ['location_id', 'date'], 'unique': True},
+      {'columns': ['date']},
+      {'columns': ['loaded_at']},
+    ],
+    post_hook=["{{ delete_missing_keys(ref('fact_weather_daily')) }}"]
+  )
+}}
+
+with totals as (
   select
     location_id,
-    date,
-    temp_avg_c,
-    avg(temp_avg_c) over (partition by location_id) as mean_temp,
-    stddev_samp(temp_avg_c) over (partition by location_id) as sd_temp
-  from {{ ref('fact_weather_daily') }}
+    sum(temp_n) as n,
+    sum(temp_sum) as s,
+    sum(temp_sum_sq) as ss
+  from {{ ref('agg_location_temp_monthly') }}
+  group by location_id
+),
+
+stats as (
+  select
+    location_id,
+    n as stats_n,
+    s / n as mean_temp,
+    -- stddev_samp from the moments; greatest() guards tiny negative rounding
+    case when n > 1 then sqrt(greatest((ss - s * s / n) / (n - 1), 0)) end as sd_temp
+  from totals
+  where n > 0
+),
+
+base as (
+  select
+    f.location_id,
+    f.date,
+    f.temp_avg_c,
+    f.loaded_at
+  from {{ ref('fact_weather_daily') }} f
+  {% if is_incremental() %}
+  where {{ incremental_window_filter(ref('fact_weather_daily'), 'f') }}
+  {% endif %}
 )
+
 select
-  location_id,
-  date,
-  temp_avg_c,
+  b.location_id,
+  b.date,
+  b.temp_avg_c,
   case
-    when sd_temp is null or sd_temp = 0 then null
-    else (temp_avg_c - mean_temp) / sd_temp
-  end as z_score
-from base
\ No newline at end of file
+    when s.sd_temp is null or s.sd_temp = 0 then null
+    else (b.temp_avg_c - s.mean_temp) / s.sd_temp
+  end as z_score,
+
+  s.mean_temp,
+  s.sd_temp,
+  s.stats_n,
+
+  b.loaded_at
+from base b
+left join stats s using (location_id)
@@ -1,17 +1,102 @@
+{{
+  config(
+    materialized='incremental',
+    unique_key=['location_id', 'date'],
+    incremental_strategy='delete+insert',
+    on_schema_change='append_new_columns',
+    indexes=[
+      {'columns': ['location_id', 'date'], 'unique': True},
+      {'columns': ['date']},
+      {'columns': ['loaded_at']},
+    ],
+    post_hook=["{{ delete_missing_keys(ref('fact_weather_daily')) }}"]
+  )
+}}
+
+{% if is_incremental() %}
+with changed as (
+  {{ incremental_changed_from(ref('fact_weather_daily')) }}
+),
+
+-- a recomputed row needs its 29 preceding rows for the 30d window
+-- (materialized: one index probe per location, not one per fact row)
+context as materialized (
+  select
+    c.location_id,
+    c.from_date,
+    coalesce(
+      (
+        select f.date
+        from {{ ref('fact_weather_daily') }} f
+        where f.location_id = c.location_id
+          and f.date < c.from_date
+        order by f.date desc
+        offset 28
+        limit 1
+      ),
+      '-infinity'::date
+    ) as context_from
+  from changed c
+),
+
+base as (
+  select
+    f.location_id,
+    f.date,
+    f.temp_avg_c,
+    f.loaded_at,
+    x.from_date
+  from context x
+  -- lateral: an index range per location instead of a scan of the whole fact
+  cross join lateral (
+    select location_id, date, temp_avg_c, loaded_at
+    from {{ ref('fact_weather_daily') }}
+    where location_id = x.location_id
+      and date >= x.context_from
+  ) f
+),
+{% else %}
+with base as (
+  select
+    location_id,
+    date,
+    temp_avg_c,
+    loaded_at,
+    '-infinity'::date as from_date
+  from {{ ref('fact_weather_daily') }}
+),
+{% endif %}
+
+windowed as (
+  select
+    location_id,
+    date,
+    from_date,
+    loaded_at,
+
+    temp_avg_c,
+    avg(temp_avg_c) over (
+      partition by location_id
+      order by date
+      rows between 6 preceding and current row
+    ) as temp_avg_7d,
+
+    avg(temp_avg_c) over (
+      partition by location_id
+      order by date
+      rows between 29 preceding and current row
+    ) as temp_avg_30d
+  from base
+)
+
 select
   location_id,
   date,
 
   temp_avg_c,
-  avg(temp_avg_c) over (
-    partition by location_id
-    order by date
-    rows between 6 preceding and current row
-  ) as temp_avg_7d,
-
-  avg(temp_avg_c) over (
-    partition by location_id
-    order by date
-    rows between 29 preceding and current row
-  ) as temp_avg_30d
-from {{ ref('fact_weather_daily') }}
\ No newline at end of file
+  temp_avg_7d,
+  temp_avg_30d,
+
+  loaded_at
+from windowed
+where date >= from_date
@@ -19,5 +19,6 @@ select
   condition_code::int as condition_code,
   condition_text::text as condition_text,
 
-  ingested_at::timestamptz as ingested_at
-from src
\ No newline at end of file
+  ingested_at::timestamptz as ingested_at,
+  loaded_at as loaded_at
+from src
@@ -0,0 +1,38 @@
+-- no `with src as (...)` wrapper here: a view with a CTE is not flattened into
+-- the queries that use it, so max(dt) / the marts' per-location range scans
+-- could not use the staging indexes
+
+select
+  dt::date as dt,
+  location_id::text as location_id,
+  date::date as date,
+
+  time_epoch::bigint as time_epoch,
+  to_timestamp(time_epoch) as time_utc,
+  hour::smallint as hour,
+
+  temp_c::real as temp_c,
+  feelslike_c::real as feelslike_c,
+  dewpoint_c::real as dewpoint_c,
+  humidity::smallint as humidity,
+  cloud::smallint as cloud,
+
+  precip_mm::real as precip_mm,
+  snow_cm::real as snow_cm,
+  chance_of_rain::smallint as chance_of_rain,
+  chance_of_snow::smallint as chance_of_snow,
+
+  wind_kph::real as wind_kph,
+  gust_kph::real as gust_kph,
+  wind_degree::smallint as wind_degree,
+  pressure_mb::real as pressure_mb,
+  vis_km::real as vis_km,
+  uv::real as uv,
+  is_day::smallint as is_day,
+
+  condition_code::int as condition_code,
+  condition_text::text as condition_text,
+
+  ingested_at::timestamptz as ingested_at,
+  loaded_at as loaded_at
+from {{ source('weather_staging', 'stg_weather_hourly') }}
@@ -47,4 +47,48 @@ CREATE INDEX IF NOT EXISTS idx_stg_locations_country
   ON staging.stg_locations (country);
 
 CREATE INDEX IF NOT EXISTS idx_stg_locations_region
-  ON staging.stg_locations (region);
\ No newline at end of file
+  ON staging.stg_locations (region);
+-- incremental dbt models pick up rows loaded since their last run
+CREATE INDEX IF NOT EXISTS idx_stg_weather_daily_loaded_at
+  ON staging.stg_weather_daily (loaded_at);
+
+
+-- hourly grain (silver weather_hourly): 24x the daily rows, so narrow types
+-- (real / smallint, as in silver) and only the indexes loads and dbt need
+CREATE TABLE IF NOT EXISTS staging.stg_weather_hourly (
+  dt date NOT NULL,
+  location_id text NOT NULL,
+  date date NOT NULL,
+  time_epoch bigint NOT NULL,
+  hour smallint,
+
+  temp_c real,
+  feelslike_c real,
+  dewpoint_c real,
+  humidity smallint,
+  cloud smallint,
+  precip_mm real,
+  snow_cm real,
+  chance_of_rain smallint,
+  chance_of_snow smallint,
+  wind_kph real,
+  gust_kph real,
+  wind_degree smallint,
+  pressure_mb real,
+  vis_km real,
+  uv real,
+  is_day smallint,
+  condition_code smallint,
+  condition_text text,
+
+  ingested_at timestamptz,
+  loaded_at timestamptz NOT NULL DEFAULT now(),
+
+  PRIMARY KEY (location_id, time_epoch)
+);
+
+CREATE INDEX IF NOT EXISTS idx_stg_weather_hourly_dt
+  ON staging.stg_weather_hourly (dt);
+
+CREATE INDEX IF NOT EXISTS idx_stg_weather_hourly_loaded_at
+  ON staging.stg_weather_hourly (loaded_at);
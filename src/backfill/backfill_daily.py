@@ -0,0 +1,313 @@
+from __future__ import annotations
+
+import json
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+# Per-dt stages, in execution order. Locations are a current-state snapshot
+# (staging.stg_locations is rebuilt per load), so they are loaded once for the
+# latest dt of the range after all per-day stages finished. Silver compaction
+# runs once per month touched by the range, also at the end. The hourly stages
+# read the same bronze and run after the daily ones (both publish the dt manifest).
+DAILY_STAGES = ["bronze", "silver", "quality", "load_daily", "silver_hourly", "load_hourly"]
+ALL_STAGES = DAILY_STAGES + ["load_locations", "compact"]
+# --fused: silver + quality + load_daily as one in-memory stage
+FUSED_STAGE = "silver_quality_load"
+FUSED_REPLACES = ["silver", "quality", "load_daily"]
+
+
+def date_range(start: str, end: str) -> list[str]:
+    d0 = date.fromisoformat(start)
+    d1 = date.fromisoformat(end)
+    if d1 < d0:
+        raise ValueError(f"end ({end}) is before start ({start})")
+    return [(d0 + timedelta(days=i)).isoformat() for i in range((d1 - d0).days + 1)]
+
+
+def load_checkpoint(path: Path) -> set[tuple[str, str]]:
+    """Return (dt, stage) pairs already completed according to the checkpoint file."""
+    done: set[tuple[str, str]] = set()
+    if not path.exists():
+        return done
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                rec = json.loads(line)
+            except json.JSONDecodeError:
+                # a worker killed mid-write leaves a partial last line
+                continue
+            if rec.get("status") == "done":
+                done.add((rec["dt"], rec["stage"]))
+
+    # the fused stage and the stages it replaces are interchangeable on resume
+    for dt in {dt for dt, _ in done}:
+        if (dt, FUSED_STAGE) in done:
+            done.update((dt, s) for s in FUSED_REPLACES)
+        elif all((dt, s) in done for s in FUSED_REPLACES):
+            done.add((dt, FUSED_STAGE))
+    return done
+
+
+def _mark_done(path: Path, dt: str, stage: str, duration_s: float) -> None:
+    # Single short line per write with O_APPEND: safe across worker processes
+    line = json.dumps(
+        {
+            "dt": dt,
+            "stage": stage,
+            "status": "done",
+            "duration_s": round(duration_s, 3),
+            "finished_at": datetime.now(timezone.utc).isoformat(),
+        }
+    )
+    with path.open("a", encoding="utf-8") as f:
+        f.write(line + "\n")
+
+
+def _init_worker(workers: int) -> None:
+    # Runs once per worker process. API quotas are per process (see rate_limiter):
+    # each worker gets 1/workers of the configured (or default) rate and daily quota.
+    from src.ingestion.rate_limiter import share_rate_limiter
+
+    share_rate_limiter(workers)
+
+
+def _run_stage(stage: str, dt: str, ctx: dict[str, Any]) -> None:
+    if stage == "bronze":
+        from src.ingestion.write_bronze import run as write_bronze_run
+
+        write_bronze_run(
+            dt,
+            ctx["locations_path"],
+            max_concurrency=ctx["bronze_concurrency"],
+            client=ctx["client"],
+            skip_existing=ctx["skip_existing_bronze"],
+        )
+    elif stage == "silver":
+        from src.transforms.bronze_to_silver_daily import run as bronze_to_silver_run
+
+        bronze_to_silver_run(dt)
+    elif stage == "quality":
+        from src.quality.silver_checks_daily import run as quality_gate_run
+
+        quality_gate_run(dt)
+    elif stage == FUSED_STAGE:
+        from src.transforms.bronze_to_postgres_daily import run as fused_run
+
+        fused_run(dt, load_locations=False)
+    elif stage == "load_daily":
+        from src.ingestion.loaders.postgres_loader_daily import run as load_postgres_daily_run
+
+        load_postgres_daily_run(dt)
+    elif stage == "silver_hourly":
+        from src.transforms.bronze_to_silver_hourly import run as bronze_to_silver_hourly_run
+
+        bronze_to_silver_hourly_run(dt)
+    elif stage == "load_hourly":
+        from src.ingestion.loaders.postgres_loader_hourly import run as load_postgres_hourly_run
+
+        load_postgres_hourly_run(dt)
+    elif stage == "load_locations":
+        from src.ingestion.loaders.postgres_loader_locations import run as load_postgres_locations_run
+
+        load_postgres_locations_run(dt)
+    elif stage == "compact":
+        from src.transforms.silver_compact import compact_months
+
+        # dt is the first day of the month to compact
+        compact_months([dt[:7]])
+    else:
+        raise ValueError(f"Unknown stage: {stage}")
+
+
+def _run_dates(
+    dates: list[str],
+    stages: list[str],
+    checkpoint_path: str,
+    locations_path: str,
+    bronze_concurrency: int,
+    skip_existing_bronze: bool,
+) -> list[dict[str, Any]]:
+    """Worker entry point: run all pending stages for a chunk of dates sequentially."""
+    ckpt = Path(checkpoint_path)
+    done = load_checkpoint(ckpt)
+    ctx: dict[str, Any] = {
+        "locations_path": locations_path,
+        "bronze_concurrency": bronze_concurrency,
+        "skip_existing_bronze": skip_existing_bronze,
+        "client": None,
+    }
+    if "bronze" in stages:
+        from src.ingestion.weatherapi_client import WeatherApiClient
+
+        # one keep-alive pool per worker, reused for every date in the chunk
+        ctx["client"] = WeatherApiClient(pool_size=bronze_concurrency)
+
+    results: list[dict[str, Any]] = []
+    try:
+        for dt in dates:
+            result: dict[str, Any] = {"dt": dt, "ok": True, "ran": [], "skipped": []}
+            for stage in stages:
+                if (dt, stage) in done:
+                    result["skipped"].append(stage)
+                    continue
+                t0 = time.perf_counter()
+                try:
+                    _run_stage(stage, dt, ctx)
+                except Exception as e:
+                    # later stages for this dt depend on this one; other dates continue
+                    result["ok"] = False
+                    result["failed_stage"] = stage
+                    result["error"] = f"{type(e).__name__}: {e}"
+                    break
+                _mark_done(ckpt, dt, stage, time.perf_counter() - t0)
+                result["ran"].append(stage)
+            results.append(result)
+    finally:
+        if ctx["client"] is not None:
+            ctx["client"].close()
+
+    return results
+
+
+def _chunks(items: list[str], n_chunks: int) -> list[list[str]]:
+    size = max(1, math.ceil(len(items) / n_chunks))
+    return [items[i : i + size] for i in range(0, len(items), size)]
+
+
+def run(
+    start: str,
+    end: str,
+    stages: list[str] | None = None,
+    workers: int = 4,
+    dates_per_task: int | None = None,
+    checkpoint_path: str | None = None,
+    locations_path: str = "docs/locations.yml",
+    bronze_concurrency: int = 4,
+    skip_existing_bronze: bool = True,
+    fused: bool = False,
+) -> list[dict[str, Any]]:
+    stages = stages or list(ALL_STAGES)
+    unknown = [s for s in stages if s not in ALL_STAGES]
+    if unknown:
+        raise ValueError(f"Unknown stages: {unknown}. Allowed: {ALL_STAGES}")
+    if workers < 1:
+        raise ValueError(f"workers must be >= 1, got {workers}")
+
+    dates = date_range(start, end)
+    daily_stages = [s for s in DAILY_STAGES if s in stages]
+    if fused:
+        if any(s not in stages for s in FUSED_REPLACES):
+            raise ValueError(f"--fused needs all of {FUSED_REPLACES} in stages")
+        # in place of the first stage it replaces, so the hourly stages still come after it
+        at = daily_stages.index(FUSED_REPLACES[0])
+        daily_stages = daily_stages[:at] + [FUSED_STAGE] + [s for s in daily_stages[at:] if s not in FUSED_REPLACES]
+
+    ckpt = Path(checkpoint_path or f".backfill/checkpoint_{start}_{end}.jsonl")
+    ckpt.parent.mkdir(parents=True, exist_ok=True)
+    done = load_checkpoint(ckpt)
+    pending = [dt for dt in dates if any((dt, s) not in done for s in daily_stages)]
+
+    print(
+        f"[BACKFILL] {start}..{end} | dates={len(dates)} | pending={len(pending)} "
+        f"| stages={stages} | workers={workers} | checkpoint={ckpt}"
+    )
+
+    # Many dates per task amortises process start-up, imports and connection setup.
+    # Default: ~4 tasks per worker so a slow chunk does not leave others idle.
+    if dates_per_task:
+        chunks = [pending[i : i + dates_per_task] for i in range(0, len(pending), dates_per_task)]
+    else:
+        chunks = _chunks(pending, workers * 4)
+
+    results: list[dict[str, Any]] = []
+    if chunks and daily_stages:
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(workers,)
+        ) as pool:
+            futures = [
+                pool.submit(
+                    _run_dates,
+                    chunk,
+                    daily_stages,
+                    str(ckpt),
+                    locations_path,
+                    bronze_concurrency,
+                    skip_existing_bronze,
+                )
+                for chunk in chunks
+            ]
+            for fut in as_completed(futures):
+                for r in fut.result():
+                    results.append(r)
+                    status = "OK" if r["ok"] else f"FAILED at {r['failed_stage']}: {r['error']}"
+                    print(f"[BACKFILL] dt={r['dt']} {status} ran={r['ran']} skipped={r['skipped']}")
+
+    if "load_locations" in stages:
+        results.extend(
+            _run_dates([dates[-1]], ["load_locations"], str(ckpt), locations_path, bronze_concurrency, False)
+        )
+
+    if "compact" in stages:
+        # one entry per month, keyed by its first day (whole months, also outside the range)
+        months = sorted({dt[:7] + "-01" for dt in dates})
+        results.extend(_run_dates(months, ["compact"], str(ckpt), locations_path, bronze_concurrency, False))
+
+    failed = sorted(r["dt"] for r in results if not r["ok"])
+    print(f"[BACKFILL] DONE {start}..{end} | processed={len(results)} | failed={len(failed)}")
+    if failed:
+        raise RuntimeError(f"Backfill failed for {len(failed)} dates (rerun to resume): {failed[:20]}")
+
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+    from src.common.profiling import add_profile_argument, configure_profiling
+
+    parser = argparse.ArgumentParser(description="Backfill a date range: bronze -> silver -> quality -> Postgres (daily + hourly)")
+    parser.add_argument("--start", type=str, required=True, help="First business date YYYY-MM-DD")
+    parser.add_argument("--end", type=str, required=True, help="Last business date YYYY-MM-DD (inclusive)")
+    parser.add_argument(
+        "--stages",
+        type=str,
+        default=",".join(ALL_STAGES),
+        help=f"Comma-separated subset of {ALL_STAGES}",
+    )
+    parser.add_argument("--workers", type=int, default=4, help="Worker processes")
+    parser.add_argument("--dates_per_task", type=int, default=None, help="Dates handed to a worker at once")
+    parser.add_argument("--checkpoint_path", type=str, default=None)
+    parser.add_argument("--locations_path", type=str, default="docs/locations.yml")
+    parser.add_argument("--bronze_concurrency", type=int, default=4, help="Parallel API calls per worker")
+    parser.add_argument(
+        "--refetch_bronze",
+        action="store_true",
+        help="Re-fetch locations that already have a bronze object",
+    )
+    parser.add_argument(
+        "--fused",
+        action="store_true",
+        help="Run silver, quality and load_daily as one in-memory stage (no silver re-download)",
+    )
+    add_profile_argument(parser)
+    args = parser.parse_args()
+    configure_profiling(args.profile)
+
+    run(
+        args.start,
+        args.end,
+        stages=[s.strip() for s in args.stages.split(",") if s.strip()],
+        workers=args.workers,
+        dates_per_task=args.dates_per_task,
+        checkpoint_path=args.checkpoint_path,
+        locations_path=args.locations_path,
+        bronze_concurrency=args.bronze_concurrency,
+        skip_existing_bronze=not args.refetch_bronze,
+        fused=args.fused,
+    )
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import gzip
+import json
+import os
+from typing import Any
+
+BRONZE_PREFIX = "bronze/weather_history"
+
+# Bronze object encodings. "json" is uncompressed compact JSON; legacy objects were
+# pretty-printed JSON under the same raw.json name and decode the same way.
+ENCODINGS = {
+    "json": {"filename": "raw.json", "content_encoding": None},
+    "gzip": {"filename": "raw.json.gz", "content_encoding": "gzip"},
+    "zstd": {"filename": "raw.json.zst", "content_encoding": "zstd"},
+}
+BRONZE_FILENAMES = tuple(e["filename"] for e in ENCODINGS.values())
+
+DEFAULT_ENCODING = os.getenv("BRONZE_ENCODING", "gzip")
+
+_GZIP_MAGIC = b"\x1f\x8b"
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError("BRONZE_ENCODING=zstd requires the 'zstandard' package") from e
+    return zstandard
+
+
+def bronze_dt_prefix(dt: str) -> str:
+    return f"{BRONZE_PREFIX}/dt={dt}/"
+
+
+def bronze_filename(encoding: str) -> str:
+    if encoding not in ENCODINGS:
+        raise ValueError(f"Unknown bronze encoding '{encoding}'. Allowed: {sorted(ENCODINGS)}")
+    return ENCODINGS[encoding]["filename"]
+
+
+def is_bronze_key(key: str) -> bool:
+    return key.rsplit("/", 1)[-1] in BRONZE_FILENAMES
+
+
+def encode_bronze(data: dict[str, Any], encoding: str = DEFAULT_ENCODING) -> tuple[bytes, dict[str, str]]:
+    """Serialize a bronze record. Returns (body, extra put_object kwargs)."""
+    bronze_filename(encoding)
+    raw = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    if encoding == "gzip":
+        body = gzip.compress(raw, compresslevel=6, mtime=0)
+    elif encoding == "zstd":
+        body = _zstd().ZstdCompressor(level=6).compress(raw)
+    else:
+        body = raw
+
+    put_kwargs = {"ContentType": "application/json"}
+    if ENCODINGS[encoding]["content_encoding"]:
+        put_kwargs["ContentEncoding"] = ENCODINGS[encoding]["content_encoding"]
+    return body, put_kwargs
+
+
+def decode_bronze(body: bytes) -> dict[str, Any]:
+    """Decode any bronze encoding (detected from magic bytes, so keys/metadata can't lie)."""
+    if body[:2] == _GZIP_MAGIC:
+        body = gzip.decompress(body)
+    elif body[:4] == _ZSTD_MAGIC:
+        body = _zstd().ZstdDecompressor().decompress(body)
+    return json.loads(body.decode("utf-8"))
+
+
+# ---------- bundled layout: few NDJSON parts per dt + manifest ----------
+# Parts are a sequence of independently compressed blocks (gzip members / zstd
+# frames) of newline-delimited records; the manifest indexes block byte ranges so
+# readers can fetch blocks with concurrent range GETs.
+LAYOUTS = ("per_location", "bundle")
+DEFAULT_LAYOUT = os.getenv("BRONZE_LAYOUT", "per_location")
+
+BUNDLE_MANIFEST = "_manifest.json"
+BUNDLE_FORMAT_VERSION = 1
+_PART_EXT = {"json": "", "gzip": ".gz", "zstd": ".zst"}
+
+
+def bundle_manifest_key(dt: str) -> str:
+    return f"{bronze_dt_prefix(dt)}{BUNDLE_MANIFEST}"
+
+
+def bundle_part_filename(index: int, encoding: str) -> str:
+    bronze_filename(encoding)
+    return f"part-{index:05d}.ndjson{_PART_EXT[encoding]}"
+
+
+def encode_bundle_block(records: list[dict[str, Any]], encoding: str = DEFAULT_ENCODING) -> bytes:
+    raw = b"".join(
+        json.dumps(r, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n" for r in records
+    )
+    if encoding == "gzip":
+        return gzip.compress(raw, compresslevel=6, mtime=0)
+    if encoding == "zstd":
+        return _zstd().ZstdCompressor(level=6).compress(raw)
+    return raw
+
+
+def decode_bundle_block(body: bytes) -> list[dict[str, Any]]:
+    if body[:2] == _GZIP_MAGIC:
+        body = gzip.decompress(body)
+    elif body[:4] == _ZSTD_MAGIC:
+        body = _zstd().ZstdDecompressor().decompress(body)
+    return [json.loads(line) for line in body.splitlines() if line]
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Iterator
+
+
+def iter_bounded(pool: ThreadPoolExecutor, calls: Iterator[tuple], max_in_flight: int) -> Iterator[Any]:
+    """Run calls on pool with at most max_in_flight pending; yield results as they complete."""
+    in_flight: set[Future] = set()
+    for fn, *args in calls:
+        in_flight.add(pool.submit(fn, *args))
+        if len(in_flight) >= max_in_flight:
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for fut in done:
+                yield fut.result()
+
+    while in_flight:
+        done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+        for fut in done:
+            yield fut.result()
+
+
+def iter_ordered(pool: ThreadPoolExecutor, calls: Iterator[tuple], max_in_flight: int) -> Iterator[Any]:
+    """As iter_bounded, but results are yielded in call order (read-ahead of max_in_flight calls)."""
+    in_flight: deque[Future] = deque()
+    for fn, *args in calls:
+        in_flight.append(pool.submit(fn, *args))
+        if len(in_flight) >= max_in_flight:
+            yield in_flight.popleft().result()
+
+    while in_flight:
+        yield in_flight.popleft().result()
@@ -0,0 +1,231 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+import psycopg2
+import psycopg2.extensions
+from dotenv import load_dotenv
+
+from src.common.instrumentation import span
+
+load_dotenv()
+
+# Session settings applied when a pooled connection is handed out for a workload.
+# Staging is rebuildable from silver, so load sessions trade commit durability
+# (synchronous_commit=off: a crash may lose the last ~ms of commits, never corrupt)
+# for not waiting on a WAL flush per batch.
+WORKLOADS: dict[str, dict[str, str]] = {
+    "load": {
+        "synchronous_commit": "off",
+        "work_mem": "64MB",
+        "maintenance_work_mem": "256MB",
+        "statement_timeout": "15min",
+        "lock_timeout": "1min",
+    },
+    "read": {
+        "synchronous_commit": "on",
+        "work_mem": "16MB",
+        "statement_timeout": "2min",
+        "lock_timeout": "10s",
+    },
+}
+DEFAULT_WORKLOAD = "load"
+
+# Connections idle longer than this are pinged (SELECT 1) before being handed out
+HEALTHCHECK_IDLE_S = float(os.getenv("PG_HEALTHCHECK_IDLE_S", "30"))
+
+_pool: "DwhPool | None" = None
+_pool_pid: int | None = None
+_pool_lock = threading.Lock()
+
+
+def get_dsn() -> str:
+    dsn = os.getenv("WEATHER_DWH_PG_DSN")
+    if not dsn:
+        raise ValueError("WEATHER_DWH_PG_DSN is not set")
+    return dsn
+
+
+def session_settings(workload: str) -> dict[str, str]:
+    """Settings for a workload; PG_<SETTING> env vars (e.g. PG_STATEMENT_TIMEOUT) override them."""
+    if workload not in WORKLOADS:
+        raise ValueError(f"Unknown DWH workload '{workload}'. Allowed: {list(WORKLOADS)}")
+    out = dict(WORKLOADS[workload])
+    for name in out:
+        v = os.getenv(f"PG_{name.upper()}")
+        if v:
+            out[name] = v
+    return out
+
+
+class DwhPool:
+    """
+    Bounded pool of psycopg2 connections to the DWH.
+
+    - at most `max_size` connections; callers block (up to `timeout_s`) when all are in use
+    - idle connections are reused LIFO, so a burst does not keep every socket warm
+    - per-workload session settings are applied only when a connection switches workload
+    - connections idle > HEALTHCHECK_IDLE_S are pinged and replaced if dead
+    """
+
+    def __init__(self, dsn: str, max_size: int = 4, timeout_s: float = 60.0) -> None:
+        if max_size < 1:
+            raise ValueError(f"max_size must be >= 1, got {max_size}")
+        self.dsn = dsn
+        self.max_size = max_size
+        self.timeout_s = timeout_s
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        # (conn, workload its session is configured for, monotonic time it was returned)
+        self._idle: list[tuple[Any, str, float]] = []
+        self._counters = {"checkouts": 0, "connects": 0, "replaced": 0, "wait_s": 0.0}
+
+    def _connect(self):
+        conn = psycopg2.connect(self.dsn)
+        conn.autocommit = False
+        with self._lock:
+            self._counters["connects"] += 1
+        return conn
+
+    @staticmethod
+    def _ping(conn) -> bool:
+        if conn.closed:
+            return False
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _checkout(self, workload: str):
+        with self._lock:
+            conn, current, returned_at = self._idle.pop() if self._idle else (None, None, 0.0)
+            self._counters["checkouts"] += 1
+
+        if conn is not None and (conn.closed or time.monotonic() - returned_at > HEALTHCHECK_IDLE_S):
+            if not self._ping(conn):
+                conn.close()
+                conn = None
+                with self._lock:
+                    self._counters["replaced"] += 1
+        if conn is None:
+            conn, current = self._connect(), None
+
+        if current != workload:
+            with conn.cursor() as cur:
+                for name, value in session_settings(workload).items():
+                    cur.execute("SELECT set_config(%s, %s, false)", (name, value))
+            conn.commit()
+        return conn
+
+    def _checkin(self, conn, workload: str) -> None:
+        if conn.closed or conn.info.transaction_status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+            conn.close()
+            return
+        with self._lock:
+            self._idle.append((conn, workload, time.monotonic()))
+
+    @contextmanager
+    def connection(self, workload: str = DEFAULT_WORKLOAD) -> Iterator[Any]:
+        """
+        Borrow a connection. Commits on success, rolls back on error, and always
+        returns it to the pool (closing it if it is broken).
+        """
+        t0 = time.monotonic()
+        if not self._slots.acquire(timeout=self.timeout_s):
+            raise TimeoutError(f"No DWH connection available within {self.timeout_s:g}s (pool size {self.max_size})")
+        with self._lock:
+            self._counters["wait_s"] += time.monotonic() - t0
+
+        conn = None
+        try:
+            with span("pg.checkout"):
+                conn = self._checkout(workload)
+            try:
+                yield conn
+                with span("pg.commit"):
+                    conn.commit()
+            except BaseException:
+                if not conn.closed:
+                    try:
+                        conn.rollback()
+                    except psycopg2.Error:
+                        conn.close()
+                raise
+        finally:
+            if conn is not None:
+                self._checkin(conn, workload)
+            self._slots.release()
+
+    def health_check(self) -> dict[str, Any]:
+        """Round-trip the server through the pool; raises if the DWH is unreachable."""
+        t0 = time.perf_counter()
+        with self.connection("read") as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT current_setting('server_version'), pg_is_in_recovery()")
+                version, in_recovery = cur.fetchone()
+        return {
+            "ok": True,
+            "server_version": version,
+            "in_recovery": in_recovery,
+            "latency_ms": round((time.perf_counter() - t0) * 1000, 2),
+            **self.snapshot(),
+        }
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            out: dict[str, Any] = dict(self._counters)
+            out["idle"] = len(self._idle)
+        out["wait_s"] = round(out["wait_s"], 3)
+        out["max_size"] = self.max_size
+        return out
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn, _, _ in idle:
+            conn.close()
+
+
+def get_dwh_pool() -> DwhPool:
+    """Process-wide pool configured from WEATHER_DWH_PG_DSN / PG_POOL_* on first use."""
+    global _pool, _pool_pid
+    pid = os.getpid()
+    # sockets inherited through fork (process pools) must not be shared
+    if _pool is None or _pool_pid != pid:
+        with _pool_lock:
+            if _pool is None or _pool_pid != pid:
+                _pool = DwhPool(
+                    get_dsn(),
+                    max_size=int(os.getenv("PG_POOL_MAX_SIZE", "4")),
+                    timeout_s=float(os.getenv("PG_POOL_TIMEOUT_S", "60")),
+                )
+                _pool_pid = pid
+    return _pool
+
+
+@contextmanager
+def dwh_connection(workload: str = DEFAULT_WORKLOAD) -> Iterator[Any]:
+    """Shortcut for get_dwh_pool().connection(workload)."""
+    with get_dwh_pool().connection(workload) as conn:
+        yield conn
+
+
+def reset_dwh_pool() -> None:
+    """Close and drop the cached pool, e.g. after changing WEATHER_DWH_PG_DSN."""
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.close()
+        _pool = None
+        _pool_pid = None
+
+
+if __name__ == "__main__":
+    import json
+
+    print(json.dumps(get_dwh_pool().health_check(), indent=2))
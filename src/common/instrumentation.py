@@ -0,0 +1,458 @@
+from __future__ import annotations
+
+import bisect
+import functools
+import inspect
+import json
+import math
+import os
+import re
+import socket
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Iterable
+
+from src.common.profiling import profile_run
+
+# Per-stage metrics: spans (timed sections), counters and histograms, collected
+# for one stage run (e.g. write_bronze for one dt) and emitted when it ends as:
+#   - one structured JSON log line on stdout (always, unless WEATHER_METRICS_LOG=off)
+#   - an XCom "metrics" entry on the running Airflow task (WEATHER_METRICS_XCOM=1)
+#   - a node_exporter textfile <dir>/weather_<stage>.prom (WEATHER_METRICS_TEXTFILE_DIR)
+#   - StatsD gauges/timers over UDP (WEATHER_METRICS_STATSD=host:port)
+# WEATHER_METRICS_LOG=spans additionally logs every span as it ends (verbose).
+ENABLED = os.getenv("WEATHER_METRICS", "1").lower() not in ("0", "false", "no", "off")
+LOG_MODE = os.getenv("WEATHER_METRICS_LOG", "summary").lower()
+XCOM_ENABLED = os.getenv("WEATHER_METRICS_XCOM", "").lower() in ("1", "true", "yes")
+TEXTFILE_DIR = os.getenv("WEATHER_METRICS_TEXTFILE_DIR")
+STATSD_ADDR = os.getenv("WEATHER_METRICS_STATSD")
+STATSD_PREFIX = os.getenv("WEATHER_METRICS_STATSD_PREFIX", "weather")
+
+LOG_MODES = ("summary", "spans", "off")
+if LOG_MODE not in LOG_MODES:
+    # checked here, not when a stage ends: metrics config must never fail a committed stage
+    print(f"[METRICS] WARN unknown WEATHER_METRICS_LOG '{LOG_MODE}' (allowed: {list(LOG_MODES)}), using 'summary'")
+    LOG_MODE = "summary"
+
+# upper bounds; the last bucket (+Inf) is implicit
+DURATION_BUCKETS_S = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 900)
+VALUE_BUCKETS = tuple(float(4**i) for i in range(16))  # 1 .. ~1e9 (rows, bytes)
+
+
+class Histogram:
+    """Fixed-bucket histogram with exact count/sum/min/max; quantiles are bucket upper bounds."""
+
+    __slots__ = ("buckets", "counts", "count", "sum", "min", "max")
+
+    def __init__(self, buckets: Iterable[float] = DURATION_BUCKETS_S) -> None:
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(self.buckets, self.counts):
+            seen += n
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def summary(self, digits: int = 6) -> dict[str, float]:
+        if not self.count:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "sum": round(self.sum, digits),
+            "mean": round(self.sum / self.count, digits),
+            "min": round(self.min, digits),
+            "max": round(self.max, digits),
+            "p50": round(self.quantile(0.5), digits),
+            "p95": round(self.quantile(0.95), digits),
+        }
+
+
+class MetricsRegistry:
+    """Thread-safe store for one stage run (worker threads of the stage record into it too)."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.spans: dict[str, Histogram] = {}
+        self.counters: dict[str, float] = {}
+        self.histograms: dict[str, Histogram] = {}
+
+    def record_span(self, name: str, seconds: float) -> None:
+        with self._lock:
+            h = self.spans.get(name)
+            if h is None:
+                h = self.spans[name] = Histogram(DURATION_BUCKETS_S)
+            h.observe(seconds)
+
+    def incr(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name: str, value: float, buckets: Iterable[float] | None = None) -> None:
+        with self._lock:
+            h = self.histograms.get(name)
+            if h is None:
+                h = self.histograms[name] = Histogram(buckets or VALUE_BUCKETS)
+            h.observe(value)
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "spans": {k: v.summary() for k, v in sorted(self.spans.items())},
+                "counters": {k: round(v, 6) for k, v in sorted(self.counters.items())},
+                "histograms": {k: v.summary() for k, v in sorted(self.histograms.items())},
+            }
+
+
+# Metrics recorded outside of any stage (ad-hoc calls, notebooks) land here
+_default_registry = MetricsRegistry()
+_registry = _default_registry
+_active_stage: str | None = None
+_stage_lock = threading.Lock()
+
+
+def get_registry() -> MetricsRegistry:
+    return _registry
+
+
+def incr(name: str, value: float = 1) -> None:
+    if ENABLED:
+        _registry.incr(name, value)
+
+
+def observe(name: str, value: float, buckets: Iterable[float] | None = None) -> None:
+    if ENABLED:
+        _registry.observe(name, value, buckets)
+
+
+def _log(record: dict[str, Any]) -> None:
+    print(json.dumps(record, separators=(",", ":"), default=str), flush=True)
+
+
+class span:
+    """
+    Time a section into the current stage's `name` histogram.
+
+        with span("pg.copy"):
+            ...
+
+        @span("bronze.decode")
+        def decode(...): ...
+
+    Spans are aggregated by name (count, sum, p50/p95, max); with
+    WEATHER_METRICS_LOG=spans each one is also logged with its attrs. Spans of
+    worker threads overlap, so their sum can exceed the stage's duration.
+    """
+
+    __slots__ = ("name", "attrs", "_t0")
+
+    def __init__(self, name: str, **attrs: Any) -> None:
+        self.name = name
+        self.attrs = attrs
+        self._t0 = 0.0
+
+    def __enter__(self) -> "span":
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if not ENABLED:
+            return
+        seconds = time.perf_counter() - self._t0
+        _registry.record_span(self.name, seconds)
+        if LOG_MODE == "spans":
+            record = {"event": "span", "stage": _active_stage, "span": self.name, "duration_s": round(seconds, 6)}
+            if exc_type is not None:
+                record["error"] = exc_type.__name__
+            _log({**record, **self.attrs})
+
+    def __call__(self, fn: Callable) -> Callable:
+        name, attrs = self.name, self.attrs
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name, **attrs):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+
+class stage:
+    """
+    Collect the metrics of one stage run and emit them when it ends (ok or failed).
+
+        @stage("write_bronze", labels=("dt", "shard"))
+        def run(dt: str, ..., shard: int = 0): ...
+
+    As a decorator, `labels` names the call arguments copied into the summary.
+    A stage entered while another is active (fused tasks calling stage functions)
+    is recorded as the span "stage.<name>" of the outer one. A decorated
+    top-level run is profiled when WEATHER_PROFILE is set (src/common/profiling.py).
+    """
+
+    def __init__(self, name: str, labels: tuple[str, ...] = ("dt",), **values: Any) -> None:
+        self.name = name
+        self.labels = labels
+        self.values = values
+        self._nested: span | None = None
+        self._outer: tuple[MetricsRegistry, str | None] | None = None
+        self._started_at = ""
+        self._t0 = 0.0
+
+    @property
+    def nested(self) -> bool:
+        return self._nested is not None
+
+    def __enter__(self) -> MetricsRegistry:
+        global _registry, _active_stage
+        with _stage_lock:
+            if _active_stage is not None:
+                self._nested = span(f"stage.{self.name}")
+                self._nested.__enter__()
+                return _registry
+            self._outer = (_registry, _active_stage)
+            _registry, _active_stage = MetricsRegistry(), self.name
+        self._started_at = datetime.now(timezone.utc).isoformat()
+        self._t0 = time.perf_counter()
+        return _registry
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        global _registry, _active_stage
+        if self._nested is not None:
+            self._nested.__exit__(exc_type, exc, tb)
+            self._nested = None
+            return
+        duration = time.perf_counter() - self._t0
+        registry = _registry
+        with _stage_lock:
+            _registry, _active_stage = self._outer
+            self._outer = None
+        if not ENABLED:
+            return
+
+        summary: dict[str, Any] = {
+            "event": "stage_metrics",
+            "stage": self.name,
+            **self.values,
+            "status": "ok" if exc_type is None else "failed",
+            "started_at": self._started_at,
+            "duration_s": round(duration, 6),
+            **registry.snapshot(),
+        }
+        if exc_type is not None:
+            summary["error"] = f"{exc_type.__name__}: {exc}"[:500]
+        emit(summary, registry)
+
+    def __call__(self, fn: Callable) -> Callable:
+        sig = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            bound = sig.bind_partial(*args, **kwargs)
+            bound.apply_defaults()
+            values = {k: bound.arguments[k] for k in self.labels if k in bound.arguments}
+            run_stage = stage(self.name, labels=self.labels, **values, **self.values)
+            with run_stage:
+                if run_stage.nested:
+                    return fn(*args, **kwargs)
+                with profile_run(self.name, values):
+                    return fn(*args, **kwargs)
+
+        return wrapper
+
+
+# ---------------------------------------------------------------- sinks
+
+def emit(summary: dict[str, Any], registry: MetricsRegistry | None = None) -> None:
+    """Send a stage summary to every configured sink; a failing sink never fails the stage."""
+    sinks: list[tuple[str, Callable[[dict[str, Any]], None]]] = []
+    if LOG_MODE != "off":
+        sinks.append(("log", _log))
+    if XCOM_ENABLED:
+        sinks.append(("xcom", push_xcom))
+    if TEXTFILE_DIR:
+        sinks.append(("textfile", lambda s: write_textfile(s, TEXTFILE_DIR, registry)))
+    if STATSD_ADDR:
+        sinks.append(("statsd", lambda s: send_statsd(s, STATSD_ADDR, STATSD_PREFIX)))
+    for sink_name, sink in sinks:
+        try:
+            sink(summary)
+        except Exception as e:
+            print(f"[METRICS] WARN {sink_name} sink failed for stage={summary.get('stage')}: {type(e).__name__}: {e}")
+
+
+def push_xcom(summary: dict[str, Any]) -> None:
+    """XCom key "metrics" on the running Airflow task; a no-op outside of Airflow."""
+    try:
+        from airflow.operators.python import get_current_context
+    except ImportError:
+        return
+    try:
+        context = get_current_context()
+    except Exception:
+        # not inside a task execution (CLI run on a host with Airflow installed)
+        return
+    context["ti"].xcom_push(key="metrics", value=summary)
+
+
+def _metric_name(name: str) -> str:
+    return re.sub(r"[^a-zA-Z0-9_]", "_", name).strip("_").lower()
+
+
+def _label_value(v: Any) -> str:
+    return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _prom_histogram(lines: list[str], metric: str, labels: str, h: dict[str, Any], buckets: dict[str, Any]) -> None:
+    cumulative = 0
+    for bound, n in zip(buckets["bounds"], buckets["counts"]):
+        cumulative += n
+        lines.append(f'{metric}_bucket{{{labels},le="{bound:g}"}} {cumulative}')
+    lines.append(f'{metric}_bucket{{{labels},le="+Inf"}} {h["count"]}')
+    lines.append(f"{metric}_sum{{{labels}}} {h.get('sum', 0)}")
+    lines.append(f"{metric}_count{{{labels}}} {h['count']}")
+
+
+def render_prometheus(summary: dict[str, Any], registry: MetricsRegistry | None = None) -> str:
+    """
+    Prometheus text format for one stage run. Values describe the last run of the
+    stage (textfile collector semantics), so counters are exported as gauges.
+    Histogram buckets need the registry; without it only _sum/_count are written.
+    """
+    stage_name = summary["stage"]
+    labels = f'stage="{_label_value(stage_name)}"'
+    ok = summary["status"] == "ok"
+    lines = [
+        "# TYPE weather_stage_duration_seconds gauge",
+        f"weather_stage_duration_seconds{{{labels}}} {summary['duration_s']}",
+        "# TYPE weather_stage_success gauge",
+        f"weather_stage_success{{{labels}}} {int(ok)}",
+        "# TYPE weather_stage_last_run_timestamp_seconds gauge",
+        f"weather_stage_last_run_timestamp_seconds{{{labels}}} {time.time():.3f}",
+    ]
+
+    spans = registry.spans if registry is not None else {}
+    if summary["spans"]:
+        lines.append("# TYPE weather_span_seconds histogram")
+    for name, h in summary["spans"].items():
+        span_labels = f'{labels},span="{_label_value(name)}"'
+        src = spans.get(name)
+        buckets = {"bounds": src.buckets, "counts": src.counts} if src is not None else {"bounds": (), "counts": ()}
+        _prom_histogram(lines, "weather_span_seconds", span_labels, h, buckets)
+
+    for name, value in summary["counters"].items():
+        metric = f"weather_{_metric_name(name)}"
+        lines.append(f"# TYPE {metric} gauge")
+        lines.append(f"{metric}{{{labels}}} {value}")
+
+    hists = registry.histograms if registry is not None else {}
+    for name, h in summary["histograms"].items():
+        metric = f"weather_{_metric_name(name)}"
+        src = hists.get(name)
+        buckets = {"bounds": src.buckets, "counts": src.counts} if src is not None else {"bounds": (), "counts": ()}
+        lines.append(f"# TYPE {metric} histogram")
+        _prom_histogram(lines, metric, labels, h, buckets)
+    return "\n".join(lines) + "\n"
+
+
+def write_textfile(summary: dict[str, Any], directory: str, registry: MetricsRegistry | None = None) -> str:
+    """Atomically replace <directory>/weather_<stage>.prom (node_exporter textfile collector)."""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"weather_{_metric_name(summary['stage'])}.prom")
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(render_prometheus(summary, registry))
+    os.replace(tmp, path)
+    return path
+
+
+def render_statsd(summary: dict[str, Any], prefix: str = "weather") -> list[str]:
+    """StatsD lines: stage duration as a timer, counters and span/histogram aggregates as gauges."""
+    base = f"{prefix}.{_metric_name(summary['stage'])}"
+    lines = [
+        f"{base}.duration:{summary['duration_s'] * 1000:.3f}|ms",
+        f"{base}.success:{int(summary['status'] == 'ok')}|g",
+    ]
+    for name, value in summary["counters"].items():
+        lines.append(f"{base}.{_metric_name(name)}:{value:g}|g")
+    for kind, unit in (("spans", 1000), ("histograms", 1)):
+        for name, h in summary[kind].items():
+            m = f"{base}.{_metric_name(name)}"
+            lines.append(f"{m}.count:{h['count']}|g")
+            if h["count"]:
+                lines.append(f"{m}.sum:{h['sum'] * unit:g}|g")
+                lines.append(f"{m}.p95:{h['p95'] * unit:g}|g")
+                lines.append(f"{m}.max:{h['max'] * unit:g}|g")
+    return lines
+
+
+def send_statsd(summary: dict[str, Any], addr: str, prefix: str = "weather", max_packet: int = 1400) -> int:
+    """Send render_statsd lines over UDP, batched into packets of at most max_packet bytes."""
+    host, _, port = addr.rpartition(":")
+    if not host or not port.isdigit():
+        raise ValueError(f"WEATHER_METRICS_STATSD must be host:port, got '{addr}'")
+    packets: list[bytes] = []
+    buf = b""
+    for line in render_statsd(summary, prefix):
+        data = line.encode("utf-8")
+        if buf and len(buf) + 1 + len(data) > max_packet:
+            packets.append(buf)
+            buf = b""
+        buf = data if not buf else buf + b"\n" + data
+    if buf:
+        packets.append(buf)
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        for p in packets:
+            sock.sendto(p, (host, int(port)))
+    return len(packets)
+
+
+# ---------------------------------------------------------------- S3
+
+def instrument_s3_client(client) -> None:
+    """
+    Record every S3 call of `client` as the span s3.<Operation> (time to response
+    headers, retries included) plus s3.bytes_out (request bodies as sent, retries
+    included) / s3.bytes_in (response Content-Length) counters. Streaming
+    GetObject bodies are read later by the caller, which times that as its own span.
+    """
+
+    def before_call(context, **kw) -> None:
+        context["metrics_t0"] = time.perf_counter()
+
+    def before_send(request, **kw) -> None:
+        body = request.body
+        if isinstance(body, (bytes, bytearray)):
+            incr("s3.bytes_out", len(body))
+        elif hasattr(body, "seek") and hasattr(body, "tell"):
+            pos = body.tell()
+            body.seek(0, os.SEEK_END)
+            incr("s3.bytes_out", body.tell() - pos)
+            body.seek(pos)
+
+    def after_call(http_response, model, context, **kw) -> None:
+        t0 = context.get("metrics_t0")
+        if t0 is not None and ENABLED:
+            _registry.record_span(f"s3.{model.name}", time.perf_counter() - t0)
+        incr("s3.bytes_in", int(http_response.headers.get("content-length") or 0))
+
+    client.meta.events.register("before-call.s3.*", before_call)
+    client.meta.events.register("before-send.s3.*", before_send)
+    client.meta.events.register("after-call.s3.*", after_call)
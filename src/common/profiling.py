@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import argparse
+import cProfile
+import io
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Iterator
+
+# Opt-in profiling of stage runs (src/common/instrumentation.stage), set by the
+# --profile flag of the module CLIs or WEATHER_PROFILE (e.g. on Airflow workers):
+#   sample    wall-clock stack sampler over every thread -> <name>.collapsed
+#             (flamegraph.pl / speedscope / inferno "collapsed" format)
+#   cprofile  deterministic cProfile -> <name>.pstats (snakeviz, flameprof) + top-N text
+#   memory    tracemalloc -> <name>.alloc.txt (peak, top allocation sites)
+# "1" / "default" means sample,memory. Output goes next to the run's logs: the
+# Airflow task log folder when running in a task, else WEATHER_PROFILE_DIR.
+#
+# tracemalloc slows allocation-heavy stages down (~3x for write_bronze with one
+# frame per trace, ~18x with 16), and the sampler then sees that slowdown too:
+# profile with "sample" alone for timings. Deeper allocation tracebacks:
+# WEATHER_PROFILE_TRACEMALLOC_FRAMES.
+PROFILERS = ("sample", "cprofile", "memory")
+DEFAULT_PROFILERS = ("sample", "memory")
+
+PROFILE_DIR = os.getenv("WEATHER_PROFILE_DIR", "logs/profile")
+SAMPLE_INTERVAL_MS = float(os.getenv("WEATHER_PROFILE_INTERVAL_MS", "5"))
+TRACEMALLOC_FRAMES = int(os.getenv("WEATHER_PROFILE_TRACEMALLOC_FRAMES", "1"))
+TOP_N = int(os.getenv("WEATHER_PROFILE_TOP_N", "40"))
+
+
+def parse_profilers(value: str | None) -> tuple[str, ...]:
+    if value is None or value.strip().lower() in ("", "0", "false", "no", "off"):
+        return ()
+    if value.strip().lower() in ("1", "true", "yes", "on", "default"):
+        return DEFAULT_PROFILERS
+    names = tuple(dict.fromkeys(v.strip().lower() for v in value.split(",") if v.strip()))
+    unknown = [n for n in names if n not in PROFILERS]
+    if unknown:
+        raise ValueError(f"Unknown profiler(s) {unknown}. Allowed: {list(PROFILERS)}")
+    return names
+
+
+def enabled_profilers(stage: str) -> tuple[str, ...]:
+    """
+    Profilers for a stage from WEATHER_PROFILE, limited to WEATHER_PROFILE_STAGES
+    (comma-separated stage names) when set. Read on every call, so the CLI flag
+    and per-task env changes apply without re-importing.
+    """
+    profilers = parse_profilers(os.getenv("WEATHER_PROFILE"))
+    only = {s.strip() for s in os.getenv("WEATHER_PROFILE_STAGES", "").split(",") if s.strip()}
+    if only and stage not in only:
+        return ()
+    return profilers
+
+
+def add_profile_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="default",
+        default=None,
+        help=f"Profile the run: comma-separated {list(PROFILERS)} (bare flag: {','.join(DEFAULT_PROFILERS)})",
+    )
+
+
+def configure_profiling(value: str | None) -> None:
+    """Apply a --profile value; exported as WEATHER_PROFILE so worker processes inherit it."""
+    if value is None:
+        return
+    parse_profilers(value)  # validate before the run starts
+    os.environ["WEATHER_PROFILE"] = value
+
+
+def _airflow_log_dir() -> str | None:
+    # folder of the task attempt's log file under the default log_filename_template
+    try:
+        from airflow.configuration import conf
+        from airflow.operators.python import get_current_context
+    except ImportError:
+        return None
+    try:
+        ti = get_current_context()["ti"]
+    except Exception:
+        return None
+    parts = [conf.get("logging", "base_log_folder"), f"dag_id={ti.dag_id}", f"run_id={ti.run_id}", f"task_id={ti.task_id}"]
+    if getattr(ti, "map_index", -1) >= 0:
+        parts.append(f"map_index={ti.map_index}")
+    return os.path.join(*parts)
+
+
+def profile_dir() -> str:
+    return os.getenv("WEATHER_PROFILE_DIR") or _airflow_log_dir() or PROFILE_DIR
+
+
+def _file_stem(stage: str, values: dict[str, Any]) -> str:
+    label = "_".join(f"{k}={v}" for k, v in values.items() if v is not None)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    stem = f"profile_{stage}_{label}_{stamp}_pid{os.getpid()}" if label else f"profile_{stage}_{stamp}_pid{os.getpid()}"
+    return re.sub(r"[^A-Za-z0-9_.=-]", "_", stem)
+
+
+class StackSampler:
+    """
+    Samples the stacks of every thread (except its own) every `interval_s` and
+    counts identical stacks: a wall-clock profile, so time spent waiting on S3,
+    the API or Postgres shows up, which cProfile's CPU view of the main thread
+    misses. Output is one "thread;frame;...;frame count" line per stack.
+    """
+
+    def __init__(self, interval_s: float) -> None:
+        self.interval_s = interval_s
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        names: dict[int, str] = {}
+        while not self._stop.wait(self.interval_s):
+            frames = sys._current_frames()
+            if any(ident not in names for ident in frames):
+                # pool workers are named <pool>_<n>: one root per pool keeps the graph readable
+                names = {t.ident: re.sub(r"_\d+$", "", t.name) for t in threading.enumerate()}
+            for ident, frame in frames.items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(ident, f"thread-{ident}"))
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def write_collapsed(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, n in self.stacks.most_common():
+                f.write(f"{stack} {n}\n")
+
+
+def _write_allocations(path: str, snapshot: tracemalloc.Snapshot, peak: int, current: int) -> None:
+    snapshot = snapshot.filter_traces(
+        (tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__))
+    )
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"peak_traced_bytes={peak} live_traced_bytes_at_end={current}\n\n")
+        f.write(f"Top {TOP_N} allocation sites still live at the end (by line):\n")
+        for stat in snapshot.statistics("lineno")[:TOP_N]:
+            f.write(f"  {stat}\n")
+        if tracemalloc.get_traceback_limit() < 2:
+            return
+        f.write(f"\nTop 10 allocation tracebacks (up to {tracemalloc.get_traceback_limit()} frames):\n")
+        for stat in snapshot.statistics("traceback")[:10]:
+            f.write(f"\n  {stat.size} bytes in {stat.count} blocks\n")
+            for line in stat.traceback.format(most_recent_first=True):
+                f.write(f"    {line}\n")
+
+
+@contextmanager
+def profile_run(stage: str, values: dict[str, Any] | None = None) -> Iterator[None]:
+    """Profile the enclosed block with the profilers enabled for `stage` (a no-op if none)."""
+    profilers = enabled_profilers(stage)
+    if not profilers:
+        yield
+        return
+
+    out_dir = profile_dir()
+    try:
+        os.makedirs(out_dir, exist_ok=True)
+    except OSError as e:
+        print(f"[PROFILE] WARN cannot create {out_dir}, stage={stage} runs unprofiled: {type(e).__name__}: {e}")
+        yield
+        return
+    base = os.path.join(out_dir, _file_stem(stage, values or {}))
+
+    sampler = StackSampler(SAMPLE_INTERVAL_MS / 1000) if "sample" in profilers else None
+    profiler = cProfile.Profile() if "cprofile" in profilers else None
+    # tracemalloc may already be on (python -X tracemalloc): leave it running then
+    own_tracemalloc = "memory" in profilers and not tracemalloc.is_tracing()
+    if own_tracemalloc:
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+    if "memory" in profilers:
+        tracemalloc.reset_peak()
+
+    t0 = time.perf_counter()
+    if sampler is not None:
+        sampler.start()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        if sampler is not None:
+            sampler.stop()
+        duration = time.perf_counter() - t0
+
+        # like the metrics sinks, writing profiles never fails the stage nor hides its error
+        written = []
+        try:
+            if sampler is not None:
+                sampler.write_collapsed(f"{base}.collapsed")
+                written.append(f"{base}.collapsed")
+            if profiler is not None:
+                profiler.dump_stats(f"{base}.pstats")
+                text = io.StringIO()
+                pstats.Stats(profiler, stream=text).sort_stats("cumulative").print_stats(TOP_N)
+                with open(f"{base}.cprofile.txt", "w", encoding="utf-8") as f:
+                    f.write(text.getvalue())
+                written += [f"{base}.pstats", f"{base}.cprofile.txt"]
+            if "memory" in profilers:
+                current, peak = tracemalloc.get_traced_memory()
+                _write_allocations(f"{base}.alloc.txt", tracemalloc.take_snapshot(), peak, current)
+                written.append(f"{base}.alloc.txt")
+        except Exception as e:
+            print(f"[PROFILE] WARN writing profiles failed for stage={stage}: {type(e).__name__}: {e}")
+        finally:
+            if own_tracemalloc:
+                tracemalloc.stop()
+
+        extra = f" samples={sampler.samples}" if sampler is not None else ""
+        print(f"[PROFILE] stage={stage} profilers={','.join(profilers)} duration_s={duration:.3f}{extra} -> {' '.join(written)}")
@@ -1,20 +1,69 @@
 import os
+import threading
 import boto3
+from botocore.config import Config
 from dotenv import load_dotenv
 
+from src.common.instrumentation import instrument_s3_client
+
 load_dotenv()
 
-def get_s3_client():
-    return boto3.client(
+# boto3 clients are thread-safe but expensive to build (endpoint JSON, credential
+# chain, event hooks), so one client per process is shared by every module in src/.
+_client = None
+_client_pid: int | None = None
+_client_lock = threading.Lock()
+
+
+def _client_config() -> Config:
+    return Config(
+        # must cover the largest thread pool that shares the client
+        max_pool_connections=int(os.getenv("S3_MAX_POOL_CONNECTIONS", "32")),
+        retries={
+            "max_attempts": int(os.getenv("S3_MAX_ATTEMPTS", "5")),
+            "mode": os.getenv("S3_RETRY_MODE", "standard"),
+        },
+        connect_timeout=float(os.getenv("S3_CONNECT_TIMEOUT_S", "5")),
+        read_timeout=float(os.getenv("S3_READ_TIMEOUT_S", "60")),
+    )
+
+
+def new_s3_client():
+    """Build a fresh, uncached client (use get_s3_client() in pipeline code)."""
+    client = boto3.client(
         "s3",
         endpoint_url=os.getenv("S3_ENDPOINT_URL"),
         aws_access_key_id=os.getenv("S3_ACCESS_KEY"),
         aws_secret_access_key=os.getenv("S3_SECRET_KEY"),
         region_name=os.getenv("S3_REGION"),
+        config=_client_config(),
     )
+    instrument_s3_client(client)
+    return client
+
+
+def get_s3_client():
+    global _client, _client_pid
+    pid = os.getpid()
+    # a client inherited through fork (process pools) must not be reused
+    if _client is None or _client_pid != pid:
+        with _client_lock:
+            if _client is None or _client_pid != pid:
+                _client = new_s3_client()
+                _client_pid = pid
+    return _client
+
+
+def reset_s3_client() -> None:
+    """Drop the cached client, e.g. after changing S3_* env vars."""
+    global _client, _client_pid
+    with _client_lock:
+        _client = None
+        _client_pid = None
+
 
 def get_bucket_name() -> str:
     bucket = os.getenv("S3_BUCKET")
     if not bucket:
         raise ValueError("S3_BUCKET is not set in .env")
-    return bucket
\ No newline at end of file
+    return bucket
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import bisect
+import os
+from typing import Any, Callable
+
+# Location shards per dt: bronze ingestion and silver transforms run as one
+# task per shard (Airflow dynamic task mapping), then one task publishes the dt
+DEFAULT_SHARDS = int(os.getenv("WEATHER_SHARDS", "1"))
+
+
+def check_shard(shard: int, shards: int) -> None:
+    if shards < 1:
+        raise ValueError(f"shards must be >= 1, got {shards}")
+    if not 0 <= shard < shards:
+        raise ValueError(f"shard must be in [0, {shards}), got {shard}")
+
+
+def shard_bounds(location_ids: list[str], shards: int) -> list[str]:
+    """
+    shards - 1 split points over the sorted location ids: shard k holds the ids
+    in [bounds[k-1], bounds[k]). Shards are contiguous ranges of location_id,
+    so each shard's silver files cover a disjoint id range (readers prune them
+    by their min/max) and ids missing from the config still map to a shard.
+    """
+    check_shard(0, shards)
+    ids = sorted(set(location_ids))
+    if not ids:
+        raise ValueError("Cannot shard an empty location list")
+    return [ids[len(ids) * k // shards] for k in range(1, shards)]
+
+
+def shard_of(location_id: str, bounds: list[str]) -> int:
+    return bisect.bisect_right(bounds, location_id)
+
+
+def shard_filter(locations: list[dict[str, Any]], shard: int, shards: int) -> Callable[[str], bool]:
+    """location_id -> True if it belongs to `shard` of `shards` over `locations`."""
+    check_shard(shard, shards)
+    if shards == 1:
+        return lambda location_id: True
+    bounds = shard_bounds([str(loc["location_id"]) for loc in locations], shards)
+    return lambda location_id: shard_of(str(location_id), bounds) == shard
@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import hashlib
+import os
+from datetime import datetime, timezone
+from typing import Any
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+SILVER_PREFIX = "silver"
+DATASETS = ("weather_daily", "locations", "weather_hourly")
+
+# One manifest per dt covers every dataset of that dt, so a single PUT switches
+# readers from one complete run to the next.
+MANIFEST_PREFIX = f"{SILVER_PREFIX}/_manifests/"
+MANIFEST_FORMAT_VERSION = 1
+
+# Monthly compaction (src/transforms/silver_compact.py): many dts per file,
+# published through one manifest per (dataset, month)
+COMPACTED_DATASETS = ("weather_daily", "weather_hourly")
+COMPACTION_MANIFEST_PREFIX = f"{MANIFEST_PREFIX}compacted/"
+# Rows per compacted file; a month larger than this is split into several parts
+COMPACT_TARGET_ROWS = int(os.getenv("SILVER_COMPACT_TARGET_ROWS", "2000000"))
+
+# ---------- physical layout of silver files (see config/data_contract.md §6.2) ----------
+# Sort order: row-group min/max of the leading key become tight, so location
+# filters skip most row groups and runs of equal values compress well.
+SORT_KEYS = {
+    "weather_daily": ("location_id", "date"),
+    "locations": ("location_id",),
+    "weather_hourly": ("location_id", "time_epoch"),
+}
+# Columns written without dictionary encoding: unique per file. Everything else
+# (dt/date, condition_*, and the 1-decimal measures, which repeat a lot) gets a
+# dictionary. location_id is sorted, so plain + zstd beats a dictionary of
+# mostly distinct values (bench_silver_layout: ~20% smaller files).
+PLAIN_COLUMNS = {
+    "weather_daily": ("location_id", "ingested_at"),
+    "locations": ("location_id", "name", "lat", "lon", "local_time", "ingested_at"),
+    "weather_hourly": ("location_id", "ingested_at"),
+}
+COMPRESSION = os.getenv("SILVER_COMPRESSION", "zstd")
+COMPRESSION_LEVEL = int(os.getenv("SILVER_COMPRESSION_LEVEL", "3"))
+# Rows per row group: the unit of location / date pruning for readers
+ROW_GROUP_ROWS = int(os.getenv("SILVER_ROW_GROUP_ROWS", "65536"))
+
+
+def silver_dt_prefix(dataset: str, dt: str) -> str:
+    return f"{SILVER_PREFIX}/{dataset}/dt={dt}/"
+
+
+def legacy_silver_key(dataset: str, dt: str) -> str:
+    """Pre-manifest layout: one object overwritten in place."""
+    return f"{silver_dt_prefix(dataset, dt)}{dataset}.parquet"
+
+
+def silver_run_key(dataset: str, dt: str, run_id: str, index: int = 0) -> str:
+    return f"{silver_dt_prefix(dataset, dt)}run_id={run_id}/part-{index:05d}.parquet"
+
+
+def silver_manifest_key(dt: str) -> str:
+    return f"{MANIFEST_PREFIX}dt={dt}.json"
+
+
+def silver_compacted_prefix(dataset: str, month: str) -> str:
+    # "_compacted" sorts before "dt=", so dt listings starting at dt=<start> skip it
+    return f"{SILVER_PREFIX}/{dataset}/_compacted/month={month}/"
+
+
+def silver_compacted_key(dataset: str, month: str, run_id: str, index: int = 0) -> str:
+    return f"{silver_compacted_prefix(dataset, month)}run_id={run_id}/part-{index:05d}.parquet"
+
+
+def compaction_manifest_key(dataset: str, month: str) -> str:
+    return f"{COMPACTION_MANIFEST_PREFIX}{dataset}/month={month}.json"
+
+
+def new_run_id() -> str:
+    return datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+
+
+def schema_hash(schema: pa.Schema) -> str:
+    """Stable hash of column names/types (metadata ignored)."""
+    text = ",".join(f"{f.name}:{f.type}" for f in schema)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def sort_table(dataset: str, table: pa.Table) -> pa.Table:
+    keys = [k for k in SORT_KEYS.get(dataset, ()) if k in table.column_names]
+    return table.sort_by([(k, "ascending") for k in keys]) if keys else table
+
+
+def write_options(dataset: str, schema: pa.Schema) -> dict[str, Any]:
+    """pq.write_table kwargs for one silver dataset (table already sorted by sort_table)."""
+    if ROW_GROUP_ROWS < 1:
+        raise ValueError("SILVER_ROW_GROUP_ROWS must be >= 1")
+    keys = [k for k in SORT_KEYS.get(dataset, ()) if k in schema.names]
+    return {
+        "compression": COMPRESSION,
+        "compression_level": COMPRESSION_LEVEL if COMPRESSION in ("zstd", "gzip", "brotli") else None,
+        "use_dictionary": [c for c in schema.names if c not in PLAIN_COLUMNS.get(dataset, ())],
+        "row_group_size": ROW_GROUP_ROWS,
+        "write_statistics": True,
+        "sorting_columns": pq.SortingColumn.from_ordering(schema, [(k, "ascending") for k in keys]) if keys else None,
+    }
+
+
+def _json_scalar(value: Any) -> Any:
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return value.isoformat() if hasattr(value, "isoformat") else str(value)
+
+
+def column_stats(table: pa.Table) -> dict[str, dict[str, Any]]:
+    """min / max / null_count per orderable column, for pruning without opening files."""
+    out: dict[str, dict[str, Any]] = {}
+    for field in table.schema:
+        col = table.column(field.name)
+        stats: dict[str, Any] = {"null_count": col.null_count}
+        typ = field.type
+        if pa.types.is_dictionary(typ):
+            typ = typ.value_type
+        if (
+            pa.types.is_integer(typ)
+            or pa.types.is_floating(typ)
+            or pa.types.is_temporal(typ)
+            or pa.types.is_string(typ)
+        ) and col.null_count < len(col):
+            mm = pc.min_max(col)
+            stats["min"] = _json_scalar(mm["min"].as_py())
+            stats["max"] = _json_scalar(mm["max"].as_py())
+        out[field.name] = stats
+    return out
+
+
+def dataset_entry(table: pa.Table, files: list[dict[str, Any]]) -> dict[str, Any]:
+    return {
+        "files": files,
+        "rows": table.num_rows,
+        "schema_hash": schema_hash(table.schema),
+        "stats": column_stats(table),
+    }
+
+
+def merge_dataset_entries(entries: list[dict[str, Any]]) -> dict[str, Any]:
+    """
+    One dataset entry over the files of several (location shards of one dt).
+    Each file keeps its own stats, so location filters skip whole shards.
+    """
+    hashes = {e["schema_hash"] for e in entries}
+    if len(hashes) > 1:
+        raise ValueError(f"Cannot merge silver files with different schemas: {sorted(hashes)}")
+    stats: dict[str, dict[str, Any]] = {}
+    for e in entries:
+        for name, col in e["stats"].items():
+            out = stats.setdefault(name, {"null_count": 0})
+            out["null_count"] += col["null_count"]
+            if "min" in col:
+                out["min"] = col["min"] if "min" not in out else min(out["min"], col["min"])
+                out["max"] = col["max"] if "max" not in out else max(out["max"], col["max"])
+    return {
+        "files": [{**f, "stats": f.get("stats", e["stats"])} for e in entries for f in e["files"]],
+        "rows": sum(e["rows"] for e in entries),
+        "schema_hash": hashes.pop(),
+        "stats": stats,
+    }
+
+
+def dataset_version(entry: dict[str, Any]) -> str:
+    """
+    Version of one dataset in a dt manifest: its file keys carry the run_id, so
+    it changes when that dataset is rewritten, not when another one of the dt is.
+    """
+    text = ",".join(sorted(f["key"] for f in entry["files"]))
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def file_entry(key: str, body_len: int, table: pa.Table, row_groups: int) -> dict[str, Any]:
+    return {"key": key, "bytes": body_len, "rows": table.num_rows, "row_groups": row_groups}
+
+
+def build_manifest(dt: str, run_id: str, datasets: dict[str, dict[str, Any]]) -> dict[str, Any]:
+    return {
+        "format_version": MANIFEST_FORMAT_VERSION,
+        "dt": dt,
+        "run_id": run_id,
+        "committed_at": datetime.now(timezone.utc).isoformat(),
+        "datasets": datasets,
+    }
+
+
+def build_compaction_manifest(
+    dataset: str,
+    month: str,
+    run_id: str,
+    dts: dict[str, str],
+    entry: dict[str, Any],
+    versions: dict[str, str] | None = None,
+) -> dict[str, Any]:
+    """
+    dts maps every compacted dt to the ETag of the daily manifest (or legacy
+    object) it was built from, versions to the dataset_version of its manifest
+    entry. Matching ETags (LIST only) keep a dt served from the compacted files;
+    when the manifest changed, the dt stays compacted only if this dataset's
+    version is the same (another dataset of the dt was republished). A late
+    rerun of the dataset itself takes the dt over again.
+    """
+    return {
+        "format_version": MANIFEST_FORMAT_VERSION,
+        "dataset": dataset,
+        "month": month,
+        "run_id": run_id,
+        "committed_at": datetime.now(timezone.utc).isoformat(),
+        "dts": dts,
+        "versions": versions or {},
+        **entry,
+    }
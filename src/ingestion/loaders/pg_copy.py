@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import io
+import os
+
+import pyarrow as pa
+import pyarrow.csv as pacsv
+
+from src.common.instrumentation import incr, span
+
+# "copy": COPY ... FROM STDIN (CSV) from an Arrow table, no per-cell Python work
+# "insert": legacy execute_values path over Python tuples
+# "merge": COPY into a temp table, then upsert only rows whose content hash changed
+LOAD_METHODS = ("merge", "copy", "insert")
+DEFAULT_LOAD_METHOD = os.getenv("PG_LOAD_METHOD", "merge")
+
+
+def check_load_method(load_method: str | None) -> str:
+    load_method = load_method or DEFAULT_LOAD_METHOD
+    if load_method not in LOAD_METHODS:
+        raise ValueError(f"Unknown load method '{load_method}'. Allowed: {list(LOAD_METHODS)}")
+    return load_method
+
+
+def conform(table: pa.Table, cols: list[str], types: dict[str, pa.DataType]) -> pa.Table:
+    """Select cols in order and cast them to the given Arrow types (vectorized)."""
+    missing = [c for c in cols if c not in table.column_names]
+    if missing:
+        raise ValueError(f"Silver schema mismatch. Missing columns: {missing}")
+    arrays = []
+    with span("pg.conform"):
+        for c in cols:
+            arr = table.column(c)
+            if c in types and arr.type != types[c]:
+                # safe=False: legacy pandas-written silver has ns timestamps
+                arr = arr.cast(types[c], safe=False)
+            arrays.append(arr)
+    return pa.Table.from_arrays(arrays, names=cols).replace_schema_metadata(None)
+
+
+def to_csv_buffer(table: pa.Table) -> io.BytesIO:
+    """
+    Encode a table as COPY-compatible CSV in Arrow's C++ writer.
+    Every non-null value is quoted and NULLs are written unquoted-empty, so COPY
+    can tell NULL from an empty string.
+    """
+    buf = io.BytesIO()
+    with span("pg.csv_encode"):
+        pacsv.write_csv(
+            table,
+            buf,
+            write_options=pacsv.WriteOptions(include_header=False, quoting_style="all_valid"),
+        )
+    incr("pg.copy_bytes", buf.tell())
+    buf.seek(0)
+    return buf
+
+
+def copy_arrow(cur, target: str, table: pa.Table) -> int:
+    cols = ", ".join(table.column_names)
+    buf = to_csv_buffer(table)
+    with span("pg.copy"):
+        cur.copy_expert(f"COPY {target} ({cols}) FROM STDIN WITH (FORMAT csv)", buf)
+    incr("pg.copy_rows", table.num_rows)
+    return table.num_rows
+
+
+def _content_hash(alias: str, schema: pa.Schema, cols: list[str]) -> str:
+    # float8 for float columns: numeric keeps input scale, and '1.0' vs '1' must hash equal
+    exprs = [
+        f"{alias}.{c}::float8" if pa.types.is_floating(schema.field(c).type) else f"{alias}.{c}"
+        for c in cols
+    ]
+    return "md5(row(" + ", ".join(exprs) + ")::text)"
+
+
+def create_merge_stage(cur, target: str) -> str:
+    """Temp table shaped like `target` (temp tables skip WAL), dropped at commit; COPY rows into it."""
+    stage = "_merge_" + target.replace(".", "_")
+    cur.execute(f"DROP TABLE IF EXISTS {stage}")
+    cur.execute(f"CREATE TEMP TABLE {stage} (LIKE {target} INCLUDING DEFAULTS) ON COMMIT DROP")
+    return stage
+
+
+def apply_merge(
+    cur,
+    target: str,
+    stage: str,
+    schema: pa.Schema,
+    n_rows: int,
+    key_cols: list[str],
+    hash_cols: list[str],
+    scope_sql: str = "TRUE",
+    scope_params: tuple = (),
+) -> dict[str, int]:
+    """
+    Merge the n_rows rows COPY'd into `stage` (create_merge_stage) into `target`;
+    see merge_arrow. `schema` is the Arrow schema the rows were copied from.
+    """
+    cols = schema.names
+    keys = ", ".join(key_cols)
+    col_list = ", ".join(cols)
+    updates = ", ".join(f"{c} = EXCLUDED.{c}" for c in cols if c not in key_cols)
+    key_match = " AND ".join(f"t.{c} = s.{c}" for c in key_cols)
+
+    with span("pg.merge_delete"):
+        cur.execute(
+            f"DELETE FROM {target} t WHERE ({scope_sql}) AND NOT EXISTS (SELECT 1 FROM {stage} s WHERE {key_match})",
+            scope_params,
+        )
+    deleted = cur.rowcount
+
+    # xmax = 0 only for freshly inserted tuples; skipped (unchanged) rows are not returned
+    with span("pg.merge_upsert"):
+        cur.execute(
+            f"""
+            WITH upserted AS (
+                INSERT INTO {target} AS t ({col_list})
+                SELECT {col_list} FROM {stage}
+                ON CONFLICT ({keys}) DO UPDATE SET {updates}, loaded_at = now()
+                WHERE {_content_hash("t", schema, hash_cols)} IS DISTINCT FROM {_content_hash("EXCLUDED", schema, hash_cols)}
+                RETURNING (xmax = 0) AS inserted
+            )
+            SELECT count(*) FILTER (WHERE inserted), count(*) FILTER (WHERE NOT inserted) FROM upserted
+            """
+        )
+    inserted, updated = cur.fetchone()
+    return {
+        "inserted": inserted,
+        "updated": updated,
+        "unchanged": n_rows - inserted - updated,
+        "deleted": deleted,
+    }
+
+
+def merge_arrow(
+    cur,
+    target: str,
+    table: pa.Table,
+    key_cols: list[str],
+    hash_cols: list[str],
+    scope_sql: str = "TRUE",
+    scope_params: tuple = (),
+) -> dict[str, int]:
+    """
+    Upsert `table` into `target` without rewriting unchanged rows.
+
+    Rows are COPY'd into a temp table (temp tables skip WAL), then
+    INSERT ... ON CONFLICT (key_cols) DO UPDATE fires only where the md5 over
+    `hash_cols` differs. Target rows matching `scope_sql` (e.g. "dt = %s") whose
+    key is absent from `table` are deleted, so the result equals a DELETE+INSERT
+    of the scope. Returns inserted / updated / unchanged / deleted counts.
+    """
+    stage = create_merge_stage(cur, target)
+    copy_arrow(cur, stage, table)
+    return apply_merge(cur, target, stage, table.schema, table.num_rows, key_cols, hash_cols, scope_sql, scope_params)
@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import Any, Iterator
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from src.common.concurrency import iter_ordered
+from src.common.dwh import dwh_connection
+from src.common.instrumentation import stage
+from src.common.s3_client import get_bucket_name
+from src.ingestion.loaders.pg_copy import apply_merge, check_load_method, conform, copy_arrow, create_merge_stage
+from src.ingestion.loaders.postgres_loader_daily import ARROW_TYPES, COLS, HASH_COLS, KEY_COLS
+from src.transforms.silver_store import SilverFooter, iter_silver_sources, read_silver_footer, read_silver_row_group
+
+# Rows per Postgres transaction (whole dt partitions are never split across two)
+DEFAULT_BATCH_ROWS = int(os.getenv("PG_LOAD_BATCH_ROWS", "50000"))
+# Parallel silver GETs (row groups); together with the queue this bounds memory
+DEFAULT_DOWNLOAD_CONCURRENCY = int(os.getenv("PG_LOAD_DOWNLOAD_CONCURRENCY", "4"))
+# Decoded row groups waiting for the writer
+_QUEUE_DEPTH = 4
+
+
+def _read_chunk(bucket: str, footer: SilverFooter, index: int, keep: pa.Array) -> tuple[str, pa.Table]:
+    table = conform(read_silver_row_group(bucket, footer, index, columns=COLS), COLS, ARROW_TYPES)
+    # compacted months also hold dts outside the range or rerun since compaction
+    return "rows", table.filter(pc.is_in(table.column("dt"), value_set=keep))
+
+
+def _marker(kind: str, payload: Any) -> tuple[str, Any]:
+    return kind, payload
+
+
+def _iter_load_items(
+    bucket: str,
+    start: str,
+    end: str,
+    batch_rows: int,
+    download_concurrency: int,
+) -> Iterator[tuple[str, Any]]:
+    """
+    The load as a stream of ("begin", dts) / ("rows", table) / ("commit", None)
+    items. Rows are one row group each, read with ranged GETs on a bounded pool
+    in source order, so memory is bounded by download_concurrency row groups,
+    not by object or month size. Transactions span whole sources (one dt, or a
+    compacted month: see iter_silver_sources, its dts are spread over all of its
+    files) and commit once >= batch_rows rows are in.
+    """
+    sources = list(iter_silver_sources(bucket, "weather_daily", start, end))
+
+    with ThreadPoolExecutor(max_workers=download_concurrency) as pool:
+        footer_calls = ((read_silver_footer, bucket, key) for _, keys in sources for key in keys)
+        footers = iter_ordered(pool, footer_calls, download_concurrency)
+
+        def calls() -> Iterator[tuple]:
+            # markers go through the pool too, so they come back in order with the rows
+            for source_dts, keys in sources:
+                yield _marker, "begin", source_dts
+                keep = pa.array([date.fromisoformat(d) for d in source_dts], pa.date32())
+                for _ in keys:
+                    footer = next(footers)
+                    for i in range(footer.metadata.num_row_groups):
+                        yield _read_chunk, bucket, footer, i, keep
+                yield _marker, "end", None
+
+        n_rows = 0
+        for kind, payload in iter_ordered(pool, calls(), download_concurrency):
+            if kind == "end":
+                if n_rows >= batch_rows:
+                    yield "commit", None
+                    n_rows = 0
+                continue
+            if kind == "rows":
+                if not payload.num_rows:
+                    continue
+                n_rows += payload.num_rows
+            yield kind, payload
+    yield "commit", None
+
+
+def _produce(
+    out: queue.Queue,
+    stop: threading.Event,
+    bucket: str,
+    start: str,
+    end: str,
+    batch_rows: int,
+    download_concurrency: int,
+) -> None:
+    # runs on its own thread: S3 GETs + parquet decoding overlap with the COPY of the previous batch
+    try:
+        for item in _iter_load_items(bucket, start, end, batch_rows, download_concurrency):
+            while not stop.is_set():
+                try:
+                    out.put(item, timeout=0.5)
+                    break
+                except queue.Full:
+                    continue
+            if stop.is_set():
+                return
+        out.put(None)
+    except BaseException as e:
+        out.put(e)
+
+
+@stage("load_postgres_daily_range", labels=("start", "end"))
+def run_range(
+    start: str,
+    end: str,
+    load_method: str | None = None,
+    batch_rows: int | None = None,
+    download_concurrency: int | None = None,
+) -> dict[str, Any]:
+    """
+    Load every silver daily partition with start <= dt <= end into staging.stg_weather_daily
+    over one connection, committing once per batch of whole partitions.
+
+    Memory stays bounded by a few row groups, independent of the range size
+    and of the size of silver objects or compacted months.
+    """
+    load_method = check_load_method(load_method)
+    if load_method == "insert":
+        raise ValueError("Range loads support load_method 'merge' or 'copy'")
+    batch_rows = batch_rows or DEFAULT_BATCH_ROWS
+    download_concurrency = download_concurrency or DEFAULT_DOWNLOAD_CONCURRENCY
+    if batch_rows < 1 or download_concurrency < 1:
+        raise ValueError("batch_rows and download_concurrency must be >= 1")
+    if end < start:
+        raise ValueError(f"end ({end}) is before start ({start})")
+
+    bucket = get_bucket_name()
+    stats: dict[str, Any] = {"partitions": 0, "rows": 0, "batches": 0}
+    t0 = time.perf_counter()
+    target = "staging.stg_weather_daily"
+    schema = conform(pa.table({c: [] for c in COLS}), COLS, ARROW_TYPES).schema
+
+    items: queue.Queue = queue.Queue(maxsize=_QUEUE_DEPTH)
+    stop = threading.Event()
+    producer = threading.Thread(
+        target=_produce,
+        args=(items, stop, bucket, start, end, batch_rows, download_concurrency),
+        name="silver-range-reader",
+        daemon=True,
+    )
+    producer.start()
+
+    try:
+        with dwh_connection("load") as conn:
+            with conn.cursor() as cur:
+                dts: list[str] = []
+                n_rows = 0
+                merge_stage = None
+                while True:
+                    item = items.get()
+                    if item is None:
+                        break
+                    if isinstance(item, BaseException):
+                        raise item
+
+                    kind, payload = item
+                    if kind == "begin":
+                        dts.extend(payload)
+                        if load_method == "merge":
+                            merge_stage = merge_stage or create_merge_stage(cur, target)
+                        else:
+                            cur.execute(f"DELETE FROM {target} WHERE dt = ANY(%s::date[]);", (payload,))
+                        continue
+                    if kind == "rows":
+                        copy_arrow(cur, merge_stage or target, payload)
+                        n_rows += payload.num_rows
+                        continue
+                    if not dts:
+                        continue
+
+                    if load_method == "merge":
+                        counts = apply_merge(
+                            cur,
+                            target,
+                            merge_stage,
+                            schema,
+                            n_rows,
+                            KEY_COLS,
+                            HASH_COLS,
+                            scope_sql="t.dt = ANY(%s::date[])",
+                            scope_params=(dts,),
+                        )
+                        for k, v in counts.items():
+                            stats[k] = stats.get(k, 0) + v
+                    conn.commit()  # drops the merge stage (ON COMMIT DROP)
+
+                    stats["partitions"] += len(dts)
+                    stats["rows"] += n_rows
+                    stats["batches"] += 1
+                    print(
+                        f"[LOAD_POSTGRES_RANGE] committed batch={stats['batches']} "
+                        f"dts={min(dts)}..{max(dts)} partitions={len(dts)} rows={n_rows}"
+                    )
+                    dts, n_rows, merge_stage = [], 0, None
+    finally:
+        stop.set()
+        producer.join(timeout=5)
+
+    stats["duration_s"] = round(time.perf_counter() - t0, 3)
+    detail = " ".join(f"{k}={v}" for k, v in stats.items())
+    print(f"[LOAD_POSTGRES_RANGE] OK {start}..{end} method={load_method} {detail} from s3://{bucket}/silver/weather_daily")
+    return stats
+
+
+if __name__ == "__main__":
+    import argparse
+    from src.common.profiling import add_profile_argument, configure_profiling
+
+    parser = argparse.ArgumentParser(description="Load a date range of Silver daily parquet -> Postgres staging")
+    parser.add_argument("--start", type=str, required=True, help="First dt YYYY-MM-DD")
+    parser.add_argument("--end", type=str, required=True, help="Last dt YYYY-MM-DD (inclusive)")
+    parser.add_argument("--load_method", type=str, default=None, help="merge | copy")
+    parser.add_argument("--batch_rows", type=int, default=None, help="Rows per transaction")
+    parser.add_argument("--download_concurrency", type=int, default=None, help="Parallel silver GETs")
+    add_profile_argument(parser)
+    args = parser.parse_args()
+    configure_profiling(args.profile)
+
+    run_range(
+        args.start,
+        args.end,
+        load_method=args.load_method,
+        batch_rows=args.batch_rows,
+        download_concurrency=args.download_concurrency,
+    )
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import pyarrow as pa
+
+from src.common.dwh import dwh_connection
+from src.common.instrumentation import stage
+from src.common.s3_client import get_bucket_name
+from src.common.silver_format import silver_manifest_key
+from src.ingestion.loaders.pg_copy import check_load_method, conform, copy_arrow, merge_arrow
+from src.transforms.silver_store import read_silver_manifest, read_silver_table
+
+COLS = [
+    "dt",
+    "location_id",
+    "date",
+    "time_epoch",
+    "hour",
+    "temp_c",
+    "feelslike_c",
+    "dewpoint_c",
+    "humidity",
+    "cloud",
+    "precip_mm",
+    "snow_cm",
+    "chance_of_rain",
+    "chance_of_snow",
+    "wind_kph",
+    "gust_kph",
+    "wind_degree",
+    "pressure_mb",
+    "vis_km",
+    "uv",
+    "is_day",
+    "condition_code",
+    "condition_text",
+    "ingested_at",
+]
+
+KEY_COLS = ["location_id", "time_epoch"]
+
+# Columns whose change makes a row "updated"; ingested_at alone does not
+HASH_COLS = [c for c in COLS if c not in ("dt", "location_id", "date", "time_epoch", "hour", "ingested_at")]
+
+# silver types already match the staging columns (real / smallint); only
+# guard against files written by another writer
+ARROW_TYPES = {
+    "dt": pa.date32(),
+    "date": pa.date32(),
+    "time_epoch": pa.int64(),
+    "ingested_at": pa.timestamp("us", tz="UTC"),
+}
+
+
+def load_table(dt: str, table: pa.Table, load_method: str | None = None, source: str = "memory") -> dict[str, int]:
+    """Load an Arrow silver hourly table for dt into staging.stg_weather_hourly (merge or copy)."""
+    load_method = check_load_method(load_method)
+    if load_method == "insert":
+        raise ValueError("Hourly loads support load_method 'merge' or 'copy'")
+    table = conform(table, COLS, ARROW_TYPES)
+
+    with dwh_connection("load") as conn:
+        with conn.cursor() as cur:
+            if load_method == "merge":
+                counts = merge_arrow(
+                    cur,
+                    "staging.stg_weather_hourly",
+                    table,
+                    KEY_COLS,
+                    HASH_COLS,
+                    scope_sql="t.dt = %s",
+                    scope_params=(dt,),
+                )
+            else:
+                cur.execute("DELETE FROM staging.stg_weather_hourly WHERE dt = %s;", (dt,))
+                counts = {"inserted": copy_arrow(cur, "staging.stg_weather_hourly", table)}
+
+    stats = " ".join(f"{k}={v}" for k, v in counts.items())
+    print(f"[LOAD_POSTGRES_HOURLY] OK dt={dt} rows={table.num_rows} method={load_method} {stats} from {source}")
+    return counts
+
+
+@stage("load_postgres_hourly")
+def run(dt: str, load_method: str | None = None) -> None:
+    # Load Silver hourly parquet (for dt) into Postgres staging.stg_weather_hourly.
+    bucket = get_bucket_name()
+    manifest = read_silver_manifest(bucket, dt)
+    if manifest is None:
+        raise ValueError(f"No silver manifest for dt={dt}: s3://{bucket}/{silver_manifest_key(dt)}")
+
+    table = read_silver_table(bucket, dt, "weather_hourly", manifest)
+    load_table(dt, table, load_method, source=f"s3://{bucket}/{silver_manifest_key(dt)}")
+
+
+if __name__ == "__main__":
+    import argparse
+    from datetime import date
+    from src.common.profiling import add_profile_argument, configure_profiling
+
+    parser = argparse.ArgumentParser(description="Load Silver hourly parquet -> Postgres staging")
+    parser.add_argument("--dt", type=str, default=date.today().isoformat())
+    parser.add_argument("--load_method", type=str, default=None, help="merge | copy")
+    add_profile_argument(parser)
+    args = parser.parse_args()
+    configure_profiling(args.profile)
+
+    run(args.dt, load_method=args.load_method)
@@ -1,29 +1,48 @@
 from __future__ import annotations
 
-import io
-import os
 from typing import Any
 
 import numpy as np
 import pandas as pd
-import psycopg2
+import pyarrow as pa
 from psycopg2.extras import execute_values
 
-from src.common.s3_client import get_s3_client, get_bucket_name
-
-
-def _read_parquet_from_s3(bucket: str, key: str) -> pd.DataFrame:
-    s3 = get_s3_client()
-    obj = s3.get_object(Bucket=bucket, Key=key)
-    body = obj["Body"].read()
-    return pd.read_parquet(io.BytesIO(body))
-
-
-def _get_pg_conn():
-    dsn = os.getenv("WEATHER_DWH_PG_DSN")
-    if not dsn:
-        raise ValueError("WEATHER_DWH_PG_DSN is not set")
-    return psycopg2.connect(dsn)
+from src.common.dwh import dwh_connection
+from src.common.instrumentation import stage
+from src.common.s3_client import get_bucket_name
+from src.common.silver_format import legacy_silver_key, silver_manifest_key
+from src.ingestion.loaders.pg_copy import (
+    check_load_method,
+    conform,
+    copy_arrow,
+    merge_arrow,
+)
+from src.transforms.silver_normalize import dedup_keep_last
+from src.transforms.silver_store import read_silver_manifest, read_silver_table
+
+COLS = [
+    "dt",
+    "location_id",
+    "name",
+    "region",
+    "country",
+    "lat",
+    "lon",
+    "tz_id",
+    "local_time",
+    "ingested_at",
+]
+
+# dt / local_time / ingested_at move on every fetch; only attribute changes count
+HASH_COLS = ["name", "region", "country", "lat", "lon", "tz_id"]
+
+ARROW_TYPES = {
+    "dt": pa.date32(),
+    "lat": pa.float64(),
+    "lon": pa.float64(),
+    "local_time": pa.timestamp("us"),
+    "ingested_at": pa.timestamp("us", tz="UTC"),
+}
 
 
 def _to_py_rows(df: pd.DataFrame) -> list[tuple[Any, ...]]:
@@ -46,13 +65,48 @@ def _to_py_rows(df: pd.DataFrame) -> list[tuple[Any, ...]]:
     return out
 
 
-def run(dt: str) -> None:
+def load_table(dt: str, table: pa.Table, load_method: str | None = None, source: str = "memory") -> dict[str, int]:
+    """Load an Arrow silver locations table (merge or copy); used by run() and fused stages."""
+    load_method = check_load_method(load_method)
+    if load_method == "insert":
+        raise ValueError("load_table supports load_method 'merge' or 'copy'")
+    table = dedup_keep_last(conform(table, COLS, ARROW_TYPES), ["location_id"])
+
+    with dwh_connection("load") as conn:
+        with conn.cursor() as cur:
+            if load_method == "merge":
+                # snapshot semantics: locations missing from this dt are removed
+                counts = merge_arrow(cur, "staging.stg_locations", table, ["location_id"], HASH_COLS)
+                # attributes rarely change, so the merge leaves loaded_at old on most rows; dbt
+                # source freshness checks max(loaded_at), so every loaded row is touched (small table)
+                cur.execute("UPDATE staging.stg_locations SET loaded_at = now() WHERE loaded_at < now()")
+                counts["touched"] = cur.rowcount
+            else:
+                # Arrow -> CSV -> COPY: casts and NULL handling are vectorized
+                cur.execute("DELETE FROM staging.stg_locations;")
+                counts = {"inserted": copy_arrow(cur, "staging.stg_locations", table)}
+
+    stats = " ".join(f"{k}={v}" for k, v in counts.items())
+    print(f"[LOAD_POSTGRES_LOCATIONS] OK dt={dt} rows={table.num_rows} method={load_method} {stats} from {source}")
+    return counts
+
+
+@stage("load_postgres_locations")
+def run(dt: str, load_method: str | None = None) -> None:
 
     # Load Silver locations parquet (for dt) into Postgres staging.stg_locations.
    
+    load_method = check_load_method(load_method)
     bucket = get_bucket_name()
-    s3_key = f"silver/locations/dt={dt}/locations.parquet"
-    df = _read_parquet_from_s3(bucket, s3_key)
+
+    manifest = read_silver_manifest(bucket, dt)
+    source_key = silver_manifest_key(dt) if manifest else legacy_silver_key("locations", dt)
+    source = f"s3://{bucket}/{source_key}"
+    if load_method != "insert":
+        load_table(dt, read_silver_table(bucket, dt, "locations", manifest), load_method, source=source)
+        return
+
+    df = read_silver_table(bucket, dt, "locations", manifest).to_pandas()
 
     if "dt" in df.columns:
         df["dt"] = pd.to_datetime(df["dt"], errors="coerce").dt.date
@@ -61,27 +115,14 @@ def run(dt: str) -> None:
     df["lon"] = pd.to_numeric(df.get("lon"), errors="coerce")
     df["local_time"] = pd.to_datetime(df.get("local_time"), errors="coerce")
 
-    cols = [
-        "dt",
-        "location_id",
-        "name",
-        "region",
-        "country",
-        "lat",
-        "lon",
-        "tz_id",
-        "local_time",
-        "ingested_at",
-    ]
-
-    missing = [c for c in cols if c not in df.columns]
+    missing = [c for c in COLS if c not in df.columns]
     if missing:
         raise ValueError(f"Silver locations schema mismatch. Missing columns: {missing}")
 
-    df = df[cols].drop_duplicates(subset=["location_id"], keep="last")
+    df = df[COLS].drop_duplicates(subset=["location_id"], keep="last")
     rows = _to_py_rows(df)
 
-    with _get_pg_conn() as conn:
+    with dwh_connection("load") as conn:
         with conn.cursor() as cur:
             cur.execute("DELETE FROM staging.stg_locations;")
 
@@ -92,15 +133,19 @@ def run(dt: str) -> None:
             """
             execute_values(cur, insert_sql, rows, page_size=1000)
 
-    print(f"[LOAD_POSTGRES_LOCATIONS] OK dt={dt} rows={len(rows)} from s3://{bucket}/{s3_key}")
+    print(f"[LOAD_POSTGRES_LOCATIONS] OK dt={dt} rows={len(rows)} method=insert from {source}")
 
 
 if __name__ == "__main__":
     import argparse
     from datetime import date
+    from src.common.profiling import add_profile_argument, configure_profiling
 
     parser = argparse.ArgumentParser(description="Load Silver locations parquet -> Postgres staging")
     parser.add_argument("--dt", type=str, default=date.today().isoformat())
+    parser.add_argument("--load_method", type=str, default=None, help="merge | copy | insert")
+    add_profile_argument(parser)
     args = parser.parse_args()
+    configure_profiling(args.profile)
 
-    run(args.dt)
\ No newline at end of file
+    run(args.dt, load_method=args.load_method)
\ No newline at end of file
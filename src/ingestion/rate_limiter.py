@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import os
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any
+
+
+class QuotaExceededError(RuntimeError):
+    pass
+
+
+class CircuitOpenError(RuntimeError):
+    pass
+
+
+def _env_float(name: str, default: float) -> float:
+    v = os.getenv(name)
+    return float(v) if v not in (None, "") else default
+
+
+def _env_int(name: str, default: int) -> int:
+    v = os.getenv(name)
+    return int(v) if v not in (None, "") else default
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """
+    Parse a Retry-After header (delta-seconds or HTTP-date) into seconds to wait.
+    Returns None when the header is missing or unparseable.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def backoff_delay(attempt: int, base_s: float, cap_s: float) -> float:
+    # "Full jitter": uniform in [0, min(cap, base * 2^(attempt-1))]
+    return random.uniform(0.0, min(cap_s, base_s * (2 ** (attempt - 1))))
+
+
+class RateLimiter:
+    """
+    Process-wide limiter shared by every WeatherAPI caller:
+    - token bucket for requests/second (burst = max_rps)
+    - per-UTC-day request quota
+    - circuit breaker opened after N consecutive failed requests
+    - counters for sizing concurrency (see snapshot())
+    """
+
+    def __init__(
+        self,
+        max_rps: float = 5.0,
+        max_requests_per_day: int = 0,
+        breaker_threshold: int = 10,
+        breaker_cooldown_s: float = 60.0,
+    ) -> None:
+        self.max_rps = max_rps
+        self.max_requests_per_day = max_requests_per_day  # 0 = unlimited
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown_s = breaker_cooldown_s
+
+        self._lock = threading.Lock()
+        self._tokens = max(1.0, max_rps)
+        self._last_refill = time.monotonic()
+
+        self._day = datetime.now(timezone.utc).date()
+        self._day_count = 0
+
+        self._consecutive_failures = 0
+        self._opened_at: float | None = None
+
+        self._counters = {
+            "requests": 0,
+            "throttled": 0,
+            "throttled_wait_s": 0.0,
+            "http_429": 0,
+            "retried": 0,
+            "gave_up": 0,
+            "circuit_rejected": 0,
+            "circuit_opened": 0,
+        }
+
+    def _incr(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self._counters[name] += value
+
+    def _check_circuit(self) -> None:
+        # caller holds the lock
+        if self._opened_at is None:
+            return
+        if time.monotonic() - self._opened_at >= self.breaker_cooldown_s:
+            # half-open: let requests through, a single failure re-opens it
+            self._opened_at = None
+            self._consecutive_failures = self.breaker_threshold - 1
+            return
+        self._counters["circuit_rejected"] += 1
+        raise CircuitOpenError(
+            f"WeatherAPI circuit is open after {self.breaker_threshold} consecutive failures; "
+            f"retry after {self.breaker_cooldown_s:g}s cooldown"
+        )
+
+    def _check_quota(self) -> None:
+        # caller holds the lock
+        today = datetime.now(timezone.utc).date()
+        if today != self._day:
+            self._day = today
+            self._day_count = 0
+        if self.max_requests_per_day and self._day_count >= self.max_requests_per_day:
+            raise QuotaExceededError(
+                f"WeatherAPI daily quota reached: {self._day_count}/{self.max_requests_per_day}"
+            )
+
+    def acquire(self) -> None:
+        """Block until a request may be sent. Raises if the circuit is open or quota is used up."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._check_circuit()
+                self._check_quota()
+
+                now = time.monotonic()
+                if self.max_rps > 0:
+                    self._tokens = min(
+                        max(1.0, self.max_rps),
+                        self._tokens + (now - self._last_refill) * self.max_rps,
+                    )
+                    self._last_refill = now
+
+                if self.max_rps <= 0 or self._tokens >= 1.0:
+                    if self.max_rps > 0:
+                        self._tokens -= 1.0
+                    self._day_count += 1
+                    self._counters["requests"] += 1
+                    if waited:
+                        self._counters["throttled"] += 1
+                        self._counters["throttled_wait_s"] += waited
+                    return
+
+                sleep_s = (1.0 - self._tokens) / self.max_rps
+
+            time.sleep(sleep_s)
+            waited += sleep_s
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._consecutive_failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._consecutive_failures += 1
+            if self._opened_at is None and self._consecutive_failures >= self.breaker_threshold:
+                self._opened_at = time.monotonic()
+                self._counters["circuit_opened"] += 1
+
+    def record_throttled_response(self) -> None:
+        self._incr("http_429")
+
+    def record_retry(self) -> None:
+        self._incr("retried")
+
+    def record_gave_up(self) -> None:
+        self._incr("gave_up")
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            out: dict[str, Any] = dict(self._counters)
+            out["requests_today"] = self._day_count
+            out["circuit_open"] = self._opened_at is not None
+        out["throttled_wait_s"] = round(out["throttled_wait_s"], 3)
+        return out
+
+
+_limiter: RateLimiter | None = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Return the process-wide limiter, configured from env on first use."""
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = RateLimiter(
+                    max_rps=_env_float("WEATHERAPI_MAX_RPS", 5.0),
+                    max_requests_per_day=_env_int("WEATHERAPI_MAX_REQUESTS_PER_DAY", 0),
+                    breaker_threshold=_env_int("WEATHERAPI_BREAKER_THRESHOLD", 10),
+                    breaker_cooldown_s=_env_float("WEATHERAPI_BREAKER_COOLDOWN_S", 60.0),
+                )
+    return _limiter
+
+
+def share_rate_limiter(shares: int) -> RateLimiter:
+    """
+    Limit this process to 1/shares of the configured rate and daily quota: the
+    limiter is per process, and the location shards of a dt (see
+    src/common/sharding.py) and the backfill workers run as parallel processes.
+    """
+    if shares < 1:
+        raise ValueError(f"shares must be >= 1, got {shares}")
+    limiter = get_rate_limiter()
+    with limiter._lock:
+        limiter.max_rps = _env_float("WEATHERAPI_MAX_RPS", 5.0) / shares
+        limiter.max_requests_per_day = -(-_env_int("WEATHERAPI_MAX_REQUESTS_PER_DAY", 0) // shares)
+        limiter._tokens = min(limiter._tokens, max(1.0, limiter.max_rps))
+    return limiter
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any
+
+DEFAULT_IMMUTABLE_AFTER_DAYS = 2
+DEFAULT_RECENT_TTL_S = 3600
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+# puts between size checks: the total may overshoot max_bytes by about this many payloads
+DEFAULT_EVICT_EVERY = 256
+
+
+def cache_key(lat: float, lon: float, dt: str) -> str:
+    # 4 decimals (~11 m) matches how locations.yml pins coordinates
+    raw = f"history|{float(lat):.4f}|{float(lon):.4f}|{dt}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    SQLite-backed cache for WeatherAPI history payloads, keyed by (lat, lon, dt).
+
+    TTL rules:
+    - dt older than `immutable_after_days` (UTC): history is final -> never expires
+    - today / recent days: provider may still revise -> expires after `recent_ttl_s`
+
+    Payloads are stored zlib-compressed. Every `evict_every` puts, expired
+    entries are dropped and, when the total stored size exceeds `max_bytes`,
+    least recently used entries are evicted. The file may be shared by several
+    processes (backfill workers), so the total is read from the table rather
+    than tracked per process.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        immutable_after_days: int = DEFAULT_IMMUTABLE_AFTER_DAYS,
+        recent_ttl_s: int = DEFAULT_RECENT_TTL_S,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        evict_every: int = DEFAULT_EVICT_EVERY,
+    ) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.immutable_after_days = immutable_after_days
+        self.recent_ttl_s = recent_ttl_s
+        self.max_bytes = max_bytes
+        self.evict_every = max(1, evict_every)
+
+        self.hits = 0
+        self.misses = 0
+        self._puts_since_evict = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                dt TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                expires_at REAL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses (last_access)")
+
+    def _expires_at(self, dt: str, now: float) -> float | None:
+        age_days = (datetime.now(timezone.utc).date() - date.fromisoformat(dt)).days
+        if age_days >= self.immutable_after_days:
+            return None
+        return now + self.recent_ttl_s
+
+    def get(self, lat: float, lon: float, dt: str) -> dict[str, Any] | None:
+        key = cache_key(lat, lon, dt)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or (row[1] is not None and row[1] <= now):
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return json.loads(zlib.decompress(row[0]))
+
+    def put(self, lat: float, lon: float, dt: str, payload: dict[str, Any]) -> None:
+        key = cache_key(lat, lon, dt)
+        body = zlib.compress(json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO responses (key, dt, body, size, fetched_at, expires_at, last_access)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (key, dt, body, len(body), now, self._expires_at(dt, now), now),
+            )
+            self._puts_since_evict += 1
+            if self._puts_since_evict >= self.evict_every:
+                self._evict()
+                self._puts_since_evict = 0
+
+    def _evict(self) -> None:
+        # caller holds the lock
+        self._conn.execute("DELETE FROM responses WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),))
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        to_free = total - self.max_bytes
+        freed = 0
+        victims: list[str] = []
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY last_access"):
+            victims.append(key)
+            freed += size
+            if freed >= to_free:
+                break
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", [(k,) for k in victims])
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_cache: ResponseCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache | None:
+    """Process-wide cache configured by WEATHERAPI_CACHE_PATH; None when caching is disabled."""
+    global _cache
+    path = os.getenv("WEATHERAPI_CACHE_PATH")
+    if not path:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache(
+                    path,
+                    immutable_after_days=int(
+                        os.getenv("WEATHERAPI_CACHE_IMMUTABLE_AFTER_DAYS", DEFAULT_IMMUTABLE_AFTER_DAYS)
+                    ),
+                    recent_ttl_s=int(os.getenv("WEATHERAPI_CACHE_RECENT_TTL_S", DEFAULT_RECENT_TTL_S)),
+                    max_bytes=int(os.getenv("WEATHERAPI_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)),
+                    evict_every=int(os.getenv("WEATHERAPI_CACHE_EVICT_EVERY", DEFAULT_EVICT_EVERY)),
+                )
+    return _cache
@@ -1,50 +1,174 @@
 import os
+import sqlite3
+import threading
 import time
 import requests
+from requests.adapters import HTTPAdapter
 from typing import Any
 
+from src.common.instrumentation import incr, span
+from src.ingestion.rate_limiter import RateLimiter, backoff_delay, get_rate_limiter, parse_retry_after
+from src.ingestion.response_cache import ResponseCache, get_response_cache
+
 BASE_URL = os.getenv("WEATHERAPI_BASE_URL")
 API_KEY = os.getenv("WEATHERAPI_KEY")
 
+# retry: 429/5xx and transport errors
+MAX_ATTEMPTS = int(os.getenv("WEATHERAPI_MAX_ATTEMPTS", "5"))
+BACKOFF_BASE_S = float(os.getenv("WEATHERAPI_BACKOFF_BASE_S", "1"))
+BACKOFF_CAP_S = float(os.getenv("WEATHERAPI_BACKOFF_CAP_S", "30"))
+
+# keep-alive pool size per host; should be >= ingestion concurrency
+DEFAULT_POOL_SIZE = int(os.getenv("WEATHERAPI_POOL_SIZE", "16"))
+
+
 class WeatherApiError(RuntimeError):
     pass
 
-def fetch_history(lat: float, lon: float, dt: str, timeout_s: int = 30) -> dict[str, Any]:
-    if not API_KEY:
-        raise ValueError("WEATHERAPI_KEY is not set in .env")
-
-    url = f"{BASE_URL}/history.json"
-    params = {
-        "key": API_KEY,
-        "q": f"{lat},{lon}",
-        "dt": dt,          # YYYY-MM-DD
-        "aqi": "no",
-        "alerts": "no",
-    }
-
-    # retry: 429/5xx
-    max_attempts = 5
-    base_sleep = 2
-
-    last_err: Exception | None = None
-    for attempt in range(1, max_attempts + 1):
-        try:
-            r = requests.get(url, params=params, timeout=timeout_s)
-
-            if r.status_code == 200:
-                return r.json()
-
-            if r.status_code == 429 or 500 <= r.status_code < 600:
-                sleep_s = base_sleep * (2 ** (attempt - 1))
-                time.sleep(sleep_s)
-                continue
-
-            # other 4xx — fail
-            raise WeatherApiError(f"WeatherAPI error {r.status_code}: {r.text[:200]}")
-
-        except Exception as e:
-            last_err = e
-            sleep_s = base_sleep * (2 ** (attempt - 1))
+
+class WeatherApiClient:
+    """
+    Reusable client for the WeatherAPI history endpoint.
+
+    Holds one pooled requests.Session (keep-alive, gzip) so that every call made
+    through the same client reuses TCP/TLS connections. The session is shared by
+    the ingestion worker threads; urllib3's pool is thread-safe.
+
+    When a ResponseCache is configured, cached payloads are served without any
+    network call (and without consuming rate-limiter quota).
+    """
+
+    def __init__(
+        self,
+        base_url: str | None = None,
+        api_key: str | None = None,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        timeout_s: int = 30,
+        rate_limiter: RateLimiter | None = None,
+        cache: ResponseCache | None = None,
+    ) -> None:
+        self.base_url = base_url or BASE_URL
+        self.api_key = api_key or API_KEY
+        self.timeout_s = timeout_s
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.cache = cache if cache is not None else get_response_cache()
+
+        self.session = requests.Session()
+        # retries are handled in fetch_history (rate limiter aware), not by urllib3
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update(
+            {
+                "Accept": "application/json",
+                "Accept-Encoding": "gzip, deflate",
+                "Connection": "keep-alive",
+            }
+        )
+
+    def close(self) -> None:
+        self.session.close()
+
+    def __enter__(self) -> "WeatherApiClient":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    @span("api.fetch")
+    def fetch_history(
+        self, lat: float, lon: float, dt: str, timeout_s: int | None = None
+    ) -> dict[str, Any]:
+        if self.cache is not None:
+            # the cache is an optimisation: on errors (e.g. "database is locked" between
+            # backfill workers) fall through to the network
+            try:
+                cached = self.cache.get(lat, lon, dt)
+            except sqlite3.Error as e:
+                print(f"[WEATHERAPI] WARN response cache get failed dt={dt}: {type(e).__name__}: {e}")
+                cached = None
+            if cached is not None:
+                incr("api.cache_hits")
+                return cached
+
+        if not self.api_key:
+            raise ValueError("WEATHERAPI_KEY is not set in .env")
+
+        url = f"{self.base_url}/history.json"
+        params = {
+            "key": self.api_key,
+            "q": f"{lat},{lon}",
+            "dt": dt,          # YYYY-MM-DD
+            "aqi": "no",
+            "alerts": "no",
+        }
+
+        limiter = self.rate_limiter
+
+        last_err: str | None = None
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            # shared rps/day quota + circuit breaker (raises, never retried here)
+            with span("api.rate_limit_wait"):
+                limiter.acquire()
+
+            retry_after: float | None = None
+            try:
+                with span("api.request"):
+                    r = self.session.get(url, params=params, timeout=timeout_s or self.timeout_s)
+            except requests.RequestException as e:
+                last_err = f"{type(e).__name__}: {e}"
+                limiter.record_failure()
+            else:
+                incr(f"api.http_{r.status_code}")
+                if r.status_code == 200:
+                    limiter.record_success()
+                    incr("api.payload_bytes", len(r.content))
+                    with span("api.parse"):
+                        payload = r.json()
+                    if self.cache is not None:
+                        try:
+                            self.cache.put(lat, lon, dt, payload)
+                        except sqlite3.Error as e:
+                            print(f"[WEATHERAPI] WARN response cache put failed dt={dt}: {type(e).__name__}: {e}")
+                    return payload
+
+                if r.status_code == 429 or 500 <= r.status_code < 600:
+                    last_err = f"HTTP {r.status_code}: {r.text[:200]}"
+                    if r.status_code == 429:
+                        limiter.record_throttled_response()
+                    limiter.record_failure()
+                    retry_after = parse_retry_after(r.headers.get("Retry-After"))
+                else:
+                    # other 4xx — fail, not retryable
+                    raise WeatherApiError(f"WeatherAPI error {r.status_code}: {r.text[:200]}")
+
+            if attempt == MAX_ATTEMPTS:
+                break
+
+            limiter.record_retry()
+            if retry_after is not None:
+                sleep_s = min(retry_after, BACKOFF_CAP_S * 4)
+            else:
+                sleep_s = backoff_delay(attempt, BACKOFF_BASE_S, BACKOFF_CAP_S)
             time.sleep(sleep_s)
 
-    raise WeatherApiError(f"Failed after retries. Last error: {last_err}")
\ No newline at end of file
+        limiter.record_gave_up()
+        raise WeatherApiError(f"Failed after {MAX_ATTEMPTS} attempts. Last error: {last_err}")
+
+
+_default_client: WeatherApiClient | None = None
+_default_client_lock = threading.Lock()
+
+
+def get_weatherapi_client() -> WeatherApiClient:
+    """Process-wide client, so ad-hoc callers (backfills, notebooks) share connections too."""
+    global _default_client
+    if _default_client is None:
+        with _default_client_lock:
+            if _default_client is None:
+                _default_client = WeatherApiClient()
+    return _default_client
+
+
+def fetch_history(lat: float, lon: float, dt: str, timeout_s: int = 30) -> dict[str, Any]:
+    return get_weatherapi_client().fetch_history(lat=lat, lon=lon, dt=dt, timeout_s=timeout_s)
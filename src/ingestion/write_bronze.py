@@ -1,11 +1,41 @@
 import os
 import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from datetime import datetime, timezone
+from typing import Any
 import yaml
 
+from src.common.bronze_format import (
+    BUNDLE_FORMAT_VERSION,
+    DEFAULT_ENCODING,
+    DEFAULT_LAYOUT,
+    LAYOUTS,
+    bronze_dt_prefix,
+    bronze_filename,
+    bundle_manifest_key,
+    bundle_part_filename,
+    encode_bronze,
+    encode_bundle_block,
+    is_bronze_key,
+)
+from src.common.instrumentation import incr, span, stage
 from src.common.s3_client import get_s3_client, get_bucket_name
-from src.ingestion.weatherapi_client import fetch_history
+from src.common.sharding import check_shard, shard_filter
+from src.ingestion.rate_limiter import get_rate_limiter, share_rate_limiter
+from src.ingestion.weatherapi_client import WeatherApiClient
+
+# Max number of locations fetched/written in parallel (bounded thread pool)
+DEFAULT_MAX_CONCURRENCY = int(os.getenv("WEATHERAPI_MAX_CONCURRENCY", "8"))
+
+# Bundle layout: records per compressed block, and target (stored) bytes per part object
+BUNDLE_BLOCK_RECORDS = int(os.getenv("BRONZE_BUNDLE_BLOCK_RECORDS", "256"))
+BUNDLE_PART_TARGET_BYTES = int(os.getenv("BRONZE_BUNDLE_PART_TARGET_BYTES", str(64 * 1024 * 1024)))
+
+# Skip locations whose bronze object for dt already exists (reruns / retries)
+DEFAULT_SKIP_EXISTING = os.getenv("WEATHER_BRONZE_SKIP_EXISTING", "").lower() in ("1", "true", "yes")
+# share of the configured locations (of the shard) allowed to fail before the run fails
+MAX_FAILED_RATIO = float(os.getenv("BRONZE_MAX_FAILED_RATIO", "0.05"))
 
 
 def load_locations(path: str = "docs/locations.yml") -> list[dict]:
@@ -20,66 +50,344 @@ def load_locations(path: str = "docs/locations.yml") -> list[dict]:
     return locations
 
 
-def run(dt: str, locations_path: str = "docs/locations.yml") -> None:
+def bronze_key(dt: str, location_id: str, encoding: str = DEFAULT_ENCODING) -> str:
+    return (
+        f"{bronze_dt_prefix(dt)}"
+        f"location_id={location_id}/"
+        f"{bronze_filename(encoding)}"
+    )
+
+
+def _read_bundle_manifest(s3, bucket: str, dt: str) -> dict | None:
+    try:
+        obj = s3.get_object(Bucket=bucket, Key=bundle_manifest_key(dt))
+    except s3.exceptions.NoSuchKey:
+        return None
+    return json.loads(obj["Body"].read())
+
+
+def _existing_bronze_location_ids(s3, bucket: str, dt: str) -> set[str]:
+    # One paginated LIST per dt instead of a HEAD per location
+    prefix = bronze_dt_prefix(dt)
+    found: set[str] = set()
+    paginator = s3.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+        for item in page.get("Contents", []) or []:
+            key = item["Key"]
+            if not is_bronze_key(key):
+                continue
+            part = key[len(prefix):].split("/", 1)[0]
+            if part.startswith("location_id="):
+                found.add(part[len("location_id="):])
+    return found
+
+
+def _fetch_record(client: WeatherApiClient, dt: str, loc: dict, ingested_at: str) -> dict:
+    location_id = loc["location_id"]
+    location_name = loc.get("name", location_id)
+    lat = loc["lat"]
+    lon = loc["lon"]
+
+    # Fetch REAL raw JSON payload from WeatherAPI (History endpoint)
+    api_payload = client.fetch_history(lat=float(lat), lon=float(lon), dt=dt)
+
+    # Bronze record structure: metadata + raw payload
+    data = {
+        "metadata": {
+            "dt": dt,
+            "location_id": location_id,
+            "location_name": location_name,
+            "ingested_at": ingested_at,
+            "source": "weatherapi",
+            "api_version": "v1",
+            "request": {
+                "q": f"{lat},{lon}",
+                "endpoint": "history.json",
+            },
+        },
+        "payload": api_payload,
+    }
+    return data
+
+
+def _ingest_location(
+    client: WeatherApiClient,
+    s3,
+    bucket: str,
+    dt: str,
+    loc: dict,
+    ingested_at: str,
+    encoding: str,
+) -> str:
+    data = _fetch_record(client, dt, loc, ingested_at)
+    key = bronze_key(dt, loc["location_id"], encoding)
+    with span("bronze.encode"):
+        body, put_kwargs = encode_bronze(data, encoding)
+    incr("bronze.bytes_written", len(body))
+
+    s3.put_object(
+        Bucket=bucket,
+        Key=key,
+        Body=body,
+        **put_kwargs,
+    )
+
+    return key
+
+
+class _BundleWriter:
+    """
+    Accumulates bronze records for one dt into size-sharded NDJSON part objects.
+
+    Records are grouped into independently compressed blocks; a part is uploaded
+    once its stored size reaches `part_target_bytes`. Only the calling
+    (main) thread touches the writer.
+    """
+
+    def __init__(
+        self,
+        s3,
+        bucket: str,
+        dt: str,
+        encoding: str,
+        run_id: str,
+        block_records: int = BUNDLE_BLOCK_RECORDS,
+        part_target_bytes: int = BUNDLE_PART_TARGET_BYTES,
+    ) -> None:
+        self.s3 = s3
+        self.bucket = bucket
+        self.dt = dt
+        self.encoding = encoding
+        self.prefix = f"{bronze_dt_prefix(dt)}_bundles/run_id={run_id}/"
+        self.block_records = block_records
+        self.part_target_bytes = part_target_bytes
+
+        self.parts: list[dict] = []
+        self.location_ids: list[str] = []
+        self._block: list[dict] = []
+        self._part_blocks: list[bytes] = []
+        self._part_index: list[list[int]] = []
+        self._part_bytes = 0
+        self._part_records = 0
+
+    def add(self, record: dict) -> None:
+        self._block.append(record)
+        self.location_ids.append(str(record["metadata"]["location_id"]))
+        if len(self._block) >= self.block_records:
+            self._flush_block()
+
+    def _flush_block(self) -> None:
+        if not self._block:
+            return
+        with span("bronze.encode"):
+            body = encode_bundle_block(self._block, self.encoding)
+        incr("bronze.bytes_written", len(body))
+        self._part_blocks.append(body)
+        self._part_index.append([self._part_bytes, len(body), len(self._block)])
+        self._part_bytes += len(body)
+        self._part_records += len(self._block)
+        self._block = []
+        if self._part_bytes >= self.part_target_bytes:
+            self._flush_part()
+
+    def _flush_part(self) -> None:
+        if not self._part_blocks:
+            return
+        key = f"{self.prefix}{bundle_part_filename(len(self.parts), self.encoding)}"
+        body = b"".join(self._part_blocks)
+        put_kwargs = {"ContentType": "application/x-ndjson"}
+        if self.encoding != "json":
+            put_kwargs["ContentEncoding"] = self.encoding
+        self.s3.put_object(Bucket=self.bucket, Key=key, Body=body, **put_kwargs)
+        self.parts.append(
+            {"key": key, "bytes": len(body), "records": self._part_records, "blocks": self._part_index}
+        )
+        print(f"Written to s3://{self.bucket}/{key} (records={self._part_records}, bytes={len(body)})")
+        self._part_blocks, self._part_index = [], []
+        self._part_bytes = self._part_records = 0
+
+    def publish(self, previous: dict | None = None) -> str:
+        """Upload remaining data, then the manifest (the manifest PUT makes the run visible)."""
+        self._flush_block()
+        self._flush_part()
+
+        parts = list(self.parts)
+        location_ids = list(self.location_ids)
+        if previous is not None:
+            # skip_existing run: earlier parts still hold the locations not re-fetched
+            parts = previous["parts"] + parts
+            location_ids = previous["location_ids"] + location_ids
+
+        manifest = {
+            "format_version": BUNDLE_FORMAT_VERSION,
+            "layout": "bundle",
+            "dt": self.dt,
+            "encoding": self.encoding,
+            "written_at": datetime.now(timezone.utc).isoformat(),
+            "record_count": sum(p["records"] for p in parts),
+            "location_ids": location_ids,
+            "parts": parts,
+        }
+        key = bundle_manifest_key(self.dt)
+        self.s3.put_object(
+            Bucket=self.bucket,
+            Key=key,
+            Body=json.dumps(manifest, separators=(",", ":")).encode("utf-8"),
+            ContentType="application/json",
+        )
+        return key
+
+
+@stage("write_bronze", labels=("dt", "shard"))
+def run(
+    dt: str,
+    locations_path: str = "docs/locations.yml",
+    max_concurrency: int | None = None,
+    client: WeatherApiClient | None = None,
+    skip_existing: bool | None = None,
+    encoding: str | None = None,
+    layout: str | None = None,
+    shard: int = 0,
+    shards: int = 1,
+) -> None:
     locations = load_locations(locations_path)
     s3 = get_s3_client()
     bucket = get_bucket_name()
+    max_concurrency = DEFAULT_MAX_CONCURRENCY if max_concurrency is None else max_concurrency
+    skip_existing = DEFAULT_SKIP_EXISTING if skip_existing is None else skip_existing
+    encoding = encoding or DEFAULT_ENCODING
+    bronze_filename(encoding)  # validate before any API call
+    layout = layout or DEFAULT_LAYOUT
+    if layout not in LAYOUTS:
+        raise ValueError(f"Unknown bronze layout '{layout}'. Allowed: {list(LAYOUTS)}")
+    if max_concurrency < 1:
+        raise ValueError(f"max_concurrency must be >= 1, got {max_concurrency}")
+    check_shard(shard, shards)
+    if shards > 1:
+        # one bundle manifest per dt: a shard cannot publish it alone
+        if layout == "bundle":
+            raise ValueError("Sharded bronze ingestion requires layout 'per_location'")
+        in_shard = shard_filter(locations, shard, shards)
+        locations = [loc for loc in locations if in_shard(loc["location_id"])]
+        # the shards of a dt run in parallel processes: split the API budget between them
+        share_rate_limiter(shards)
+        if not locations:
+            print(f"[WRITE_BRONZE] dt={dt} | shard={shard}/{shards} has no locations")
+            return
 
-    # Technical ingestion timestamp (UTC)
-    ingested_at = datetime.now(timezone.utc).isoformat()
-
+    # Prefer coordinates to avoid ambiguity: validate config before any API call
     for loc in locations:
-        location_id = loc["location_id"]
-        location_name = loc.get("name", location_id)
-
-        # Prefer coordinates to avoid ambiguity
-        lat = loc.get("lat")
-        lon = loc.get("lon")
-        if lat is None or lon is None:
+        if loc.get("lat") is None or loc.get("lon") is None:
             raise ValueError(
-                f"Location {location_id} is missing lat/lon in {locations_path}"
+                f"Location {loc['location_id']} is missing lat/lon in {locations_path}"
             )
 
-        # Fetch REAL raw JSON payload from WeatherAPI (History endpoint)
-        api_payload = fetch_history(lat=float(lat), lon=float(lon), dt=dt)
-
-        # Bronze record structure: metadata + raw payload
-        data = {
-            "metadata": {
-                "dt": dt,
-                "location_id": location_id,
-                "location_name": location_name,
-                "ingested_at": ingested_at,
-                "source": "weatherapi",
-                "api_version": "v1",
-                "request": {
-                    "q": f"{lat},{lon}",
-                    "endpoint": "history.json",
-                },
-            },
-            "payload": api_payload,
-        }
+    # Readers treat a dt's bundle manifest as authoritative, so layouts are not mixed
+    # within a dt: a per-location write retires the bundle, a full bundle write replaces it.
+    manifest = _read_bundle_manifest(s3, bucket, dt)
+    if layout == "per_location" and manifest is not None:
+        print(f"[WRITE_BRONZE] dt={dt} | retiring bundle manifest s3://{bucket}/{bundle_manifest_key(dt)}")
+        s3.delete_object(Bucket=bucket, Key=bundle_manifest_key(dt))
+        manifest = None
 
-        key = (
-            "bronze/weather_history/"
-            f"dt={dt}/"
-            f"location_id={location_id}/"
-            "raw.json"
+    locations_to_fetch = locations
+    if skip_existing:
+        existing = (
+            set(manifest["location_ids"]) if manifest is not None
+            else _existing_bronze_location_ids(s3, bucket, dt)
         )
+        locations_to_fetch = [loc for loc in locations if str(loc["location_id"]) not in existing]
+        if not locations_to_fetch:
+            print(f"[WRITE_BRONZE] dt={dt} | all {len(locations)} locations already in bronze, nothing to fetch")
+            return
+    skipped = len(locations) - len(locations_to_fetch)
 
-        s3.put_object(
-            Bucket=bucket,
-            Key=key,
-            Body=json.dumps(data, ensure_ascii=False, indent=2),
-            ContentType="application/json",
+    # Technical ingestion timestamp (UTC)
+    ingested_at = datetime.now(timezone.utc).isoformat()
+
+    # Each location is independent: a failure is recorded and the rest of the day
+    # continues. The run fails at the end when more than MAX_FAILED_RATIO of the
+    # configured locations failed; what was written stays, so a retry with
+    # skip_existing only refetches the missing ones. The quality gate cannot catch
+    # this: silver locations are derived from the same (partial) bronze.
+    failures: dict[str, str] = {}
+    written = 0
+
+    # One pooled keep-alive session shared by all worker threads.
+    # Callers running many dates (backfills) may pass their own client to reuse it.
+    owns_client = client is None
+    if client is None:
+        client = WeatherApiClient(pool_size=max_concurrency)
+    try:
+        if not client.api_key:
+            raise ValueError("WEATHERAPI_KEY is not set in .env")
+
+        bundle: _BundleWriter | None = None
+        if layout == "bundle":
+            run_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+            bundle = _BundleWriter(s3, bucket, dt, encoding, run_id)
+
+        with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+            if bundle is None:
+                futures: dict[Any, str] = {
+                    pool.submit(
+                        _ingest_location, client, s3, bucket, dt, loc, ingested_at, encoding
+                    ): loc["location_id"]
+                    for loc in locations_to_fetch
+                }
+            else:
+                futures = {
+                    pool.submit(_fetch_record, client, dt, loc, ingested_at): loc["location_id"]
+                    for loc in locations_to_fetch
+                }
+            for fut in as_completed(futures):
+                location_id = futures[fut]
+                try:
+                    result = fut.result()
+                except Exception as e:
+                    failures[location_id] = f"{type(e).__name__}: {e}"
+                    incr("bronze.failed")
+                    print(f"[WRITE_BRONZE] FAILED location_id={location_id}: {failures[location_id]}")
+                    continue
+                written += 1
+                incr("bronze.records")
+                if bundle is None:
+                    print(f"Written to s3://{bucket}/{result}")
+                else:
+                    bundle.add(result)
+
+        if bundle is not None and written:
+            manifest_key = bundle.publish(previous=manifest if skip_existing else None)
+            print(f"Written bundle manifest s3://{bucket}/{manifest_key} (parts={len(bundle.parts)})")
+
+        print(
+            f"[WRITE_BRONZE] dt={dt} | written={written} | skipped={skipped} | failed={len(failures)} "
+            f"| locations={len(locations)} | layout={layout} | max_concurrency={max_concurrency}"
+            + (f" | shard={shard}/{shards}" if shards > 1 else "")
         )
+        print(f"[WRITE_BRONZE] api_stats={get_rate_limiter().snapshot()}")
+        if client.cache is not None:
+            print(f"[WRITE_BRONZE] cache hits={client.cache.hits} misses={client.cache.misses}")
+    finally:
+        if owns_client:
+            client.close()
 
-        print(f"Written to s3://{bucket}/{key}")
+    if not written:
+        raise RuntimeError(
+            f"Bronze ingestion failed for all {len(locations_to_fetch)} locations (dt={dt}). "
+            f"Sample errors: {dict(list(failures.items())[:5])}"
+        )
+    if len(failures) > MAX_FAILED_RATIO * len(locations):
+        raise RuntimeError(
+            f"Bronze ingestion failed for {len(failures)} of {len(locations)} configured locations "
+            f"(dt={dt}, allowed {MAX_FAILED_RATIO:.0%}). Sample errors: {dict(list(failures.items())[:5])}"
+        )
 
 
 if __name__ == "__main__":
     import argparse
     from datetime import date
+    from src.common.profiling import add_profile_argument, configure_profiling
 
     parser = argparse.ArgumentParser(description="Bronze weather ingestion")
     parser.add_argument(
@@ -94,6 +402,43 @@ if __name__ == "__main__":
         default="docs/locations.yml",
         help="Path to locations.yml",
     )
+    parser.add_argument(
+        "--max_concurrency",
+        type=int,
+        default=DEFAULT_MAX_CONCURRENCY,
+        help="Max locations fetched in parallel",
+    )
+    parser.add_argument(
+        "--skip_existing",
+        action="store_true",
+        default=DEFAULT_SKIP_EXISTING,
+        help="Do not re-fetch locations that already have a bronze object for dt",
+    )
+    parser.add_argument(
+        "--encoding",
+        type=str,
+        default=DEFAULT_ENCODING,
+        help="Bronze object encoding: json | gzip | zstd",
+    )
+    parser.add_argument(
+        "--layout",
+        type=str,
+        default=DEFAULT_LAYOUT,
+        help="Bronze layout: per_location | bundle",
+    )
+    parser.add_argument("--shard", type=int, default=0, help="Location shard to ingest (0-based)")
+    parser.add_argument("--shards", type=int, default=1, help="Number of location shards")
+    add_profile_argument(parser)
     args = parser.parse_args()
+    configure_profiling(args.profile)
 
-    run(args.dt, args.locations_path)
\ No newline at end of file
+    run(
+        args.dt,
+        args.locations_path,
+        max_concurrency=args.max_concurrency,
+        skip_existing=args.skip_existing,
+        encoding=args.encoding,
+        layout=args.layout,
+        shard=args.shard,
+        shards=args.shards,
+    )
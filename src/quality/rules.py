@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from src.transforms.silver_normalize import to_arrow
+
+SAMPLE_SIZE = 5
+
+# Supported rule kinds (see evaluate_rules for semantics)
+RULE_KINDS = ("non_empty", "required_columns", "not_null", "range", "unique", "freshness", "completeness")
+
+
+@dataclass(frozen=True)
+class Rule:
+    """
+    One declarative check against a named table.
+
+    kind:
+      non_empty         table has at least one row
+      required_columns  all `columns` exist
+      not_null          no NULL/NaN in each of `columns`
+      range             non-null values of columns[0] within [min_value, max_value];
+                        fails if the column exists but is entirely NULL
+      unique            no duplicate combination of `columns`
+      freshness         columns[0] parsed as a date equals the run's dt
+      completeness      distinct columns[0] of `ref_table` present in this table >= min_ratio
+    """
+
+    kind: str
+    table: str
+    columns: tuple[str, ...] = ()
+    min_value: float | None = None
+    max_value: float | None = None
+    ref_table: str | None = None
+    min_ratio: float | None = None
+    sample_columns: tuple[str, ...] = ("location_id", "date")
+
+    def __post_init__(self) -> None:
+        if self.kind not in RULE_KINDS:
+            raise ValueError(f"Unknown rule kind '{self.kind}'. Allowed: {list(RULE_KINDS)}")
+
+    @property
+    def name(self) -> str:
+        cols = ",".join(self.columns)
+        return f"{self.table}.{self.kind}({cols})" if cols else f"{self.table}.{self.kind}"
+
+
+@dataclass
+class RuleResult:
+    rule: Rule
+    passed: bool
+    failed_rows: int = 0
+    message: str = ""
+    sample: list[dict[str, Any]] = field(default_factory=list)
+
+    def describe(self) -> str:
+        text = f"{self.rule.name}: {self.message}"
+        return f"{text}. Sample: {self.sample}" if self.sample else text
+
+
+class _Columns:
+    """Per-table column access with typed conversions done once, whatever the number of rules."""
+
+    def __init__(self, table: pa.Table) -> None:
+        self.table = table
+        self._cache: dict[tuple[str, str], pa.Array] = {}
+
+    def has(self, name: str) -> bool:
+        return name in self.table.column_names
+
+    def raw(self, name: str) -> pa.Array:
+        key = (name, "raw")
+        if key not in self._cache:
+            self._cache[key] = self.table.column(name).combine_chunks()
+        return self._cache[key]
+
+    def float64(self, name: str) -> pa.Array:
+        key = (name, "float64")
+        if key not in self._cache:
+            arr = self.raw(name)
+            if not pa.types.is_floating(arr.type):
+                try:
+                    arr = arr.cast(pa.float64())
+                except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+                    # same as pd.to_numeric(errors="coerce"): bad values become NULL
+                    arr = to_arrow(arr.to_pylist(), pa.float64())
+            self._cache[key] = arr
+        return self._cache[key]
+
+    def date32(self, name: str) -> pa.Array:
+        key = (name, "date32")
+        if key not in self._cache:
+            arr = self.raw(name)
+            if pa.types.is_string(arr.type) or pa.types.is_large_string(arr.type):
+                arr = pc.strptime(arr, format="%Y-%m-%d", unit="s", error_is_null=True)
+            if not pa.types.is_date32(arr.type):
+                arr = arr.cast(pa.date32())
+            self._cache[key] = arr
+        return self._cache[key]
+
+
+def _sample(cols: _Columns, mask: pa.Array, rule: Rule, extra: tuple[str, ...] = ()) -> list[dict[str, Any]]:
+    names = [c for c in dict.fromkeys(rule.sample_columns + extra) if cols.has(c)]
+    if not names:
+        return []
+    return cols.table.select(names).filter(mask).slice(0, SAMPLE_SIZE).to_pylist()
+
+
+def _count(mask: pa.Array) -> int:
+    return int(pc.sum(mask).as_py() or 0)
+
+
+def _check(rule: Rule, tables: dict[str, _Columns], dt: date) -> RuleResult:
+    cols = tables[rule.table]
+    n_rows = cols.table.num_rows
+
+    if rule.kind == "non_empty":
+        return RuleResult(rule, n_rows > 0, message="" if n_rows else "table is empty")
+
+    missing = [c for c in rule.columns if not cols.has(c)]
+    if rule.kind == "required_columns" or missing:
+        if missing:
+            return RuleResult(rule, False, message=f"missing required columns: {missing}")
+        return RuleResult(rule, True)
+
+    if rule.kind == "not_null":
+        nulls: dict[str, int] = {}
+        sample: list[dict[str, Any]] = []
+        for c in rule.columns:
+            mask = pc.is_null(cols.raw(c), nan_is_null=True)
+            n = _count(mask)
+            if n:
+                nulls[c] = n
+                sample = sample or _sample(cols, mask, rule)
+        if nulls:
+            return RuleResult(rule, False, sum(nulls.values()), f"NULL rows per column {nulls}", sample)
+        return RuleResult(rule, True)
+
+    if rule.kind == "range":
+        c = rule.columns[0]
+        values = cols.float64(c)
+        if values.null_count == len(values):
+            return RuleResult(rule, False, message=f"column '{c}' exists but all values are NULL")
+        low = pc.fill_null(pc.less(values, rule.min_value), False)
+        high = pc.fill_null(pc.greater(values, rule.max_value), False)
+        n_low, n_high = _count(low), _count(high)
+        if n_low or n_high:
+            mask = pc.or_(low, high)
+            return RuleResult(
+                rule,
+                False,
+                n_low + n_high,
+                f"{n_low} below {rule.min_value}, {n_high} above {rule.max_value}",
+                _sample(cols, mask, rule, (c,)),
+            )
+        return RuleResult(rule, True)
+
+    if rule.kind == "unique":
+        keys = list(rule.columns)
+        counts = cols.table.select(keys).group_by(keys, use_threads=False).aggregate([([], "count_all")])
+        dup = counts.filter(pc.greater(counts.column("count_all"), 1))
+        if dup.num_rows:
+            n_dup = int(pc.sum(dup.column("count_all")).as_py())
+            sample = dup.rename_columns(keys + ["count"]).slice(0, SAMPLE_SIZE).to_pylist()
+            return RuleResult(rule, False, n_dup, f"duplicated rows={n_dup}", sample)
+        return RuleResult(rule, True)
+
+    if rule.kind == "freshness":
+        c = rule.columns[0]
+        parsed = cols.date32(c)
+        unparseable = pc.and_(pc.is_null(parsed), pc.is_valid(cols.raw(c)))
+        mismatch = pc.fill_null(pc.not_equal(parsed, pa.scalar(dt, pa.date32())), False)
+        n_bad, n_mismatch = _count(unparseable), _count(mismatch)
+        if n_bad or n_mismatch:
+            return RuleResult(
+                rule,
+                False,
+                n_bad + n_mismatch,
+                f"'{c}' != dt for {n_mismatch} rows, unparseable for {n_bad} rows",
+                _sample(cols, pc.or_(unparseable, mismatch), rule),
+            )
+        return RuleResult(rule, True)
+
+    # completeness
+    c = rule.columns[0]
+    ref = tables[rule.ref_table]
+    if not ref.has(c):
+        return RuleResult(rule, False, message=f"{rule.ref_table} missing column '{c}'")
+    expected = pc.unique(ref.raw(c).cast(pa.string()).drop_null())
+    if len(expected) == 0:
+        return RuleResult(rule, False, message=f"{rule.ref_table} has no {c} values")
+    found = pc.is_in(expected, value_set=pc.unique(cols.raw(c).cast(pa.string()).drop_null()))
+    present = _count(found)
+    ratio = present / len(expected)
+    if ratio < rule.min_ratio:
+        missing_ids = sorted(pc.filter(expected, pc.invert(found)).to_pylist())[:10]
+        return RuleResult(
+            rule,
+            False,
+            len(expected) - present,
+            f"present={present}, expected={len(expected)}, ratio={ratio:.3f} (min={rule.min_ratio})",
+            [{c: v} for v in missing_ids],
+        )
+    return RuleResult(rule, True, message=f"coverage={ratio:.3f}")
+
+
+def evaluate_rules(rules: list[Rule], tables: dict[str, pa.Table], dt: str | date) -> list[RuleResult]:
+    """
+    Evaluate every rule (no short-circuit) with Arrow compute kernels.
+
+    Each column is materialised and type-converted at most once per table and
+    shared by all rules that reference it.
+    """
+    dt_value = date.fromisoformat(dt) if isinstance(dt, str) else dt
+    cols = {name: _Columns(table) for name, table in tables.items()}
+    results: list[RuleResult] = []
+    for rule in rules:
+        if rule.table not in cols or (rule.ref_table and rule.ref_table not in cols):
+            raise ValueError(f"Rule {rule.name} references an unknown table")
+        if rule.kind != "non_empty" and cols[rule.table].table.num_rows == 0:
+            # an empty table is reported once by its non_empty rule
+            results.append(RuleResult(rule, True, message="skipped: table is empty"))
+            continue
+        results.append(_check(rule, cols, dt_value))
+    return results
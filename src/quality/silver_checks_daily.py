@@ -1,13 +1,18 @@
 
 from __future__ import annotations
 
-import io
 from dataclasses import dataclass
-from typing import Any, Iterable
+from datetime import date
+from typing import Any
 
-import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 
+from src.common.instrumentation import span, stage
 from src.common.s3_client import get_s3_client, get_bucket_name
+from src.common.silver_format import legacy_silver_key, silver_dt_prefix
+from src.quality.rules import Rule, RuleResult, evaluate_rules
+from src.transforms.silver_store import read_silver_manifest, read_silver_table
 
 
 @dataclass
@@ -19,13 +24,6 @@ class QualityConfig:
     humidity_max: float = 100.0
 
 
-def _read_parquet_from_s3(bucket: str, key: str) -> pd.DataFrame:
-    s3 = get_s3_client()
-    obj = s3.get_object(Bucket=bucket, Key=key)
-    body: bytes = obj["Body"].read()
-    return pd.read_parquet(io.BytesIO(body))
-
-
 def _exists_s3_key(bucket: str, key: str) -> bool:
     s3 = get_s3_client()
     try:
@@ -63,160 +61,99 @@ def _fail(msg: str) -> None:
     raise ValueError(f"[QUALITY_GATE] {msg}")
 
 
-def _require_columns(df: pd.DataFrame, cols: Iterable[str], df_name: str) -> None:
-    missing = [c for c in cols if c not in df.columns]
-    if missing:
-        _fail(f"{df_name} missing required columns: {missing}")
-
-
-def _not_null(df: pd.DataFrame, col: str, df_name: str) -> None:
-    n = int(df[col].isna().sum())
-    if n:
-        _fail(f"{df_name} has NULL {col}: {n} rows")
-
-
-def _parse_dt(dt: str) -> pd.Timestamp:
+def _parse_dt(dt: str) -> date:
     try:
-        return pd.to_datetime(dt, format="%Y-%m-%d", errors="raise")
-    except Exception as e:
+        return date.fromisoformat(dt)
+    except ValueError as e:
         _fail(f"Invalid dt '{dt}'. Expected YYYY-MM-DD. Error: {e}")
-        raise  
-
-
-def _check_range_numeric(
-    df: pd.DataFrame,
-    col: str,
-    min_v: float,
-    max_v: float,
-    df_name: str,
-) -> None:
-    if col not in df.columns:
-        return
-
-    s = pd.to_numeric(df[col], errors="coerce")
-    mask = s.notna()
-    if not mask.any():
-        _fail(f"{df_name} range check: column '{col}' exists but all values are NULL")
-
-    low = int((s[mask] < min_v).sum())
-    high = int((s[mask] > max_v).sum())
-    if low or high:
-        sample = (
-            df.loc[mask & ((s < min_v) | (s > max_v)), ["location_id", "date", col]]
-            .head(5)
-            .to_dict("records")
-        )
-        _fail(
-            f"{df_name} range check failed for '{col}': "
-            f"{low} below {min_v}, {high} above {max_v}. Sample: {sample}"
-        )
-
-
+        raise
+
+
+def default_rules(cfg: QualityConfig) -> list[Rule]:
+    """The silver daily contract (config/data_contract.md) as data."""
+    daily_required = ("location_id", "date", "ingested_at")
+    loc_required = ("location_id", "name", "country", "lat", "lon", "tz_id", "ingested_at")
+    rules = [
+        Rule("non_empty", "daily"),
+        Rule("non_empty", "locations"),
+        Rule("required_columns", "daily", daily_required),
+        Rule("required_columns", "locations", loc_required),
+        Rule("not_null", "daily", daily_required),
+        Rule("not_null", "locations", loc_required, sample_columns=("location_id",)),
+        Rule("freshness", "daily", ("date",)),
+        Rule("unique", "daily", ("location_id", "date")),
+    ]
+    for c in ["temp_min_c", "temp_max_c", "temp_avg_c"]:
+        rules.append(Rule("range", "daily", (c,), min_value=cfg.temp_min_c, max_value=cfg.temp_max_c))
+    rules.append(Rule("range", "daily", ("humidity_avg",), min_value=cfg.humidity_min, max_value=cfg.humidity_max))
+    rules.append(
+        Rule("completeness", "daily", ("location_id",), ref_table="locations", min_ratio=cfg.min_completeness_ratio)
+    )
+    return rules
+
+
+def check_tables(
+    dt: str,
+    tbl_daily: pa.Table,
+    tbl_locations: pa.Table,
+    cfg: QualityConfig | None = None,
+    rules: list[Rule] | None = None,
+) -> list[RuleResult]:
+    """
+    Evaluate the gate on in-memory silver tables and raise one ValueError listing
+    every failed rule (with samples). Returns all results when the gate passes.
+    """
+    cfg = cfg or QualityConfig()
+    _parse_dt(dt)
+    # optional columns (e.g. temp_*) are only range-checked when present, as before
+    rules = [
+        r
+        for r in (rules or default_rules(cfg))
+        if r.kind != "range" or r.columns[0] in (tbl_daily if r.table == "daily" else tbl_locations).column_names
+    ]
+    with span("quality.rules"):
+        results = evaluate_rules(rules, {"daily": tbl_daily, "locations": tbl_locations}, dt)
+
+    failed = [r for r in results if not r.passed]
+    if failed:
+        details = "\n".join(f"  - {r.describe()}" for r in failed)
+        _fail(f"{len(failed)}/{len(results)} rules failed for dt={dt}:\n{details}")
+    return results
+
+
+@stage("silver_checks_daily")
 def run(dt: str, cfg: QualityConfig | None = None) -> None:
     cfg = cfg or QualityConfig()
 
     bucket = get_bucket_name()
-    daily_key = f"silver/weather_daily/dt={dt}/weather_daily.parquet"
-    locations_key = f"silver/locations/dt={dt}/locations.parquet"
-
-    if not _exists_s3_key(bucket, daily_key):
-        prefix = f"silver/weather_daily/dt={dt}/"
-        found = [k for k in _list_keys(bucket, prefix) if k.endswith(".parquet")]
-        hint = f" Found parquet files under {prefix}: {found}" if found else ""
-        _fail(f"Missing daily parquet: s3://{bucket}/{daily_key}.{hint}")
-
-    if not _exists_s3_key(bucket, locations_key):
-        prefix = f"silver/locations/dt={dt}/"
-        found = [k for k in _list_keys(bucket, prefix) if k.endswith(".parquet")]
-        hint = f" Found parquet files under {prefix}: {found}" if found else ""
-        _fail(f"Missing locations parquet: s3://{bucket}/{locations_key}.{hint}")
-
-    df_daily = _read_parquet_from_s3(bucket, daily_key)
-    df_loc = _read_parquet_from_s3(bucket, locations_key)
-
-    if df_daily.empty:
-        _fail("Daily parquet is empty.")
-    if df_loc.empty:
-        _fail("Locations parquet is empty.")
-
-    # ---- Required columns ----
-    _require_columns(df_daily, ["location_id", "date", "ingested_at"], "Daily")
-    _require_columns(
-        df_loc,
-        ["location_id", "name", "country", "lat", "lon", "tz_id", "ingested_at"],
-        "Locations",
-    )
-
-    # ---- Not null checks ----
-    for c in ["location_id", "date", "ingested_at"]:
-        _not_null(df_daily, c, "Daily")
-
-    for c in ["location_id", "name", "country", "lat", "lon", "tz_id", "ingested_at"]:
-        _not_null(df_loc, c, "Locations")
-
-    # ---- Freshness: date == dt ----
-    dt_ts = _parse_dt(dt).date()
-
-    daily_date_series = pd.to_datetime(df_daily["date"], errors="coerce").dt.date
-    bad_parse = int(daily_date_series.isna().sum())
-    if bad_parse:
-        _fail(f"Daily has unparseable 'date' values: {bad_parse} rows")
-
-    mismatch = int((daily_date_series != dt_ts).sum())
-    if mismatch:
-        offenders = (
-            df_daily.loc[daily_date_series != dt_ts, ["location_id", "date"]]
-            .head(5)
-            .to_dict("records")
-        )
-        _fail(f"Freshness failed: 'date' != dt for {mismatch} rows. Sample: {offenders}")
-
-    # ---- Uniqueness: (location_id, date) ----
-    dup_mask = df_daily.duplicated(subset=["location_id", "date"], keep=False)
-    dup_count = int(dup_mask.sum())
-    if dup_count:
-        sample = (
-            df_daily.loc[dup_mask, ["location_id", "date"]]
-            .value_counts()
-            .head(5)
-            .reset_index()
-            .rename(columns={0: "count"})
-            .to_dict("records")
-        )
-        _fail(f"Uniqueness failed: duplicated (location_id, date) rows={dup_count}. Sample: {sample}")
-
-    # ---- Range checks (allow NULLs; validate only non-null values) ----
-    for c in ["temp_min_c", "temp_max_c", "temp_avg_c"]:
-        _check_range_numeric(df_daily, c, cfg.temp_min_c, cfg.temp_max_c, "Daily")
-
-    _check_range_numeric(df_daily, "humidity_avg", cfg.humidity_min, cfg.humidity_max, "Daily")
-
-    # ---- Completeness ----
-    daily_locations = set(df_daily["location_id"].astype(str).tolist())
-    loc_locations = set(df_loc["location_id"].astype(str).tolist())
+    manifest = read_silver_manifest(bucket, dt)
 
-    if not loc_locations:
-        _fail("Locations table has no location_id values.")
+    if manifest is None:
+        # legacy in-place layout: probe the objects to give a useful error
+        for dataset in ("weather_daily", "locations"):
+            key = legacy_silver_key(dataset, dt)
+            if not _exists_s3_key(bucket, key):
+                prefix = silver_dt_prefix(dataset, dt)
+                found = [k for k in _list_keys(bucket, prefix) if k.endswith(".parquet")]
+                hint = f" Found parquet files under {prefix}: {found}" if found else ""
+                _fail(f"Missing {dataset} parquet and no silver manifest: s3://{bucket}/{key}.{hint}")
 
-    present = len(daily_locations.intersection(loc_locations))
-    expected = len(loc_locations)
-    ratio = present / expected if expected else 0.0
+    tbl_daily = read_silver_table(bucket, dt, "weather_daily", manifest)
+    tbl_loc = read_silver_table(bucket, dt, "locations", manifest)
 
-    if ratio < cfg.min_completeness_ratio:
-        missing = sorted(list(loc_locations - daily_locations))[:10]
-        _fail(
-            f"Completeness failed: present={present}, expected={expected}, ratio={ratio:.3f} "
-            f"(min={cfg.min_completeness_ratio}). Missing sample: {missing}"
-        )
+    results = check_tables(dt, tbl_daily, tbl_loc, cfg)
+    coverage = next((r.message for r in results if r.rule.kind == "completeness"), "")
 
     print(
         "[QUALITY_GATE] PASSED "
-        f"dt={dt} | daily_rows={len(df_daily)} | locations={expected} | coverage={ratio:.3f}"
+        f"dt={dt} | daily_rows={tbl_daily.num_rows} | "
+        f"locations={pc.count_distinct(tbl_loc.column('location_id')).as_py()} | {coverage} | rules={len(results)}"
     )
 
 
 if __name__ == "__main__":
     import argparse
+    from src.common.profiling import add_profile_argument, configure_profiling
 
     parser = argparse.ArgumentParser(description="Silver quality gate (daily)")
     parser.add_argument("--dt", type=str, required=True, help="Business date YYYY-MM-DD")
@@ -225,7 +162,9 @@ if __name__ == "__main__":
     parser.add_argument("--temp_max_c", type=float, default=60.0)
     parser.add_argument("--humidity_min", type=float, default=0.0)
     parser.add_argument("--humidity_max", type=float, default=100.0)
+    add_profile_argument(parser)
     args = parser.parse_args()
+    configure_profiling(args.profile)
 
     config = QualityConfig(
         min_completeness_ratio=args.min_completeness_ratio,
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterator
+
+from src.common.bronze_format import (
+    bronze_dt_prefix,
+    bundle_manifest_key,
+    decode_bronze,
+    decode_bundle_block,
+    is_bronze_key,
+)
+from src.common.concurrency import iter_bounded
+from src.common.instrumentation import incr, span
+from src.common.s3_client import get_s3_client
+
+# Max bronze GETs in flight; memory held by the reader is bounded by ~2x this
+DEFAULT_READ_CONCURRENCY = int(os.getenv("BRONZE_READ_CONCURRENCY", "16"))
+
+
+def iter_bronze_keys(bucket: str, dt: str) -> Iterator[str]:
+    """
+    One bronze object per location for dt, following list pagination (>1000 keys).
+
+    A location written under different encodings over time (raw.json, raw.json.gz,
+    ...) has sibling keys; these list adjacently, and the most recently written wins.
+    """
+    s3 = get_s3_client()
+    paginator = s3.get_paginator("list_objects_v2")
+    current_dir: str | None = None
+    best: dict[str, Any] | None = None
+
+    for page in paginator.paginate(Bucket=bucket, Prefix=bronze_dt_prefix(dt)):
+        for item in page.get("Contents", []) or []:
+            key = item["Key"]
+            if not is_bronze_key(key):
+                continue
+            loc_dir = key.rsplit("/", 1)[0]
+            if loc_dir != current_dir:
+                if best is not None:
+                    yield best["Key"]
+                current_dir, best = loc_dir, item
+            elif item["LastModified"] >= best["LastModified"]:
+                best = item
+
+    if best is not None:
+        yield best["Key"]
+
+
+def bronze_key_location_id(dt: str, key: str) -> str | None:
+    part = key[len(bronze_dt_prefix(dt)) :].split("/", 1)[0]
+    return part[len("location_id=") :] if part.startswith("location_id=") else None
+
+
+def read_bronze_object(bucket: str, key: str) -> dict[str, Any]:
+    s3 = get_s3_client()
+    obj = s3.get_object(Bucket=bucket, Key=key)
+    with span("s3.read_body"):
+        body = obj["Body"].read()
+    incr("bronze.bytes_read", len(body))
+    with span("bronze.decode"):
+        return decode_bronze(body)
+
+
+def read_bundle_manifest(bucket: str, dt: str) -> dict[str, Any] | None:
+    s3 = get_s3_client()
+    try:
+        obj = s3.get_object(Bucket=bucket, Key=bundle_manifest_key(dt))
+    except s3.exceptions.NoSuchKey:
+        return None
+    return json.loads(obj["Body"].read())
+
+
+def read_bundle_block(bucket: str, key: str, offset: int, length: int) -> list[dict[str, Any]]:
+    s3 = get_s3_client()
+    obj = s3.get_object(Bucket=bucket, Key=key, Range=f"bytes={offset}-{offset + length - 1}")
+    with span("s3.read_body"):
+        body = obj["Body"].read()
+    incr("bronze.bytes_read", len(body))
+    with span("bronze.decode"):
+        return decode_bundle_block(body)
+
+
+def _bundle_blocks(manifest: dict[str, Any], location_filter: Callable[[str], bool] | None) -> Iterator[tuple]:
+    # (key, offset, length) of the blocks holding at least one wanted location;
+    # manifest["location_ids"] lists the records in part/block order
+    ids = manifest["location_ids"]
+    first = 0
+    for part in manifest["parts"]:
+        for offset, length, n in part["blocks"]:
+            if location_filter is None or any(location_filter(i) for i in ids[first : first + n]):
+                yield part["key"], offset, length
+            first += n
+
+
+def iter_bronze_records(
+    bucket: str,
+    dt: str,
+    max_concurrency: int | None = None,
+    location_filter: Callable[[str], bool] | None = None,
+) -> Iterator[dict[str, Any]]:
+    """
+    Stream parsed bronze records for dt, optionally only those whose location_id
+    passes location_filter (a location shard).
+
+    If the dt has a bundle manifest, its blocks are fetched with range GETs;
+    otherwise per-location objects are listed lazily. GETs run on a bounded thread
+    pool with at most 2 * max_concurrency objects/blocks in flight or buffered.
+    Records are yielded in completion order, not key order.
+    """
+    max_concurrency = max_concurrency or DEFAULT_READ_CONCURRENCY
+    if max_concurrency < 1:
+        raise ValueError(f"max_concurrency must be >= 1, got {max_concurrency}")
+
+    manifest = read_bundle_manifest(bucket, dt)
+
+    with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+        if manifest is not None:
+            calls = ((read_bundle_block, bucket, *block) for block in _bundle_blocks(manifest, location_filter))
+            for records in iter_bounded(pool, calls, 2 * max_concurrency):
+                if location_filter is None:
+                    yield from records
+                else:
+                    yield from (r for r in records if location_filter(str((r.get("metadata") or {}).get("location_id"))))
+        else:
+            keys = iter_bronze_keys(bucket, dt)
+            if location_filter is not None:
+                keys = (k for k in keys if location_filter(str(bronze_key_location_id(dt, k))))
+            calls = ((read_bronze_object, bucket, key) for key in keys)
+            yield from iter_bounded(pool, calls, 2 * max_concurrency)
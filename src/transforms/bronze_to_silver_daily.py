@@ -1,153 +1,131 @@
-import io
-import json
-from typing import Any
-
-import pandas as pd
-
-from src.common.s3_client import get_s3_client, get_bucket_name
-
-
-def _read_json_from_s3(bucket: str, key: str) -> dict[str, Any]:
-    s3 = get_s3_client()
-    obj = s3.get_object(Bucket=bucket, Key=key)
-    body = obj["Body"].read().decode("utf-8")
-    return json.loads(body)
-
-
-def run(dt: str) -> None:
-    bucket = get_bucket_name()
-    s3 = get_s3_client()
-
-    prefix = f"bronze/weather_history/dt={dt}/"
-    resp = s3.list_objects_v2(Bucket=bucket, Prefix=prefix)
-
-    contents = resp.get("Contents", [])
-    if not contents:
-        raise ValueError(f"No bronze objects found under s3://{bucket}/{prefix}")
-
-    daily_rows: list[dict[str, Any]] = []
-    location_rows: list[dict[str, Any]] = []
-
-    for item in contents:
-        key = item["Key"]
-        if not key.endswith("raw.json"):
-            continue
-
-        record = _read_json_from_s3(bucket, key)
-
-        metadata = record.get("metadata", {}) or {}
-        payload = record.get("payload", {}) or {}
-
-        location_id = metadata.get("location_id")
-        ingested_at = metadata.get("ingested_at")
-
-        # -------- locations (dimension-like) --------
-        loc = payload.get("location", {}) or {}
-        location_rows.append(
-            {
-                "dt": dt,  
-                "location_id": location_id,
-                "name": loc.get("name"),
-                "region": loc.get("region"),
-                "country": loc.get("country"),
-                "lat": loc.get("lat"),
-                "lon": loc.get("lon"),
-                "tz_id": loc.get("tz_id"),
-                "local_time": loc.get("local_time"),
-                "ingested_at": ingested_at,
-            }
-        )
-
-        # -------- weather_daily (fact-like) --------
-        forecastday = (payload.get("forecast", {}) or {}).get("forecastday", []) or []
-        if not forecastday:
-            continue
-
-        fd0 = forecastday[0] or {}
-        day = fd0.get("day", {}) or {}
-        cond = day.get("condition", {}) or {}
-
-        daily_rows.append(
-            {
-                "dt": dt,
-                "location_id": location_id,
-                "ingested_at": ingested_at,
-                "date": fd0.get("date"),
-                "temp_min_c": day.get("mintemp_c"),
-                "temp_max_c": day.get("maxtemp_c"),
-                "temp_avg_c": day.get("avgtemp_c"),
-                "precip_mm": day.get("totalprecip_mm"),
-                "snow_cm": day.get("totalsnow_cm"),
-                "humidity_avg": day.get("avghumidity"),
-                "wind_max_kph": day.get("maxwind_kph"),
-                "condition_code": cond.get("code"),
-                "condition_text": cond.get("text"),
-            }
-        )
-
-    df_daily = pd.DataFrame(daily_rows)
-    df_locations = pd.DataFrame(location_rows)
-
-    if df_daily.empty:
+from typing import Any, Callable, Iterable
+
+import pyarrow as pa
+
+from src.common.bronze_format import bronze_dt_prefix
+from src.common.instrumentation import incr, span, stage
+from src.common.s3_client import get_bucket_name
+from src.common.sharding import DEFAULT_SHARDS, shard_filter
+from src.common.silver_format import silver_manifest_key
+from src.ingestion.write_bronze import load_locations
+from src.transforms.bronze_reader import iter_bronze_records
+from src.transforms.silver_normalize import SilverColumnsBuilder
+from src.transforms.silver_store import publish_silver_partition, stage_silver_files, write_silver_partition
+
+
+def _read_bronze(
+    dt: str,
+    max_concurrency: int | None = None,
+    location_filter: Callable[[str], bool] | None = None,
+) -> SilverColumnsBuilder:
+    # Bronze records stream straight into typed columns (see silver_normalize)
+    builder = SilverColumnsBuilder(dt)
+    for record in iter_bronze_records(
+        get_bucket_name(), dt, max_concurrency=max_concurrency, location_filter=location_filter
+    ):
+        with span("silver.normalize"):
+            builder.add(record)
+    incr("silver.records", builder.n_records)
+    return builder
+
+
+def _tables(dt: str, builder: SilverColumnsBuilder) -> tuple[pa.Table, pa.Table]:
+    with span("silver.build_tables"):
+        tbl_daily = builder.daily_table()
+        tbl_locations = builder.locations_table()
+
+    if tbl_daily.num_rows == 0:
         raise ValueError(f"No daily rows produced for dt={dt}. Check bronze payload structure.")
-    if df_locations.empty:
+    if tbl_locations.num_rows == 0:
         raise ValueError(f"No location rows produced for dt={dt}. Check bronze payload structure.")
 
-   
-    df_daily["dt"] = pd.to_datetime(df_daily["dt"]).dt.date
-    df_daily["date"] = pd.to_datetime(df_daily["date"]).dt.date
-    df_daily["ingested_at"] = pd.to_datetime(df_daily["ingested_at"], errors="coerce", utc=True)
+    return tbl_daily, tbl_locations
 
-    for col in ["temp_min_c", "temp_max_c", "temp_avg_c", "precip_mm", "snow_cm", "wind_max_kph", "humidity_avg"]:
-        df_daily[col] = pd.to_numeric(df_daily[col], errors="coerce")
 
-    df_daily["condition_code"] = pd.to_numeric(df_daily["condition_code"], errors="coerce").astype("Int64")
+def build_tables(dt: str, max_concurrency: int | None = None) -> tuple[pa.Table, pa.Table]:
+    """Read bronze for dt and return the (daily, locations) silver tables in memory."""
+    builder = _read_bronze(dt, max_concurrency)
+    if not builder.n_records:
+        raise ValueError(f"No bronze objects found under s3://{get_bucket_name()}/{bronze_dt_prefix(dt)}")
+    return _tables(dt, builder)
 
-    df_locations["dt"] = pd.to_datetime(df_locations["dt"]).dt.date
-    df_locations["ingested_at"] = pd.to_datetime(df_locations["ingested_at"], errors="coerce", utc=True)
-    df_locations["lat"] = pd.to_numeric(df_locations["lat"], errors="coerce")
-    df_locations["lon"] = pd.to_numeric(df_locations["lon"], errors="coerce")
-    df_locations["local_time"] = pd.to_datetime(df_locations["local_time"], errors="coerce")
 
-    df_daily = df_daily.drop_duplicates(subset=["location_id", "date"], keep="last")
-    df_locations = df_locations.drop_duplicates(subset=["location_id"], keep="last")
-
-    # ---------- write parquet to S3/MinIO ----------
-    out_daily_key = f"silver/weather_daily/dt={dt}/weather_daily.parquet"
-    out_locations_key = f"silver/locations/dt={dt}/locations.parquet"
-
-    buf_daily = io.BytesIO()
-    df_daily.to_parquet(buf_daily, index=False)
-    buf_daily.seek(0)
-
-    s3.put_object(
-        Bucket=bucket,
-        Key=out_daily_key,
-        Body=buf_daily.getvalue(),
-        ContentType="application/octet-stream",
+def _report(bucket: str, dt: str, manifest: dict) -> None:
+    for dataset, entry in manifest["datasets"].items():
+        for f in entry["files"]:
+            print(f"Written silver {dataset} parquet: s3://{bucket}/{f['key']} (rows={f['rows']})")
+    print(
+        f"Published silver manifest: s3://{bucket}/{silver_manifest_key(dt)} "
+        f"(run_id={manifest['run_id']}, removed_objects={manifest['removed_objects']})"
     )
 
-    buf_loc = io.BytesIO()
-    df_locations.to_parquet(buf_loc, index=False)
-    buf_loc.seek(0)
 
-    s3.put_object(
-        Bucket=bucket,
-        Key=out_locations_key,
-        Body=buf_loc.getvalue(),
-        ContentType="application/octet-stream",
+def write_silver(dt: str, tbl_daily: pa.Table, tbl_locations: pa.Table) -> dict:
+    """Stage both datasets under a new run_id, then publish the dt manifest (see silver_store)."""
+    bucket = get_bucket_name()
+    manifest = write_silver_partition(bucket, dt, {"weather_daily": tbl_daily, "locations": tbl_locations})
+    _report(bucket, dt, manifest)
+    return manifest
+
+
+@stage("bronze_to_silver_daily")
+def run(dt: str, max_concurrency: int | None = None) -> None:
+    tbl_daily, tbl_locations = build_tables(dt, max_concurrency=max_concurrency)
+    write_silver(dt, tbl_daily, tbl_locations)
+
+
+@stage("bronze_to_silver_daily_shard", labels=("dt", "shard"))
+def run_shard(
+    dt: str,
+    shard: int,
+    shards: int | None = None,
+    max_concurrency: int | None = None,
+    locations_path: str = "docs/locations.yml",
+) -> dict[str, Any]:
+    """
+    Silver for one location shard of dt (see src/common/sharding.py), staged but
+    not published. Returns the staged dataset entries ({} for a shard without
+    bronze), which publish_shards commits together with the other shards'.
+    """
+    shards = shards or DEFAULT_SHARDS
+    in_shard = shard_filter(load_locations(locations_path), shard, shards)
+    builder = _read_bronze(dt, max_concurrency, in_shard)
+    if not builder.n_records:
+        print(f"[SILVER_SHARD] dt={dt} shard={shard}/{shards} has no bronze records")
+        return {}
+
+    tbl_daily, tbl_locations = _tables(dt, builder)
+    staged = stage_silver_files(
+        get_bucket_name(), dt, {"weather_daily": tbl_daily, "locations": tbl_locations}, shard=shard
     )
+    files = " ".join(f"{d}={e['files'][0]['key']}" for d, e in staged.items())
+    print(f"[SILVER_SHARD] OK dt={dt} shard={shard}/{shards} records={builder.n_records} rows={tbl_daily.num_rows} {files}")
+    return staged
+
 
-    print(f"Written silver daily parquet: s3://{bucket}/{out_daily_key} (rows={len(df_daily)})")
-    print(f"Written silver locations parquet: s3://{bucket}/{out_locations_key} (rows={len(df_locations)})")
+@stage("publish_silver")
+def publish_shards(dt: str, staged: Iterable[dict[str, Any]]) -> dict:
+    """Merge step of a sharded run: one dt manifest over the files of every shard."""
+    bucket = get_bucket_name()
+    manifest = publish_silver_partition(bucket, dt, list(staged))
+    _report(bucket, dt, manifest)
+    return manifest
 
 
 if __name__ == "__main__":
     import argparse
     from datetime import date
+    from src.common.profiling import add_profile_argument, configure_profiling
 
     parser = argparse.ArgumentParser(description="Bronze -> Silver (daily + locations)")
     parser.add_argument("--dt", type=str, default=date.today().isoformat())
+    parser.add_argument("--max_concurrency", type=int, default=None, help="Parallel bronze GETs")
+    parser.add_argument("--shards", type=int, default=None, help="Run every location shard, then publish once")
+    add_profile_argument(parser)
     args = parser.parse_args()
+    configure_profiling(args.profile)
 
-    run(args.dt)
\ No newline at end of file
+    if args.shards:
+        publish_shards(args.dt, [run_shard(args.dt, i, args.shards, args.max_concurrency) for i in range(args.shards)])
+    else:
+        run(args.dt, max_concurrency=args.max_concurrency)
@@ -0,0 +1,123 @@
+from typing import Any, Callable, Iterable
+
+import pyarrow as pa
+
+from src.common.bronze_format import bronze_dt_prefix
+from src.common.instrumentation import incr, span, stage
+from src.common.s3_client import get_bucket_name
+from src.common.sharding import DEFAULT_SHARDS, shard_filter
+from src.common.silver_format import silver_manifest_key
+from src.ingestion.write_bronze import load_locations
+from src.transforms.bronze_reader import iter_bronze_records
+from src.transforms.silver_normalize import HourlyColumnsBuilder
+from src.transforms.silver_store import publish_silver_partition, stage_silver_files, write_silver_partition
+
+
+def _read_bronze(
+    dt: str,
+    max_concurrency: int | None = None,
+    location_filter: Callable[[str], bool] | None = None,
+) -> HourlyColumnsBuilder:
+    # hour[] lists are flattened in chunks of records (see silver_normalize.flatten_hours)
+    builder = HourlyColumnsBuilder(dt)
+    for record in iter_bronze_records(
+        get_bucket_name(), dt, max_concurrency=max_concurrency, location_filter=location_filter
+    ):
+        with span("silver.normalize"):
+            builder.add(record)
+    incr("silver.records", builder.n_records)
+    return builder
+
+
+def _table(dt: str, builder: HourlyColumnsBuilder) -> pa.Table:
+    with span("silver.build_tables"):
+        tbl_hourly = builder.hourly_table()
+    if tbl_hourly.num_rows == 0:
+        raise ValueError(f"No hourly rows produced for dt={dt}. Check bronze payload structure.")
+    return tbl_hourly
+
+
+def build_table(dt: str, max_concurrency: int | None = None) -> pa.Table:
+    """Read bronze for dt and return the weather_hourly silver table in memory."""
+    builder = _read_bronze(dt, max_concurrency)
+    if not builder.n_records:
+        raise ValueError(f"No bronze objects found under s3://{get_bucket_name()}/{bronze_dt_prefix(dt)}")
+    return _table(dt, builder)
+
+
+def _report(bucket: str, dt: str, manifest: dict) -> None:
+    for f in manifest["datasets"]["weather_hourly"]["files"]:
+        print(f"Written silver weather_hourly parquet: s3://{bucket}/{f['key']} (rows={f['rows']}, bytes={f['bytes']})")
+    print(
+        f"Published silver manifest: s3://{bucket}/{silver_manifest_key(dt)} "
+        f"(run_id={manifest['run_id']}, removed_objects={manifest['removed_objects']})"
+    )
+
+
+def write_silver(dt: str, tbl_hourly: pa.Table) -> dict:
+    """
+    Stage weather_hourly under a new run_id and publish the dt manifest; the
+    daily datasets of the previous manifest are carried over untouched.
+    """
+    bucket = get_bucket_name()
+    manifest = write_silver_partition(bucket, dt, {"weather_hourly": tbl_hourly})
+    _report(bucket, dt, manifest)
+    return manifest
+
+
+@stage("bronze_to_silver_hourly")
+def run(dt: str, max_concurrency: int | None = None) -> None:
+    write_silver(dt, build_table(dt, max_concurrency=max_concurrency))
+
+
+@stage("bronze_to_silver_hourly_shard", labels=("dt", "shard"))
+def run_shard(
+    dt: str,
+    shard: int,
+    shards: int | None = None,
+    max_concurrency: int | None = None,
+    locations_path: str = "docs/locations.yml",
+) -> dict[str, Any]:
+    """weather_hourly for one location shard of dt, staged only (as bronze_to_silver_daily.run_shard)."""
+    shards = shards or DEFAULT_SHARDS
+    in_shard = shard_filter(load_locations(locations_path), shard, shards)
+    builder = _read_bronze(dt, max_concurrency, in_shard)
+    if not builder.n_records:
+        print(f"[SILVER_HOURLY_SHARD] dt={dt} shard={shard}/{shards} has no bronze records")
+        return {}
+
+    tbl_hourly = _table(dt, builder)
+    staged = stage_silver_files(get_bucket_name(), dt, {"weather_hourly": tbl_hourly}, shard=shard)
+    print(
+        f"[SILVER_HOURLY_SHARD] OK dt={dt} shard={shard}/{shards} records={builder.n_records} "
+        f"rows={tbl_hourly.num_rows} key={staged['weather_hourly']['files'][0]['key']}"
+    )
+    return staged
+
+
+@stage("publish_silver_hourly")
+def publish_shards(dt: str, staged: Iterable[dict[str, Any]]) -> dict:
+    """Merge step of a sharded run: publish weather_hourly of every shard in the dt manifest."""
+    bucket = get_bucket_name()
+    manifest = publish_silver_partition(bucket, dt, list(staged))
+    _report(bucket, dt, manifest)
+    return manifest
+
+
+if __name__ == "__main__":
+    import argparse
+    from datetime import date
+    from src.common.profiling import add_profile_argument, configure_profiling
+
+    parser = argparse.ArgumentParser(description="Bronze -> Silver (hourly)")
+    parser.add_argument("--dt", type=str, default=date.today().isoformat())
+    parser.add_argument("--max_concurrency", type=int, default=None, help="Parallel bronze GETs")
+    parser.add_argument("--shards", type=int, default=None, help="Run every location shard, then publish once")
+    add_profile_argument(parser)
+    args = parser.parse_args()
+    configure_profiling(args.profile)
+
+    if args.shards:
+        publish_shards(args.dt, [run_shard(args.dt, i, args.shards, args.max_concurrency) for i in range(args.shards)])
+    else:
+        run(args.dt, max_concurrency=args.max_concurrency)
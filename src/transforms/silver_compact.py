@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import os
+import time
+from datetime import date
+from typing import Any
+
+from src.common.instrumentation import stage
+from src.common.s3_client import get_bucket_name
+from src.common.silver_format import COMPACTED_DATASETS, compaction_manifest_key
+from src.transforms.silver_store import write_silver_compaction
+
+# Complete months before dt's month that run(dt) (re)compacts when their dts changed
+DEFAULT_LOOKBACK_MONTHS = int(os.getenv("SILVER_COMPACT_LOOKBACK_MONTHS", "2"))
+
+
+def months_before(dt: str, n: int) -> list[str]:
+    d = date.fromisoformat(dt)
+    index = d.year * 12 + d.month - 1
+    return [f"{(index - i) // 12:04d}-{(index - i) % 12 + 1:02d}" for i in range(n, 0, -1)]
+
+
+def compact_month(
+    month: str,
+    dataset: str = "weather_daily",
+    target_rows: int | None = None,
+    force: bool = False,
+) -> dict[str, Any]:
+    bucket = get_bucket_name()
+    t0 = time.perf_counter()
+    result = write_silver_compaction(bucket, dataset, month, target_rows=target_rows, force=force)
+    duration = time.perf_counter() - t0
+
+    if result["status"] == "compacted":
+        print(
+            f"[SILVER_COMPACT] OK {dataset} month={month} dts={len(result['dts'])} rows={result['rows']} "
+            f"files={len(result['files'])} bytes={sum(f['bytes'] for f in result['files'])} "
+            f"run_id={result['run_id']} removed_objects={result['removed_objects']} duration_s={duration:.3f} "
+            f"-> s3://{bucket}/{compaction_manifest_key(dataset, month)}"
+        )
+    else:
+        print(f"[SILVER_COMPACT] SKIP {dataset} month={month} ({result['status']}, dts={len(result['dts'])})")
+    return result
+
+
+def compact_months(months: list[str], datasets: tuple[str, ...] = COMPACTED_DATASETS, **kwargs: Any) -> list[dict[str, Any]]:
+    return [compact_month(month, dataset=dataset, **kwargs) for dataset in datasets for month in months]
+
+
+@stage("silver_compact")
+def run(dt: str, lookback_months: int | None = None) -> list[dict[str, Any]]:
+    """
+    Scheduled entry point: compact the complete months before dt's month, for
+    every compacted dataset. A month already compacted from its current dts
+    costs one LIST + one GET; a late rerun of one of its dts triggers a new
+    compaction (readers already prefer the rerun).
+    """
+    n = DEFAULT_LOOKBACK_MONTHS if lookback_months is None else lookback_months
+    return compact_months(months_before(dt, n))
+
+
+if __name__ == "__main__":
+    import argparse
+    from src.common.profiling import add_profile_argument, configure_profiling
+
+    parser = argparse.ArgumentParser(description="Compact silver daily partitions into monthly files")
+    parser.add_argument("--dt", type=str, default=date.today().isoformat(), help="Compact the months before this dt")
+    parser.add_argument("--lookback_months", type=int, default=None, help="Complete months before --dt to check")
+    parser.add_argument("--months", type=str, default=None, help="Comma-separated YYYY-MM (overrides --dt)")
+    parser.add_argument("--dataset", type=str, default=None, help=f"One of {list(COMPACTED_DATASETS)} (default: all)")
+    parser.add_argument("--target_rows", type=int, default=None, help="Max rows per compacted file")
+    parser.add_argument("--force", action="store_true", help="Recompact months that are up to date")
+    add_profile_argument(parser)
+    args = parser.parse_args()
+    configure_profiling(args.profile)
+
+    months = [m.strip() for m in args.months.split(",") if m.strip()] if args.months else None
+    datasets = (args.dataset,) if args.dataset else COMPACTED_DATASETS
+    if months is None:
+        n = DEFAULT_LOOKBACK_MONTHS if args.lookback_months is None else args.lookback_months
+        months = months_before(args.dt, n)
+    compact_months(months, datasets, target_rows=args.target_rows, force=args.force)
@@ -0,0 +1,326 @@
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# ---------- declared silver schemas (see config/data_contract.md §6.2) ----------
+DAILY_SCHEMA = pa.schema(
+    [
+        ("dt", pa.date32()),
+        ("location_id", pa.string()),
+        ("ingested_at", pa.timestamp("us", tz="UTC")),
+        ("date", pa.date32()),
+        ("temp_min_c", pa.float64()),
+        ("temp_max_c", pa.float64()),
+        ("temp_avg_c", pa.float64()),
+        ("precip_mm", pa.float64()),
+        ("snow_cm", pa.float64()),
+        ("humidity_avg", pa.float64()),
+        ("wind_max_kph", pa.float64()),
+        ("condition_code", pa.int64()),
+        ("condition_text", pa.string()),
+    ]
+)
+
+LOCATIONS_SCHEMA = pa.schema(
+    [
+        ("dt", pa.date32()),
+        ("location_id", pa.string()),
+        ("name", pa.string()),
+        ("region", pa.string()),
+        ("country", pa.string()),
+        ("lat", pa.float64()),
+        ("lon", pa.float64()),
+        ("tz_id", pa.string()),
+        ("local_time", pa.timestamp("us")),
+        ("ingested_at", pa.timestamp("us", tz="UTC")),
+    ]
+)
+
+# One row per (location_id, time_epoch): 24x the daily volume, so measures are
+# float32 (values carry 1-2 decimals) and small integers int16
+HOURLY_SCHEMA = pa.schema(
+    [
+        ("dt", pa.date32()),
+        ("location_id", pa.string()),
+        ("ingested_at", pa.timestamp("us", tz="UTC")),
+        ("date", pa.date32()),
+        ("time_epoch", pa.int64()),
+        ("hour", pa.int16()),
+        ("temp_c", pa.float32()),
+        ("feelslike_c", pa.float32()),
+        ("dewpoint_c", pa.float32()),
+        ("humidity", pa.int16()),
+        ("cloud", pa.int16()),
+        ("precip_mm", pa.float32()),
+        ("snow_cm", pa.float32()),
+        ("chance_of_rain", pa.int16()),
+        ("chance_of_snow", pa.int16()),
+        ("wind_kph", pa.float32()),
+        ("gust_kph", pa.float32()),
+        ("wind_degree", pa.int16()),
+        ("pressure_mb", pa.float32()),
+        ("vis_km", pa.float32()),
+        ("uv", pa.float32()),
+        ("is_day", pa.int16()),
+        ("condition_code", pa.int16()),
+        ("condition_text", pa.string()),
+    ]
+)
+
+# pandas readers get nullable Int64 (not float64) for integer columns with NULLs
+_PANDAS_DTYPES = {"condition_code": "Int64"}
+_PANDAS_DTYPES.update({f.name: "Int16" for f in HOURLY_SCHEMA if f.type == pa.int16() and f.name not in _PANDAS_DTYPES})
+
+# bronze field paths, relative to forecastday[0].day
+_DAY_FIELDS = {
+    "temp_min_c": "mintemp_c",
+    "temp_max_c": "maxtemp_c",
+    "temp_avg_c": "avgtemp_c",
+    "precip_mm": "totalprecip_mm",
+    "snow_cm": "totalsnow_cm",
+    "humidity_avg": "avghumidity",
+    "wind_max_kph": "maxwind_kph",
+}
+_LOCATION_FIELDS = ["name", "region", "country", "lat", "lon", "tz_id", "local_time"]
+
+# hourly columns read as-is from forecastday[0].hour[] (same key in bronze)
+_HOUR_FIELDS = [
+    f.name
+    for f in HOURLY_SCHEMA
+    if f.name not in ("dt", "location_id", "ingested_at", "date", "hour", "condition_code", "condition_text")
+]
+# Conversion type of one hour entry: every number as float64 first (the API
+# sends 55 or 55.0 alike), narrowed afterwards; other keys are ignored
+_HOUR_STRUCT = pa.struct(
+    [(name, pa.float64()) for name in _HOUR_FIELDS]
+    + [("time", pa.string()), ("condition", pa.struct([("code", pa.float64()), ("text", pa.string())]))]
+)
+# Records whose hours are converted together; bounds the parsed JSON kept alive
+_HOURLY_CHUNK_RECORDS = 2048
+
+
+def _coerce_scalar(v: Any, typ: pa.DataType) -> Any:
+    # slow path for one value: same semantics as pd.to_numeric/to_datetime(errors="coerce")
+    if v is None:
+        return None
+    try:
+        if pa.types.is_floating(typ):
+            return float(v)
+        if pa.types.is_integer(typ):
+            f = float(v)
+            return int(f) if f.is_integer() else None
+        if pa.types.is_string(typ):
+            return str(v)
+        return pa.scalar(str(v)).cast(typ).as_py()
+    except (TypeError, ValueError, pa.ArrowInvalid):
+        return None
+
+
+def to_arrow(values: list[Any], typ: pa.DataType) -> pa.Array:
+    """Build a typed Arrow array; bad values become NULL instead of failing the run."""
+    try:
+        if pa.types.is_temporal(typ):
+            return pa.array(values, type=pa.string()).cast(typ)
+        return pa.array(values, type=typ)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError, ValueError):
+        return pa.array([_coerce_scalar(v, typ) for v in values], type=typ)
+
+
+def narrow(values: pa.Array, typ: pa.DataType) -> pa.Array:
+    """
+    Vectorized float64 -> typ. Integers that are not whole or out of typ's range
+    become NULL (as in to_arrow) instead of failing or wrapping around.
+    """
+    if pa.types.is_integer(typ):
+        info = np.iinfo(typ.to_pandas_dtype())
+        ok = pc.and_(
+            pc.and_(pc.is_finite(values), pc.equal(values, pc.trunc(values))),
+            pc.and_(pc.greater_equal(values, float(info.min)), pc.less(values, float(info.max) + 1)),
+        )
+        values = pc.if_else(ok, values, pa.scalar(None, values.type))
+    return values.cast(typ)
+
+
+def flatten_hours(hour_lists: list[Any]) -> tuple[dict[str, pa.Array], np.ndarray]:
+    """
+    forecastday[0].hour lists of many records -> (hourly columns typed as
+    HOURLY_SCHEMA, hours per record). The lists are converted in one pass of
+    Arrow's C++ converter; only a malformed value falls back to Python.
+    """
+    try:
+        lists = pa.array(hour_lists, type=pa.list_(_HOUR_STRUCT))
+        counts = pc.fill_null(lists.value_lengths(), 0).to_numpy(zero_copy_only=False)
+        hours = lists.flatten()
+        # StructArray.flatten merges the parent's nulls (hour: null) into every child
+        raw = dict(zip([f.name for f in _HOUR_STRUCT], hours.flatten()))
+        code, text = raw.pop("condition").flatten()
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        entries = [h if isinstance(h, dict) else {} for hs in hour_lists for h in (hs or [])]
+        counts = np.array([len(hs or []) for hs in hour_lists], dtype=np.int64)
+        raw = {name: to_arrow([h.get(name) for h in entries], pa.float64()) for name in _HOUR_FIELDS}
+        raw["time"] = to_arrow([h.get("time") for h in entries], pa.string())
+        conditions = [h.get("condition") if isinstance(h.get("condition"), dict) else {} for h in entries]
+        code = to_arrow([c.get("code") for c in conditions], pa.float64())
+        text = to_arrow([c.get("text") for c in conditions], pa.string())
+
+    # "YYYY-MM-DD HH:MM" local time -> local hour
+    hour = pc.utf8_slice_codeunits(raw.pop("time"), 11, 13)
+    try:
+        hour = hour.cast(pa.int16())
+    except pa.ArrowInvalid:
+        hour = to_arrow(hour.to_pylist(), pa.int16())
+
+    cols = {name: narrow(raw[name], HOURLY_SCHEMA.field(name).type) for name in _HOUR_FIELDS}
+    cols["hour"] = hour
+    cols["condition_code"] = narrow(code, pa.int16())
+    cols["condition_text"] = text
+    return cols, counts
+
+
+def dedup_keep_last(table: pa.Table, keys: list[str]) -> pa.Table:
+    """Drop duplicate keys, keeping the last occurrence (like drop_duplicates(keep="last"))."""
+    if table.num_rows == 0:
+        return table
+    rows = pa.array(range(table.num_rows), type=pa.int64())
+    last = (
+        table.select(keys)
+        .append_column("__row", rows)
+        .group_by(keys, use_threads=False)
+        .aggregate([("__row", "max")])
+        .column("__row_max")
+    )
+    if len(last) == table.num_rows:
+        return table
+    # surviving row numbers, back in their original order
+    return table.take(pc.take(last, pc.sort_indices(last)))
+
+
+def with_pandas_metadata(table: pa.Table) -> pa.Table:
+    empty = table.schema.empty_table().to_pandas()
+    for col, dtype in _PANDAS_DTYPES.items():
+        if col in empty.columns:
+            empty[col] = empty[col].astype(dtype)
+    return table.replace_schema_metadata(pa.Schema.from_pandas(empty, preserve_index=False).metadata)
+
+
+class SilverColumnsBuilder:
+    """
+    Collects bronze records straight into per-column Python lists, then builds
+    typed Arrow tables against the declared silver schemas in one pass per column.
+    """
+
+    def __init__(self, dt: str) -> None:
+        self.dt = dt
+        self.n_records = 0
+        self._daily: dict[str, list[Any]] = {f.name: [] for f in DAILY_SCHEMA}
+        self._locations: dict[str, list[Any]] = {f.name: [] for f in LOCATIONS_SCHEMA}
+
+    def add(self, record: dict[str, Any]) -> None:
+        self.n_records += 1
+        metadata = record.get("metadata") or {}
+        payload = record.get("payload") or {}
+        location_id = metadata.get("location_id")
+        ingested_at = metadata.get("ingested_at")
+
+        # -------- locations (dimension-like) --------
+        loc = payload.get("location") or {}
+        cols = self._locations
+        cols["location_id"].append(location_id)
+        cols["ingested_at"].append(ingested_at)
+        for name in _LOCATION_FIELDS:
+            cols[name].append(loc.get(name))
+
+        # -------- weather_daily (fact-like) --------
+        forecastday = (payload.get("forecast") or {}).get("forecastday") or []
+        if not forecastday:
+            return
+        fd0 = forecastday[0] or {}
+        day = fd0.get("day") or {}
+        cond = day.get("condition") or {}
+
+        cols = self._daily
+        cols["location_id"].append(location_id)
+        cols["ingested_at"].append(ingested_at)
+        cols["date"].append(fd0.get("date"))
+        for name, src in _DAY_FIELDS.items():
+            cols[name].append(day.get(src))
+        cols["condition_code"].append(cond.get("code"))
+        cols["condition_text"].append(cond.get("text"))
+
+    def _table(self, schema: pa.Schema, cols: dict[str, list[Any]]) -> pa.Table:
+        n = len(cols["location_id"])
+        arrays = []
+        for field in schema:
+            if field.name == "dt":
+                arrays.append(pa.array([self.dt] * n, type=pa.string()).cast(pa.date32()))
+            else:
+                arrays.append(to_arrow(cols[field.name], field.type))
+        return pa.Table.from_arrays(arrays, schema=schema)
+
+    def daily_table(self) -> pa.Table:
+        table = self._table(DAILY_SCHEMA, self._daily)
+        table = dedup_keep_last(table, ["location_id", "date"])
+        return with_pandas_metadata(table.sort_by([("location_id", "ascending"), ("date", "ascending")]))
+
+    def locations_table(self) -> pa.Table:
+        table = self._table(LOCATIONS_SCHEMA, self._locations)
+        table = dedup_keep_last(table, ["location_id"])
+        return with_pandas_metadata(table.sort_by([("location_id", "ascending")]))
+
+
+class HourlyColumnsBuilder:
+    """
+    Collects forecastday[0].hour lists of bronze records and converts them to
+    the weather_hourly table every _HOURLY_CHUNK_RECORDS records (flatten_hours),
+    so memory holds typed columns, not 24 parsed JSON objects per record.
+    """
+
+    def __init__(self, dt: str, chunk_records: int = _HOURLY_CHUNK_RECORDS) -> None:
+        self.dt = dt
+        self.chunk_records = chunk_records
+        self.n_records = 0
+        self._hour_lists: list[Any] = []
+        self._records: dict[str, list[Any]] = {"location_id": [], "ingested_at": [], "date": []}
+        self._chunks: list[pa.Table] = []
+
+    def add(self, record: dict[str, Any]) -> None:
+        self.n_records += 1
+        metadata = record.get("metadata") or {}
+        payload = record.get("payload") or {}
+        forecastday = (payload.get("forecast") or {}).get("forecastday") or []
+        if not forecastday:
+            return
+        fd0 = forecastday[0] or {}
+
+        self._hour_lists.append(fd0.get("hour") or [])
+        self._records["location_id"].append(metadata.get("location_id"))
+        self._records["ingested_at"].append(metadata.get("ingested_at"))
+        self._records["date"].append(fd0.get("date"))
+        if len(self._hour_lists) >= self.chunk_records:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._hour_lists:
+            return
+        cols, counts = flatten_hours(self._hour_lists)
+        # record-level columns repeated once per hour of the record
+        rows = pa.array(np.repeat(np.arange(len(counts)), counts))
+        for name, values in self._records.items():
+            cols[name] = to_arrow(values, HOURLY_SCHEMA.field(name).type).take(rows)
+        cols["dt"] = pa.array(np.full(len(rows), np.datetime64(self.dt, "D")), type=pa.date32())
+        table = pa.Table.from_arrays([cols[f.name] for f in HOURLY_SCHEMA], schema=HOURLY_SCHEMA)
+        # an hour without time_epoch has no key (null or malformed entry)
+        self._chunks.append(table.filter(pc.is_valid(table.column("time_epoch"))))
+
+        self._hour_lists = []
+        self._records = {name: [] for name in self._records}
+
+    def hourly_table(self) -> pa.Table:
+        self._flush()
+        table = pa.concat_tables(self._chunks) if self._chunks else HOURLY_SCHEMA.empty_table()
+        table = dedup_keep_last(table, ["location_id", "time_epoch"])
+        return with_pandas_metadata(table.sort_by([("location_id", "ascending"), ("time_epoch", "ascending")]))
@@ -0,0 +1,721 @@
+from __future__ import annotations
+
+import bisect
+import io
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any, Iterable, Iterator
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from src.common.instrumentation import incr, span
+from src.common.s3_client import get_s3_client
+from src.common.silver_format import (
+    COMPACT_TARGET_ROWS,
+    COMPACTED_DATASETS,
+    COMPACTION_MANIFEST_PREFIX,
+    MANIFEST_PREFIX,
+    SILVER_PREFIX,
+    build_compaction_manifest,
+    build_manifest,
+    column_stats,
+    compaction_manifest_key,
+    dataset_entry,
+    dataset_version,
+    file_entry,
+    legacy_silver_key,
+    merge_dataset_entries,
+    new_run_id,
+    silver_compacted_key,
+    silver_compacted_prefix,
+    silver_dt_prefix,
+    silver_manifest_key,
+    silver_run_key,
+    sort_table,
+    write_options,
+)
+from src.transforms.silver_normalize import DAILY_SCHEMA, HOURLY_SCHEMA, LOCATIONS_SCHEMA
+
+_SCHEMAS = {"weather_daily": DAILY_SCHEMA, "locations": LOCATIONS_SCHEMA, "weather_hourly": HOURLY_SCHEMA}
+
+# Parallel files per read_silver_range call (and per compaction)
+DEFAULT_READ_CONCURRENCY = int(os.getenv("SILVER_READ_CONCURRENCY", "8"))
+# First GET of a file: the parquet footer (and small files entirely) in one request
+_TAIL_BYTES = 64 * 1024
+
+
+def _get_json(s3, bucket: str, key: str) -> tuple[dict[str, Any] | None, str | None]:
+    # (document, ETag); (None, None) when the key does not exist
+    try:
+        obj = s3.get_object(Bucket=bucket, Key=key)
+    except s3.exceptions.NoSuchKey:
+        return None, None
+    return json.loads(obj["Body"].read()), obj["ETag"]
+
+
+def _put_json(s3, bucket: str, key: str, doc: dict[str, Any]) -> None:
+    s3.put_object(
+        Bucket=bucket,
+        Key=key,
+        Body=json.dumps(doc, separators=(",", ":")).encode("utf-8"),
+        ContentType="application/json",
+    )
+
+
+def read_silver_manifest(bucket: str, dt: str) -> dict[str, Any] | None:
+    return _get_json(get_s3_client(), bucket, silver_manifest_key(dt))[0]
+
+
+def read_compaction_manifest(bucket: str, dataset: str, month: str) -> dict[str, Any] | None:
+    return _get_json(get_s3_client(), bucket, compaction_manifest_key(dataset, month))[0]
+
+
+def silver_keys(bucket: str, dt: str, dataset: str, manifest: dict[str, Any] | None = None) -> list[str]:
+    """
+    Files of one dataset for dt: from the dt manifest (one GET, pass it in when
+    already fetched), else the legacy in-place object.
+    """
+    manifest = manifest if manifest is not None else read_silver_manifest(bucket, dt)
+    if manifest is None:
+        return [legacy_silver_key(dataset, dt)]
+    if dataset not in manifest["datasets"]:
+        raise ValueError(f"Silver manifest for dt={dt} has no dataset '{dataset}'")
+    return [f["key"] for f in manifest["datasets"][dataset]["files"]]
+
+
+def _read_parquet_object(s3, bucket: str, key: str) -> pa.Table:
+    obj = s3.get_object(Bucket=bucket, Key=key)
+    with span("s3.read_body"):
+        body = obj["Body"].read()
+    incr("silver.bytes_read", len(body))
+    with span("parquet.decode"):
+        return pq.read_table(io.BytesIO(body))
+
+
+def read_silver_table(bucket: str, dt: str, dataset: str, manifest: dict[str, Any] | None = None) -> pa.Table:
+    s3 = get_s3_client()
+    tables = [_read_parquet_object(s3, bucket, key) for key in silver_keys(bucket, dt, dataset, manifest)]
+    return tables[0] if len(tables) == 1 else pa.concat_tables(tables, promote_options="default")
+
+
+def _delete_except(s3, bucket: str, prefixes: Iterable[str], keep: set[str]) -> int:
+    # older runs (and the legacy in-place file) are dropped, except the previous
+    # run, which a reader that fetched the old manifest may still be reading
+    doomed: list[str] = []
+    paginator = s3.get_paginator("list_objects_v2")
+    for prefix in prefixes:
+        for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+            doomed.extend(item["Key"] for item in page.get("Contents", []) or [] if item["Key"] not in keep)
+    for i in range(0, len(doomed), 1000):
+        s3.delete_objects(
+            Bucket=bucket,
+            Delete={"Objects": [{"Key": k} for k in doomed[i : i + 1000]], "Quiet": True},
+        )
+    return len(doomed)
+
+
+def _encode(dataset: str, table: pa.Table, write_table_kwargs: dict[str, Any] | None = None) -> tuple[bytes, int]:
+    # (parquet bytes, row groups) for a table already in sort order
+    buf = io.BytesIO()
+    with span("parquet.encode"):
+        pq.write_table(table, buf, **{**write_options(dataset, table.schema), **(write_table_kwargs or {})})
+    body = buf.getvalue()
+    incr("silver.bytes_written", len(body))
+    return body, pq.ParquetFile(io.BytesIO(body)).metadata.num_row_groups
+
+
+def stage_silver_files(
+    bucket: str,
+    dt: str,
+    tables: dict[str, pa.Table],
+    run_id: str | None = None,
+    shard: int = 0,
+    write_table_kwargs: dict[str, Any] | None = None,
+) -> dict[str, dict[str, Any]]:
+    """
+    Write every dataset of dt under run_id (file index = shard), sorted, zstd,
+    sized row groups (see silver_format.write_options), without publishing.
+    Returns the manifest entries of the staged datasets: readers see nothing
+    until publish_silver_partition commits them.
+    """
+    s3 = get_s3_client()
+    run_id = run_id or new_run_id()
+    entries: dict[str, dict[str, Any]] = {}
+    for dataset, table in tables.items():
+        key = silver_run_key(dataset, dt, run_id, shard)
+        with span("silver.sort"):
+            table = sort_table(dataset, table)
+        body, n_groups = _encode(dataset, table, write_table_kwargs)
+        s3.put_object(Bucket=bucket, Key=key, Body=body, ContentType="application/octet-stream")
+        entries[dataset] = dataset_entry(table, [file_entry(key, len(body), table, n_groups)])
+    return entries
+
+
+def publish_silver_partition(
+    bucket: str,
+    dt: str,
+    staged: list[dict[str, dict[str, Any]]],
+    run_id: str | None = None,
+) -> dict[str, Any]:
+    """
+    Publish the dt manifest over files staged by stage_silver_files, possibly by
+    several location shards (one file per shard and dataset). The manifest PUT
+    is the commit point, so readers never see a half-written partition or mixed
+    runs across datasets. Datasets that were not staged are carried over from
+    the previous manifest; older files of the staged datasets are deleted.
+    """
+    s3 = get_s3_client()
+    previous = read_silver_manifest(bucket, dt)
+
+    entries: dict[str, dict[str, Any]] = {}
+    for dataset in dict.fromkeys(d for shard in staged for d in shard):
+        parts = [shard[dataset] for shard in staged if dataset in shard]
+        entries[dataset] = parts[0] if len(parts) == 1 else merge_dataset_entries(parts)
+    if not entries:
+        raise ValueError(f"No staged silver datasets to publish for dt={dt}")
+    rewritten = list(entries)
+
+    if previous is not None:
+        # datasets not rewritten by this run stay as they were
+        for dataset, entry in previous["datasets"].items():
+            entries.setdefault(dataset, entry)
+
+    manifest = build_manifest(dt, run_id or new_run_id(), entries)
+    _put_json(s3, bucket, silver_manifest_key(dt), manifest)
+
+    keep = {f["key"] for e in entries.values() for f in e["files"]}
+    if previous is not None:
+        keep |= {f["key"] for e in previous["datasets"].values() for f in e["files"]}
+    manifest["removed_objects"] = _delete_except(s3, bucket, [silver_dt_prefix(d, dt) for d in rewritten], keep)
+    return manifest
+
+
+def write_silver_partition(
+    bucket: str,
+    dt: str,
+    tables: dict[str, pa.Table],
+    run_id: str | None = None,
+    write_table_kwargs: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    """Stage every dataset of dt under a fresh run_id, then publish the dt manifest."""
+    run_id = run_id or new_run_id()
+    staged = stage_silver_files(bucket, dt, tables, run_id, write_table_kwargs=write_table_kwargs)
+    return publish_silver_partition(bucket, dt, [staged], run_id)
+
+
+# ---------- partition resolution (daily manifests, legacy objects, compacted months) ----------
+
+
+def _iter_listing(bucket: str, prefix: str, start_after: str) -> Iterator[dict[str, Any]]:
+    paginator = get_s3_client().get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix, StartAfter=start_after):
+        yield from page.get("Contents", []) or []
+
+
+def _list_dt_versions(bucket: str, dataset: str, start: str, end: str) -> dict[str, tuple[str, bool]]:
+    """
+    {dt: (ETag, has_manifest)} for every dt in [start, end] with silver: the
+    ETag of the dt manifest, else of the legacy object. A rerun of a dt changes
+    its ETag. Costs LISTs only (ISO dates sort lexically, so each listing starts
+    at `start` and stops after `end`).
+    """
+    versions: dict[str, tuple[str, bool]] = {}
+    for item in _iter_listing(bucket, MANIFEST_PREFIX, f"{MANIFEST_PREFIX}dt={start}"):
+        name = item["Key"][len(MANIFEST_PREFIX) :]
+        if not (name.startswith("dt=") and name.endswith(".json")):
+            continue
+        dt = name[len("dt=") : -len(".json")]
+        if dt > end:
+            break
+        if dt >= start:
+            versions[dt] = (item["ETag"], True)
+
+    prefix = f"{SILVER_PREFIX}/{dataset}/"
+    for item in _iter_listing(bucket, prefix, f"{prefix}dt={start}"):
+        key = item["Key"]
+        part = key[len(prefix) :].split("/", 1)[0]
+        if not part.startswith("dt="):
+            continue
+        dt = part[len("dt=") :]
+        if dt > end:
+            break
+        if dt >= start and dt not in versions and key == legacy_silver_key(dataset, dt):
+            versions[dt] = (item["ETag"], False)
+    return versions
+
+
+def _read_dataset_version(s3, bucket: str, dataset: str, dt: str) -> tuple[str | None, str | None]:
+    # (dataset_version of `dataset` in dt's manifest, None when absent; manifest ETag) from one GET
+    manifest, etag = _get_json(s3, bucket, silver_manifest_key(dt))
+    if manifest is None or dataset not in manifest["datasets"]:
+        return None, etag
+    return dataset_version(manifest["datasets"][dataset]), etag
+
+
+def _current_compacted_dts(
+    s3, bucket: str, dataset: str, compaction: dict[str, Any], versions: dict[str, tuple[str, bool]]
+) -> dict[str, str]:
+    """
+    {dt: current manifest ETag} for the dts of `compaction` whose `dataset` is
+    unchanged since: the listed ETag still matches (no request), or the dt
+    manifest was republished for another dataset only (one GET).
+    """
+    recorded = compaction.get("versions", {})
+    current: dict[str, str] = {}
+    for dt, etag in compaction["dts"].items():
+        if dt not in versions:
+            continue
+        listed_etag, has_manifest = versions[dt]
+        if listed_etag == etag:
+            current[dt] = etag
+        elif has_manifest and dt in recorded:
+            version, manifest_etag = _read_dataset_version(s3, bucket, dataset, dt)
+            if version == recorded[dt]:
+                current[dt] = manifest_etag
+    return current
+
+
+def _iter_compactions(bucket: str, dataset: str, start: str, end: str) -> Iterator[dict[str, Any]]:
+    if dataset not in COMPACTED_DATASETS:
+        return
+    s3 = get_s3_client()
+    prefix = f"{COMPACTION_MANIFEST_PREFIX}{dataset}/"
+    for item in _iter_listing(bucket, prefix, f"{prefix}month={start[:7]}"):
+        name = item["Key"][len(prefix) :]
+        if not (name.startswith("month=") and name.endswith(".json")):
+            continue
+        if name[len("month=") : -len(".json")] > end[:7]:
+            return
+        manifest, _ = _get_json(s3, bucket, item["Key"])
+        if manifest is not None:
+            yield manifest
+
+
+def _iter_sources(
+    bucket: str, dataset: str, start: str, end: str
+) -> Iterator[tuple[list[str], list[str], list[dict[str, Any] | None]]]:
+    # (dts, keys, per-key column stats or None): compacted months first, then
+    # every remaining dt on its own
+    versions = _list_dt_versions(bucket, dataset, start, end)
+    s3 = get_s3_client()
+
+    covered: set[str] = set()
+    for compaction in _iter_compactions(bucket, dataset, start, end):
+        # dts of this dataset rerun since the compaction are served by their own manifest
+        current = _current_compacted_dts(s3, bucket, dataset, compaction, versions)
+        dts = sorted(dt for dt in current if dt not in covered)
+        if dts:
+            covered.update(dts)
+            files = compaction["files"]
+            yield dts, [f["key"] for f in files], [f.get("stats") for f in files]
+
+    for dt in sorted(versions):
+        if dt in covered:
+            continue
+        if not versions[dt][1]:
+            yield [dt], [legacy_silver_key(dataset, dt)], [None]
+            continue
+        manifest = read_silver_manifest(bucket, dt)
+        if manifest is None or dataset not in manifest["datasets"]:
+            continue
+        entry = manifest["datasets"][dataset]
+        # files of a sharded run carry their own stats (disjoint location ranges)
+        yield [dt], [f["key"] for f in entry["files"]], [f.get("stats", entry.get("stats")) for f in entry["files"]]
+
+
+def iter_silver_sources(bucket: str, dataset: str, start: str, end: str) -> Iterator[tuple[list[str], list[str]]]:
+    """
+    (dts, keys) groups that together hold `dataset` for every dt in [start, end]:
+    one compacted month (several dts per file), or one dt resolved through its
+    manifest or the legacy object.
+
+    A compacted file may also hold rows of dts outside the range or of dts rerun
+    after compaction, so consumers keep only rows whose `dt` is in `dts`.
+    """
+    for dts, keys, _ in _iter_sources(bucket, dataset, start, end):
+        yield dts, keys
+
+
+# ---------- compaction ----------
+
+
+def _month_bounds(month: str) -> tuple[str, str]:
+    first = date.fromisoformat(f"{month}-01")
+    last = (first.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+    return first.isoformat(), last.isoformat()
+
+
+def _read_dt_version(
+    bucket: str, dataset: str, dt: str, has_manifest: bool
+) -> tuple[str, pa.Table | None, str | None, str | None]:
+    # (dt, table, ETag, dataset_version) read consistently: the ETag is the one
+    # of the manifest / object actually read, not of an earlier listing
+    s3 = get_s3_client()
+    if has_manifest:
+        manifest, etag = _get_json(s3, bucket, silver_manifest_key(dt))
+        if manifest is None or dataset not in manifest["datasets"]:
+            return dt, None, None, None
+        entry = manifest["datasets"][dataset]
+        return dt, read_silver_table(bucket, dt, dataset, manifest), etag, dataset_version(entry)
+    obj = s3.get_object(Bucket=bucket, Key=legacy_silver_key(dataset, dt))
+    return dt, pq.read_table(io.BytesIO(obj["Body"].read())), obj["ETag"], None
+
+
+def write_silver_compaction(
+    bucket: str,
+    dataset: str,
+    month: str,
+    target_rows: int | None = None,
+    force: bool = False,
+) -> dict[str, Any]:
+    """
+    Merge every dt of `month` into files of <= target_rows rows sorted by the
+    dataset sort keys, then publish the compaction manifest (the commit point,
+    as for dt manifests). Daily files are kept: single-dt consumers keep using
+    them, and a dt rerun after compaction simply takes over that dt again.
+
+    A month whose dts are all still current for `dataset` (see
+    _current_compacted_dts) is left alone unless `force`; when only other
+    datasets of some dts were republished, the recorded ETags are refreshed.
+    """
+    if dataset not in COMPACTED_DATASETS:
+        raise ValueError(f"Dataset '{dataset}' is not compacted. Allowed: {list(COMPACTED_DATASETS)}")
+    target_rows = target_rows or COMPACT_TARGET_ROWS
+    if target_rows < 1:
+        raise ValueError("target_rows must be >= 1")
+
+    s3 = get_s3_client()
+    first, last = _month_bounds(month)
+    versions = _list_dt_versions(bucket, dataset, first, last)
+    previous = read_compaction_manifest(bucket, dataset, month)
+    if not versions:
+        return {"status": "empty", "month": month, "dts": {}}
+    if previous is not None and not force:
+        current = _current_compacted_dts(s3, bucket, dataset, previous, versions)
+        # dts with silver but not compacted are fine only when their manifest has no `dataset`
+        # (e.g. hourly not built yet for that dt)
+        if len(current) == len(previous["dts"]) and all(
+            versions[dt][1] and _read_dataset_version(s3, bucket, dataset, dt)[0] is None
+            for dt in versions
+            if dt not in current
+        ):
+            if current != previous["dts"]:
+                previous["dts"] = current
+                _put_json(s3, bucket, compaction_manifest_key(dataset, month), previous)
+            return {**previous, "status": "up_to_date"}
+
+    with ThreadPoolExecutor(max_workers=DEFAULT_READ_CONCURRENCY) as pool:
+        parts = list(pool.map(lambda dt: _read_dt_version(bucket, dataset, dt, versions[dt][1]), sorted(versions)))
+    parts = [part for part in parts if part[1] is not None and part[1].num_rows]
+    if not parts:
+        return {"status": "empty", "month": month, "dts": {}}
+
+    schema = _SCHEMAS[dataset]
+    table = pa.concat_tables([t.select(schema.names).cast(schema) for _, t, _, _ in parts])
+    table = sort_table(dataset, table)
+
+    run_id = new_run_id()
+    files = []
+    for i, offset in enumerate(range(0, table.num_rows, target_rows)):
+        chunk = table.slice(offset, target_rows)
+        key = silver_compacted_key(dataset, month, run_id, i)
+        body, n_groups = _encode(dataset, chunk)
+        s3.put_object(Bucket=bucket, Key=key, Body=body, ContentType="application/octet-stream")
+        # per-file stats: a location filter skips whole parts without opening them
+        files.append({**file_entry(key, len(body), chunk, n_groups), "stats": column_stats(chunk)})
+
+    manifest = build_compaction_manifest(
+        dataset,
+        month,
+        run_id,
+        {dt: etag for dt, _, etag, _ in parts},
+        dataset_entry(table, files),
+        versions={dt: version for dt, _, _, version in parts if version is not None},
+    )
+    _put_json(s3, bucket, compaction_manifest_key(dataset, month), manifest)
+
+    keep = {f["key"] for f in files}
+    if previous is not None:
+        keep |= {f["key"] for f in previous["files"]}
+    manifest["removed_objects"] = _delete_except(s3, bucket, [silver_compacted_prefix(dataset, month)], keep)
+    manifest["status"] = "compacted"
+    return manifest
+
+
+# ---------- pushdown reads ----------
+
+
+class _S3RangeFile(io.RawIOBase):
+    """
+    Read-only, seekable view of one S3 object where every read is a ranged GET.
+    The first GET fetches the tail (footer), so opening a file costs one request;
+    `tail` = (tail bytes, object size) of an earlier open skips it.
+    """
+
+    def __init__(self, s3, bucket: str, key: str, tail: tuple[bytes, int] | None = None) -> None:
+        super().__init__()
+        self._s3, self._bucket, self._key = s3, bucket, key
+        self.requests = 0
+        self.bytes_fetched = 0
+        self._pos = 0
+        if tail is not None:
+            self._tail, self.size = tail
+        else:
+            resp = self._get(f"bytes=-{_TAIL_BYTES}")
+            self._tail = resp["Body"].read()
+            self.bytes_fetched += len(self._tail)
+            self.size = int(resp["ContentRange"].rsplit("/", 1)[1]) if "ContentRange" in resp else len(self._tail)
+        self._tail_start = self.size - len(self._tail)
+
+    def _get(self, byte_range: str) -> dict[str, Any]:
+        self.requests += 1
+        return self._s3.get_object(Bucket=self._bucket, Key=self._key, Range=byte_range)
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._pos, io.SEEK_END: self.size}[whence]
+        self._pos = max(0, base + offset)
+        return self._pos
+
+    def read(self, size: int = -1) -> bytes:
+        end = self.size if size is None or size < 0 else min(self.size, self._pos + size)
+        if end <= self._pos:
+            return b""
+        if self._pos >= self._tail_start:
+            data = self._tail[self._pos - self._tail_start : end - self._tail_start]
+        else:
+            # the part already held in the tail buffer is not fetched again
+            fetch_end = min(end, self._tail_start)
+            data = self._get(f"bytes={self._pos}-{fetch_end - 1}")["Body"].read()
+            self.bytes_fetched += len(data)
+            if end > fetch_end:
+                data += self._tail[: end - fetch_end]
+        self._pos += len(data)
+        return data
+
+    def readinto(self, b) -> int:
+        data = self.read(len(b))
+        b[: len(data)] = data
+        return len(data)
+
+
+@dataclass(frozen=True)
+class SilverFooter:
+    """Parsed footer of one silver parquet object, reused by every row group read."""
+
+    key: str
+    size: int
+    tail: bytes
+    metadata: pq.FileMetaData
+
+
+def read_silver_footer(bucket: str, key: str) -> SilverFooter:
+    # one ranged GET (more only for footers above _TAIL_BYTES)
+    f = _S3RangeFile(get_s3_client(), bucket, key)
+    metadata = pq.ParquetFile(f).metadata
+    incr("silver.bytes_read", f.bytes_fetched)
+    return SilverFooter(key, f.size, f._tail, metadata)
+
+
+def read_silver_row_group(bucket: str, footer: SilverFooter, index: int, columns: list[str] | None = None) -> pa.Table:
+    """One row group of a silver object: a ranged GET of its column chunks, without the rest of the file."""
+    f = _S3RangeFile(get_s3_client(), bucket, footer.key, tail=(footer.tail, footer.size))
+    pf = pq.ParquetFile(f, metadata=footer.metadata, pre_buffer=True)
+    table = pf.read_row_group(index, columns=columns)
+    incr("silver.bytes_read", f.bytes_fetched)
+    return table
+
+
+def _overlaps(lo: Any, hi: Any, start: date, end: date, locations: list[str] | None) -> bool:
+    # lo/hi: (location_id, date) min/max pairs; None where unknown -> cannot prune
+    loc_lo, date_lo = lo
+    loc_hi, date_hi = hi
+    if isinstance(date_lo, date) and isinstance(date_hi, date) and (date_hi < start or date_lo > end):
+        return False
+    if locations is not None and isinstance(loc_lo, str) and isinstance(loc_hi, str):
+        i = bisect.bisect_left(locations, loc_lo)
+        if i == len(locations) or locations[i] > loc_hi:
+            return False
+    return True
+
+
+def _stats_overlap(stats: dict[str, Any] | None, start: date, end: date, locations: list[str] | None) -> bool:
+    # manifest column stats (JSON) of a file; no stats -> cannot prune
+    stats = stats or {}
+    loc = stats.get("location_id", {})
+    day = stats.get("date", {})
+    date_min = date.fromisoformat(day["min"]) if "min" in day else None
+    date_max = date.fromisoformat(day["max"]) if "max" in day else None
+    return _overlaps((loc.get("min"), date_min), (loc.get("max"), date_max), start, end, locations)
+
+
+def _row_group_bounds(meta: pq.FileMetaData, i: int, name: str) -> tuple[Any, Any]:
+    rg = meta.row_group(i)
+    for j in range(rg.num_columns):
+        col = rg.column(j)
+        if col.path_in_schema == name:
+            st = col.statistics
+            if st is not None and st.has_min_max:
+                return st.min, st.max
+            break
+    return None, None
+
+
+def _read_file(
+    bucket: str,
+    key: str,
+    start: date,
+    end: date,
+    locations: list[str] | None,
+    columns: list[str] | None,
+    dts: list[str],
+) -> tuple[pa.Table | None, dict[str, int]]:
+    f = _S3RangeFile(get_s3_client(), bucket, key)
+    pf = pq.ParquetFile(f, pre_buffer=True)
+    meta = pf.metadata
+    names = pf.schema_arrow.names
+
+    groups = []
+    for i in range(meta.num_row_groups):
+        loc_lo, loc_hi = _row_group_bounds(meta, i, "location_id")
+        date_lo, date_hi = _row_group_bounds(meta, i, "date")
+        if _overlaps((loc_lo, date_lo), (loc_hi, date_hi), start, end, locations):
+            groups.append(i)
+
+    table = None
+    if groups:
+        wanted = names if columns is None else [c for c in columns if c in names]
+        filter_cols = [c for c in ("dt", "location_id", "date") if c in names]
+        table = pf.read_row_groups(groups, columns=list(dict.fromkeys(wanted + filter_cols)))
+        mask = None
+        if "dt" in names and pa.types.is_date32(table.schema.field("dt").type):
+            # compacted files also hold dts outside the range / overridden by a rerun
+            mask = pc.is_in(table.column("dt"), value_set=pa.array([date.fromisoformat(d) for d in dts], pa.date32()))
+        if "date" in names:
+            d = table.column("date")
+            m = pc.and_(
+                pc.greater_equal(d, pa.scalar(start, pa.date32())),
+                pc.less_equal(d, pa.scalar(end, pa.date32())),
+            )
+            mask = m if mask is None else pc.and_(mask, m)
+        if locations is not None and "location_id" in names:
+            m = pc.is_in(table.column("location_id"), value_set=pa.array(locations, pa.string()))
+            mask = m if mask is None else pc.and_(mask, m)
+        if mask is not None:
+            table = table.filter(mask)
+        table = table.select(wanted)
+
+    stats = {
+        "files": 1,
+        "row_groups": meta.num_row_groups,
+        "row_groups_read": len(groups),
+        "requests": f.requests,
+        "bytes_fetched": f.bytes_fetched,
+        "bytes_total": f.size,
+    }
+    return table, stats
+
+
+def read_silver_range(
+    bucket: str,
+    dataset: str,
+    start: str,
+    end: str,
+    locations: Iterable[str] | None = None,
+    columns: list[str] | None = None,
+    max_concurrency: int | None = None,
+    stats: dict[str, int] | None = None,
+) -> pa.Table:
+    """
+    Rows of `dataset` with start <= dt <= end, optionally restricted to
+    `locations` and projected to `columns`, touching only the bytes needed:
+
+      partitions  dts outside the range are never listed; compacted months
+                  serve many dts per file; manifest stats (location_id /
+                  date min-max, per file) skip files without a GET
+      row groups  parquet footer statistics skip row groups (one ranged GET per
+                  file for the footer, then only the selected column chunks)
+      columns     only the projected columns (plus filter columns) are fetched
+
+    Filters are then applied exactly, so the result does not depend on the file
+    layout. `stats`, if given, is filled with files / row groups / requests /
+    bytes counters.
+    """
+    if end < start:
+        raise ValueError(f"end ({end}) is before start ({start})")
+    start_d, end_d = date.fromisoformat(start), date.fromisoformat(end)
+    locs = sorted(set(locations)) if locations is not None else None
+    max_concurrency = max_concurrency or DEFAULT_READ_CONCURRENCY
+
+    reads: list[tuple[str, list[str]]] = []
+    counters = {"partitions": 0, "sources": 0, "files_pruned": 0}
+    for dts, keys, file_stats in _iter_sources(bucket, dataset, start, end):
+        counters["partitions"] += len(dts)
+        counters["sources"] += 1
+        for key, st in zip(keys, file_stats):
+            if _stats_overlap(st, start_d, end_d, locs):
+                reads.append((key, dts))
+            else:
+                counters["files_pruned"] += 1
+
+    tables = []
+    with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+        futures = [pool.submit(_read_file, bucket, key, start_d, end_d, locs, columns, dts) for key, dts in reads]
+        for fut in futures:
+            table, file_stats = fut.result()
+            for k, v in file_stats.items():
+                counters[k] = counters.get(k, 0) + v
+            if table is not None and table.num_rows:
+                tables.append(table)
+
+    if stats is not None:
+        stats.update(counters)
+    if tables:
+        return pa.concat_tables(tables, promote_options="default")
+    schema = _SCHEMAS.get(dataset)
+    if schema is None:
+        return pa.table({})
+    return schema.empty_table() if columns is None else schema.empty_table().select([c for c in columns if c in schema.names])
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from src.common.s3_client import get_bucket_name
+
+    parser = argparse.ArgumentParser(description="Read a slice of a silver dataset with partition / row-group pushdown")
+    parser.add_argument("--dataset", type=str, default="weather_daily", help="weather_daily | weather_hourly | locations")
+    parser.add_argument("--start", type=str, required=True, help="First dt YYYY-MM-DD")
+    parser.add_argument("--end", type=str, required=True, help="Last dt YYYY-MM-DD (inclusive)")
+    parser.add_argument("--locations", type=str, default=None, help="Comma-separated location_ids")
+    parser.add_argument("--columns", type=str, default=None, help="Comma-separated columns")
+    parser.add_argument("--output", type=str, default=None, help="Write the result to this local parquet file")
+    args = parser.parse_args()
+
+    scan: dict[str, int] = {}
+    result = read_silver_range(
+        get_bucket_name(),
+        args.dataset,
+        args.start,
+        args.end,
+        locations=args.locations.split(",") if args.locations else None,
+        columns=args.columns.split(",") if args.columns else None,
+        stats=scan,
+    )
+    if args.output:
+        pq.write_table(result, args.output)
+    detail = " ".join(f"{k}={v}" for k, v in scan.items())
+    print(f"[SILVER_READ] OK {args.dataset} {args.start}..{args.end} rows={result.num_rows} {detail}")